@@ -5,8 +5,15 @@ import re
 from datetime import datetime
 # Corrected import
 from gemini_helper import ask_gemini
+from intent_classifier import classify_intent, CONFIDENCE_THRESHOLD
 
 def determine_command(user_prompt):
+    # Fast path: deterministic patterns + local classifier. Only fall back to
+    # the LLM round trip when we are not confident.
+    local_command, confidence = classify_intent(user_prompt)
+    if local_command and confidence >= CONFIDENCE_THRESHOLD:
+        return local_command
+
     current_time_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
     master_prompt = f"""
@@ -14,9 +21,11 @@ def determine_command(user_prompt):
     Current time: {current_time_str}. Your ONLY output should be the JSON object.
 
     ## Tool Reference:
-    - **Function**: "get_daily_briefing", **Parameters**: {{"day": "today" or "tomorrow"}}. **Use for**: Checking calendar/schedule/meetings.
+    - **Function**: "get_daily_briefing", **Parameters**: {{"day": "today", "tomorrow", "this week", "next week", "YYYY-MM-DD" or "YYYY-MM-DD..YYYY-MM-DD"}}. **Use for**: Checking calendar/schedule/meetings.
+    - **Function**: "get_next_event", **Parameters**: {{}}. **Use for**: "What's next?", the next meeting/appointment.
+    - **Function**: "check_availability", **Parameters**: {{"day": same values as get_daily_briefing}}. **Use for**: Free/busy questions ("am I free at 3?", "when am I free tomorrow?").
     - **Function**: "create_calendar_event", **Parameters**: {{"summary": "event title", "start_time": "YYYY-MM-DDTHH:MM:SS"}}. **Use for**: Creating/scheduling new events.
-    - **Function**: "google_search", **Parameters**: {{"query": "search term"}}. **Use for**: Current events, facts, general knowledge.
+    - **Function**: "google_search", **Parameters**: {{"query": "search term", "deep": true or false}}. **Use for**: Current events, facts, general knowledge. Set "deep" to true for multi-part or comparison questions.
     - **Function**: "remember_info", **Parameters**: {{"key": "topic", "value": "information"}}. **Use for**: Storing information.
     - **Function**: "recall_info", **Parameters**: {{"key": "topic"}}. **Use for**: Retrieving stored information.
     - **Function**: "forget_info", **Parameters**: {{"key": "topic"}}. **Use for**: Deleting stored information.
@@ -28,7 +37,7 @@ def determine_command(user_prompt):
     """
     
     try:
-        response_text = ask_gemini(master_prompt)
+        response_text = ask_gemini(master_prompt, call_site="router")
         
         json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
         if json_match:
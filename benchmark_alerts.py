@@ -0,0 +1,65 @@
+# File: benchmark_alerts.py
+# Alert engine with 10k alerts across 500 tickers: per-tick cost of the heap
+# books vs a linear scan of every alert. Run: python benchmark_alerts.py [alerts] [tickers]
+import os
+import random
+import sys
+import tempfile
+import time
+from tasks.alert_engine import AlertEngine
+
+TICKS = 20_000
+
+def _linear_scan(alerts, ticker, price):
+    return [a for a in alerts if a["ticker"] == ticker and a["kind"] != "trailing" and
+            (price > a["target"] if a["direction"] == "above" else price < a["target"])]
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    tickers = [f"SYM{i}" for i in range(int(sys.argv[2]) if len(sys.argv) > 2 else 500)]
+    random.seed(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "alerts.sqlite3")
+        engine = AlertEngine(path)
+        prices = {t: 100.0 for t in tickers}
+
+        began = time.perf_counter()
+        engine._conn.execute("PRAGMA synchronous=OFF")   # setup only: each add commits
+        for i in range(count):
+            ticker, direction = random.choice(tickers), random.choice(["above", "below"])
+            kind = i % 10
+            if kind < 6:
+                offset = random.uniform(5, 60)
+                engine.add_price_alert(ticker, direction, 100 + offset if direction == "above" else 100 - offset)
+            elif kind < 8:
+                engine.add_percent_alert(ticker, direction, random.uniform(5, 50), 100.0)
+            else:
+                engine.add_trailing_alert(ticker, direction, random.uniform(5, 50), 100.0)
+        print(f"--- Alert Engine Benchmark ({count:,} alerts, {len(tickers)} tickers) ---")
+        print(f"Created alerts in {time.perf_counter() - began:.2f}s")
+
+        began = time.perf_counter()
+        engine = AlertEngine(path)
+        print(f"Reloaded from disk in {(time.perf_counter() - began) * 1000:.1f} ms")
+
+        snapshot = engine.alerts()
+        ticks = [(random.choice(tickers), random.uniform(0.99, 1.01)) for _ in range(TICKS)]
+
+        began = time.perf_counter()
+        for ticker, move in ticks:
+            _linear_scan(snapshot, ticker, prices[ticker] * move)
+        scan_us = (time.perf_counter() - began) / TICKS * 1e6
+
+        fired = 0
+        began = time.perf_counter()
+        for ticker, move in ticks:
+            prices[ticker] *= move
+            fired += len(engine.on_price(ticker, prices[ticker]))
+        engine_us = (time.perf_counter() - began) / TICKS * 1e6
+        print(f"linear scan (price alerts only): {scan_us:8.1f} us/tick")
+        print(f"heap engine (all kinds):         {engine_us:8.1f} us/tick ({fired:,} alerts fired)")
+
+        began = time.perf_counter()
+        batch = engine.check({t: p * 0.98 for t, p in prices.items()})
+        print(f"check() of all {len(tickers)} tickers:     {(time.perf_counter() - began) * 1000:8.2f} ms "
+              f"({len(batch)} fired)")
@@ -0,0 +1,28 @@
+# File: benchmark_finance.py
+# One price-alert check cycle over N watched symbols against a local quote
+# stub: one request per symbol (the old pattern) vs one batched request vs the
+# shared quote cache. Run: python benchmark_finance.py [symbols]
+import sys
+import time
+from fake_servers import FakeQuoteServer
+from tasks.quotes import HttpQuoteSource, QuoteService
+
+def _timed(label, fn):
+    start = time.perf_counter()
+    prices = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<30} {elapsed * 1000:9.1f} ms  ({len(prices)} prices)")
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    symbols = [f"SYM{i}" for i in range(count)]
+    with FakeQuoteServer(latency=0.05) as server:
+        source = HttpQuoteSource(server.url)
+        service = QuoteService(source)
+
+        print(f"--- Quote Fetch Benchmark ({count} symbols, 50 ms/request) ---")
+        _timed("one request per symbol", lambda: {s: p for sym in symbols for s, p in source.fetch([sym]).items()})
+        _timed("batched, cold cache", lambda: service.get_quotes(symbols))
+        _timed("batched, warm cache", lambda: service.get_quotes(symbols))
+        _timed("single price, warm cache", lambda: {symbols[0]: service.get_quote(symbols[0])})
+        print(f"Quote cache: {service.get_stats()}, server requests: {server.counters['requests']}")
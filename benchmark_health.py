@@ -0,0 +1,89 @@
+# File: benchmark_health.py
+# Ingestion throughput (single vs bulk vs buffered, per synchronous mode) and
+# tail/date-range/aggregate query latency for the health store at millions of rows.
+# Run: python benchmark_health.py [rows]
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from tasks.health_store import HealthStore, BufferedHealthWriter, SYNCHRONOUS_MODES
+
+METRICS = ["water", "run", "calories", "sleep", "weight", "steps"]
+
+def _timed_ms(fn, repeats=200):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = fn()
+    return (time.perf_counter() - start) / repeats * 1000, result
+
+def _entries(count):
+    now = datetime.now()
+    return [(random.choice(METRICS), str(random.randint(1, 1000)), "ml", now - timedelta(minutes=i))
+            for i in range(count)]
+
+def _rows_per_sec(count, fn):
+    start = time.perf_counter()
+    fn()
+    return count / (time.perf_counter() - start)
+
+def benchmark_ingestion(tmp, single_rows=2_000, bulk_rows=100_000):
+    print("--- Health Ingestion Throughput (rows/sec) ---")
+    print(f"{'synchronous':<12} {'append()':>12} {'append_many()':>15} {'buffered':>12}")
+    single, bulk = _entries(single_rows), _entries(bulk_rows)
+    for mode in SYNCHRONOUS_MODES:
+        def fresh(name):
+            return HealthStore(os.path.join(tmp, f"ingest_{mode}_{name}.sqlite3"), legacy_csv=None, synchronous=mode)
+
+        store = fresh("single")
+        one = _rows_per_sec(single_rows, lambda: [store.append(*entry) for entry in single])
+        store = fresh("bulk")
+        many = _rows_per_sec(bulk_rows, lambda: store.append_many(bulk))
+        store = fresh("buffered")
+        def buffered():
+            with BufferedHealthWriter(store, flush_interval=None) as writer:
+                writer.write_many(bulk)
+        buffered_rate = _rows_per_sec(bulk_rows, buffered)
+        print(f"{mode:<12} {one:>12,.0f} {many:>15,.0f} {buffered_rate:>12,.0f}")
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        benchmark_ingestion(tmp)
+
+        store = HealthStore(os.path.join(tmp, "health.sqlite3"), legacy_csv=None)
+        start_day = datetime.now() - timedelta(days=3650)
+        step = 3650 * 86400 / rows
+
+        began = time.perf_counter()
+        batch = []
+        for i in range(rows):
+            ts = start_day + timedelta(seconds=i * step)
+            batch.append(store._row(random.choice(METRICS), str(random.randint(1, 1000)), "", ts))
+            if len(batch) == 100_000:
+                store._conn.executemany("INSERT INTO entries (metric, ts, value, numeric_value, unit) VALUES (?, ?, ?, ?, ?)", batch)
+                batch.clear()
+        if batch:
+            store._conn.executemany("INSERT INTO entries (metric, ts, value, numeric_value, unit) VALUES (?, ?, ?, ?, ?)", batch)
+        store._conn.commit()
+        print("--- Health Store Benchmark ---")
+        print(f"Loaded {rows:,} rows in {time.perf_counter() - began:.1f}s")
+        began = time.perf_counter()
+        store.rebuild_rollups()
+        print(f"Rebuilt daily/weekly rollups (vectorized) in {time.perf_counter() - began:.1f}s")
+
+        now = datetime.now()
+        tail_ms, _ = _timed_ms(lambda: store.tail("water", 5))
+        week_ms, week = _timed_ms(lambda: store.range("water", now - timedelta(days=7), now))
+        month_ms, month = _timed_ms(lambda: store.range("run", now - timedelta(days=30), now), repeats=50)
+        print(f"tail(water, 5):          {tail_ms:.3f} ms")
+        print(f"range(water, 7 days):    {week_ms:.3f} ms ({len(week)} rows)")
+        print(f"range(run, 30 days):     {month_ms:.3f} ms ({len(month)} rows)")
+
+        from tasks import health_analytics
+        health_analytics.get_health_store = lambda: store
+        avg_ms, _ = _timed_ms(lambda: health_analytics.daily_stats("water", 365), repeats=50)
+        trend_ms, _ = _timed_ms(lambda: health_analytics.trend("run", 3650), repeats=20)
+        print(f"daily_stats(water, 1 year):  {avg_ms:.3f} ms")
+        print(f"trend(run, 10 years):        {trend_ms:.3f} ms")
@@ -0,0 +1,33 @@
+# File: benchmark_llm_client.py
+# Load test for the async Gemini client against a local fake server that
+# injects latency and HTTP 429s. Run: python benchmark_llm_client.py
+import asyncio
+import time
+from fake_servers import FakeGeminiServer
+from llm_client import AsyncLLMClient, make_rest_generate
+
+REQUESTS = 100
+LATENCY = 0.2
+ERROR_RATE = 0.2
+
+
+async def _run(server):
+    client = AsyncLLMClient(make_rest_generate("test-key", "gemini-1.5-flash", api_base=server.url),
+                            base_backoff=0.1)
+    start = time.perf_counter()
+    results = await asyncio.gather(*(client.ask(f"question {i}") for i in range(REQUESTS)),
+                                   return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    failures = [r for r in results if isinstance(r, Exception)]
+
+    print("--- Async LLM Client Report ---")
+    print(f"Requests: {REQUESTS}, server latency: {LATENCY}s, injected 429 rate: {ERROR_RATE:.0%}")
+    print(f"Completed in {elapsed:.2f}s, failures after retries: {len(failures)}")
+    print(f"Server saw {server.counters['requests']} calls ({server.counters['429']} answered 429)")
+    for name, value in sorted(client.get_metrics().items()):
+        print(f"- {name}: {value:.3f}" if isinstance(value, float) else f"- {name}: {value}")
+
+
+if __name__ == "__main__":
+    with FakeGeminiServer(latency=LATENCY, error_rate=ERROR_RATE) as server:
+        asyncio.run(_run(server))
@@ -0,0 +1,41 @@
+# File: benchmark_memory.py
+# Shows that remember/recall/forget cost stays flat as the memory store grows
+# to 100k+ entries. Run: python benchmark_memory.py
+import os
+import tempfile
+import time
+from tasks.memory_store import MemoryStore
+from tasks.memory_index import MemoryIndex
+
+SIZES = [1_000, 10_000, 100_000, 200_000]
+SAMPLE_OPS = 2_000
+
+def _per_op_us(fn, count):
+    start = time.perf_counter()
+    for i in range(count):
+        fn(i)
+    return (time.perf_counter() - start) / count * 1e6
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        store = MemoryStore(os.path.join(tmp, "bench.sqlite3"), legacy_json=None)
+        index = MemoryIndex()
+        store.add_listener(index)
+        print("--- Memory Store Benchmark ---")
+        print(f"{'entries':>10} {'set µs':>10} {'get µs':>10} {'delete µs':>10} {'fuzzy µs':>10}")
+        filled = 0
+        for size in SIZES:
+            # Bulk-fill up to the target size in one transaction
+            store._conn.execute("BEGIN")
+            store._conn.executemany("INSERT OR REPLACE INTO memories VALUES (?, ?, ?)",
+                                    ((f"key {i}", f"value {i}", "2024-01-01T00:00:00") for i in range(filled, size)))
+            store._conn.execute("COMMIT")
+            store._reload()
+            filled = size
+
+            set_us = _per_op_us(lambda i: store.set(f"bench {i}", f"v{i}"), SAMPLE_OPS)
+            get_us = _per_op_us(lambda i: store.get(f"key {i * 37 % size}"), SAMPLE_OPS)
+            del_us = _per_op_us(lambda i: store.delete(f"bench {i}"), SAMPLE_OPS)
+            fuzzy_us = _per_op_us(lambda i: index.search(f"key {i * 37 % size}x"), SAMPLE_OPS // 10)
+            print(f"{size:>10,} {set_us:>10.1f} {get_us:>10.1f} {del_us:>10.1f} {fuzzy_us:>10.1f}")
+        store.close()
@@ -0,0 +1,76 @@
+# File: benchmark_models.py
+# Cold start and resident memory with the lazy model manager versus the old
+# import-time Whisper load. Each scenario runs in a fresh interpreter:
+#   lazy import  - importing the transcription code (what every startup pays now)
+#   eager import - import plus model load (what importing meeting_helper used to cost)
+#   warm-up      - background warm-up, then the first transcription
+#   idle unload  - memory after the manager drops the idle model
+# Run: python benchmark_models.py
+import json
+import subprocess
+import sys
+
+SCENARIO = r'''
+import json, os, sys, time
+os.environ["KUNNABUDDY_MODEL_IDLE_SECONDS"] = "1"
+def rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            return next(int(l.split()[1]) for l in f if l.startswith("VmRSS")) / 1024
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024    # peak, on macOS in bytes / 1024
+began = time.perf_counter()
+import numpy as np
+from tasks import whisper_stt
+from tasks.model_manager import get_model_manager
+result = {"import_s": time.perf_counter() - began, "import_rss_mb": rss_mb()}
+scenario = sys.argv[1]
+if scenario != "lazy":
+    began = time.perf_counter()
+    if scenario == "eager":
+        whisper_stt.get_whisper_model()
+    else:
+        whisper_stt.warm_up_whisper().join()
+    result["load_s"] = time.perf_counter() - began
+    result["loaded_rss_mb"] = rss_mb()
+    silence = np.zeros(whisper_stt.SAMPLE_RATE, dtype=np.float32)
+    began = time.perf_counter()
+    whisper_stt.transcribe_text(silence)
+    result["first_transcribe_s"] = time.perf_counter() - began
+    if scenario == "unload":
+        deadline = time.time() + 10
+        while get_model_manager().is_loaded(whisper_stt.MODEL_NAME) and time.time() < deadline:
+            time.sleep(0.2)
+        result["unloaded"] = not get_model_manager().is_loaded(whisper_stt.MODEL_NAME)
+        result["unloaded_rss_mb"] = rss_mb()
+print("RESULT " + json.dumps(result))
+'''
+
+def run(scenario):
+    completed = subprocess.run([sys.executable, "-c", SCENARIO, scenario], capture_output=True, text=True)
+    for line in completed.stdout.splitlines():
+        if line.startswith("RESULT "):
+            return json.loads(line[7:])
+    tail = (completed.stderr.strip().splitlines() or ["no output"])[-1]
+    print(f"  {scenario}: failed ({tail})")
+    return None
+
+if __name__ == "__main__":
+    print("--- Model Manager Benchmark (Whisper base.en, fresh interpreter per scenario) ---")
+    lazy = run("lazy")
+    if lazy:
+        print(f"lazy import:   {lazy['import_s'] * 1000:7.0f} ms, RSS {lazy['import_rss_mb']:7.1f} MB   (now)")
+    eager = run("eager")
+    if eager:
+        print(f"eager import:  {(eager['import_s'] + eager['load_s']) * 1000:7.0f} ms, RSS {eager['loaded_rss_mb']:7.1f} MB   "
+              f"(before: model loaded at import)")
+        print(f"first transcription after load: {eager['first_transcribe_s'] * 1000:.0f} ms")
+    warm = run("warmup")
+    if warm:
+        print(f"background warm-up: {warm['load_s'] * 1000:.0f} ms off the main thread; "
+              f"first transcription then {warm['first_transcribe_s'] * 1000:.0f} ms")
+    unload = run("unload")
+    if unload:
+        print(f"idle unload (1 s idle): {'unloaded' if unload['unloaded'] else 'still loaded'}, "
+              f"RSS {unload['loaded_rss_mb']:.1f} -> {unload['unloaded_rss_mb']:.1f} MB")
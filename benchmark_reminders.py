@@ -0,0 +1,71 @@
+# File: benchmark_reminders.py
+# Timer engine with 100k scheduled reminders: insert/cancel cost, CPU used
+# while idle, and how late timers fire; then the startup cost of replaying a
+# 1M-entry reminder journal. Run: python benchmark_reminders.py [timers] [journal]
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from tasks.timer_engine import TimerEngine
+from tasks.reminder_store import ReminderStore
+
+PROBES = 50
+LOAD_WINDOW_SECONDS = 6 * 3600      # tasks/reminder_helper.LOAD_WINDOW_SECONDS
+
+def benchmark_journal(entries):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "reminders.sqlite3")
+        store = ReminderStore(path)
+        now = time.time()
+        rows = [(f"reminder {i}", now + random.uniform(-86400, 365 * 86400), None, "") for i in range(entries)]
+        store._conn.executemany("INSERT INTO reminders (message, due, repeat, created) VALUES (?, ?, ?, ?)", rows)
+        store._conn.commit()
+        store._conn.close()
+
+        # What restore_reminders() reads: overdue entries plus the first load window
+        began = time.perf_counter()
+        store = ReminderStore(path)
+        overdue = store.overdue(now)
+        window = store.between(now, now + LOAD_WINDOW_SECONDS)
+        elapsed = (time.perf_counter() - began) * 1000
+        print(f"--- Reminder Journal Replay ({entries:,} entries) ---")
+        print(f"open + overdue + first window: {elapsed:.1f} ms "
+              f"({len(overdue):,} overdue, {len(window):,} scheduled, rest left on disk)")
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    journal = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+    engine = TimerEngine().start()
+    now = time.time()
+
+    began = time.perf_counter()
+    ids = [engine.schedule(now + 3600 + random.uniform(0, 86400), lambda: None) for _ in range(count)]
+    print(f"--- Timer Engine Benchmark ({count:,} timers) ---")
+    print(f"schedule():      {(time.perf_counter() - began) / count * 1e6:6.2f} us/timer")
+
+    began = time.perf_counter()
+    for timer_id in ids[::2]:
+        engine.cancel(timer_id)
+    print(f"cancel():        {(time.perf_counter() - began) / (count // 2) * 1e6:6.2f} us/timer")
+
+    began_cpu = time.process_time()
+    time.sleep(2)
+    print(f"idle CPU:        {(time.process_time() - began_cpu) * 1000:6.2f} ms over 2 s")
+
+    lateness, done = [], threading.Semaphore(0)
+    def probe(deadline):
+        lateness.append(time.time() - deadline)
+        done.release()
+    for i in range(PROBES):
+        deadline = time.time() + 0.02 * (i + 1)
+        engine.schedule(deadline, probe, deadline)
+    for _ in range(PROBES):
+        done.acquire()
+    lateness.sort()
+    print(f"firing lateness: p50 {lateness[PROBES // 2] * 1000:.2f} ms, max {lateness[-1] * 1000:.2f} ms "
+          f"({len(engine):,} timers still pending)")
+    engine.stop()
+
+    benchmark_journal(journal)
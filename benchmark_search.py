@@ -0,0 +1,30 @@
+# File: benchmark_search.py
+# Compares per-call connections, the pooled keep-alive session and the TTL
+# result cache against a local Serper stub. Run: python benchmark_search.py
+import json
+import os
+import time
+from fake_servers import FakeSerperServer
+
+ROUNDS = 50
+
+def _timed(label, fn):
+    start = time.perf_counter()
+    for i in range(ROUNDS):
+        fn(i)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed / ROUNDS * 1000:8.2f} ms/query")
+
+if __name__ == "__main__":
+    with FakeSerperServer(latency=0.0) as server:
+        os.environ["SERPER_URL"] = f"{server.url}/search"
+        import requests
+        import google_search
+
+        print("--- Serper Client Benchmark ---")
+        _timed("requests.post (no pool)", lambda i: requests.post(
+            google_search.SERPER_URL, data=json.dumps({"q": f"query {i}"}),
+            headers={'X-API-KEY': 'test', 'Content-Type': 'application/json'}).json())
+        _timed("pooled session, cold cache", lambda i: google_search.fetch_search_results(f"query {i}", "test"))
+        _timed("pooled session, warm cache", lambda i: google_search.fetch_search_results(f"Query  {i}", "test"))
+        print(f"Result cache: {google_search.get_search_cache_stats()}, server calls: {server.counters['requests']}")
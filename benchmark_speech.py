@@ -0,0 +1,61 @@
+# File: benchmark_speech.py
+# Enqueue-to-first-sample latency of the speech engine, with the real pygame
+# mixer on SDL's dummy audio driver and pre-rendered clips (so synthesis time
+# is excluded): idle queue, busy queue, and an alert preempting chat.
+# Run: python benchmark_speech.py
+import io
+import math
+import os
+import struct
+import time
+import wave
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from tasks.speech_engine import SpeechEngine, PygamePlayer, PRIORITY_ALERT, PRIORITY_CHAT
+
+ROUNDS = 20
+
+def _tone_wav(seconds=0.2, rate=22050):
+    frames = b"".join(struct.pack("<h", int(8000 * math.sin(2 * math.pi * 440 * i / rate)))
+                      for i in range(int(seconds * rate)))
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(frames)
+    return buffer.getvalue()
+
+def _ms(values):
+    values = sorted(values)
+    return f"p50 {values[len(values) // 2] * 1000:7.2f} ms, max {values[-1] * 1000:7.2f} ms"
+
+if __name__ == "__main__":
+    clip = _tone_wav()
+    engine = SpeechEngine(lambda text, player, cache: player.decode(io.BytesIO(clip)), PygamePlayer())
+    print("--- Speech Engine Benchmark (enqueue -> first sample) ---")
+
+    idle = []
+    for _ in range(ROUNDS):
+        utterance = engine.speak("idle")
+        utterance.wait()
+        idle.append(utterance.first_sample_latency)
+    print(f"idle queue:            {_ms(idle)}")
+
+    queued = [engine.speak(f"chat {i}") for i in range(ROUNDS)]
+    for utterance in queued:
+        utterance.wait()
+    print(f"behind {ROUNDS} chat clips:   {_ms([u.first_sample_latency for u in queued])}")
+
+    preempting = []
+    for _ in range(5):
+        chat = [engine.speak(f"chat {i}") for i in range(5)]
+        time.sleep(0.05)
+        alert = engine.speak("alert", PRIORITY_ALERT)
+        alert.wait()
+        preempting.append(alert.first_sample_latency)
+        for utterance in chat:
+            utterance.wait()
+    print(f"alert preempting chat: {_ms(preempting)}")
+    print(f"all utterances:        {engine.get_latency_stats()}")
@@ -0,0 +1,153 @@
+# File: benchmark_stt.py
+# Offline Whisper recognition for voice mode, measured on a folder of test
+# clips (NAME.wav + NAME.txt with the reference transcript). Each clip is fed
+# through the listener's VAD in 30 ms blocks, as the microphone would; the
+# report gives end-of-speech-to-text latency (VAD endpoint hangover plus
+# decode), how soon the first partial hypothesis is available, and word error
+# rate against the references.
+#
+# Run: python benchmark_stt.py [clip_dir] [--google]
+# An empty clip folder is first filled with the command set below, rendered
+# by the local espeak-ng backend; recordings of real voices can be added next to them.
+import os
+import re
+import sys
+import time
+import wave
+import numpy as np
+from tasks.listener import (VoiceActivityDetector, CapturedUtterance, SAMPLE_RATE, FRAME_SAMPLES, END_SILENCE_MS,
+                           MIN_PARTIAL_MS, _recognize_whisper, _recognize_google)
+from tasks.tts_backends import EspeakBackend, parse_wav
+from tasks.whisper_stt import get_whisper_model
+
+CLIP_DIR = "stt_clips"
+COMMANDS = [
+    "what's on my calendar tomorrow",
+    "remind me to call mom in twenty minutes",
+    "what is the price of apple stock",
+    "set an alert if tesla drops below two hundred dollars",
+    "remember that the wifi password is blue kettle",
+    "what is the wifi password",
+    "play some relaxing music on youtube",
+    "log my weight as seventy two kilograms",
+    "am i free at three pm on friday",
+    "search the web for the weather in bangalore",
+    "stop",
+    "how many steps did i walk this week",
+]
+SILENCE_SECONDS = 1.0       # Padding around each clip so the VAD sees a start and an end
+
+def _resample(samples, rate):
+    if rate == SAMPLE_RATE:
+        return samples.astype(np.float32) / 32768
+    positions = np.arange(int(len(samples) * SAMPLE_RATE / rate)) * (rate / SAMPLE_RATE)
+    return (np.interp(positions, np.arange(len(samples)), samples) / 32768).astype(np.float32)
+
+def make_clips(directory):
+    backend = EspeakBackend()
+    if not backend.available():
+        sys.exit(f"No clips in {directory}/ and espeak-ng is not installed to render them.")
+    os.makedirs(directory, exist_ok=True)
+    for i, text in enumerate(COMMANDS):
+        samples, rate = backend.render_pcm(text)
+        name = os.path.join(directory, f"command_{i:02d}")
+        with wave.open(name + ".wav", "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(SAMPLE_RATE)
+            w.writeframes((_resample(samples, rate) * 32767).astype("<i2").tobytes())
+        with open(name + ".txt", "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(f"Rendered {len(COMMANDS)} clips into {directory}/ with {backend.name}.")
+
+def load_clips(directory):
+    clips = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".wav"):
+            continue
+        base = os.path.join(directory, name[:-4])
+        if not os.path.exists(base + ".txt"):
+            continue
+        with open(base + ".wav", "rb") as f:
+            samples, rate = parse_wav(f.read())
+        with open(base + ".txt", encoding="utf-8") as f:
+            clips.append((name[:-4], _resample(samples, rate), f.read().strip()))
+    return clips
+
+def _words(text):
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+def word_errors(reference, hypothesis):
+    """(substitutions + deletions + insertions, reference length), by word-level edit distance."""
+    ref, hyp = _words(reference), _words(hypothesis)
+    row = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        previous, row[0] = row[0], i
+        for j, h in enumerate(hyp, 1):
+            previous, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, previous + (r != h))
+    return row[-1], len(ref)
+
+def _segment(audio):
+    """Feeds padded audio through the VAD; returns the utterance and the first-partial audio."""
+    silence = np.zeros(int(SILENCE_SECONDS * SAMPLE_RATE), dtype=np.float32)
+    noise = np.random.default_rng(0).normal(0, 10 ** (-60 / 20), len(silence)).astype(np.float32)
+    stream = np.concatenate((silence + noise, audio, silence + noise, silence + noise))
+    vad, partial = VoiceActivityDetector(), None
+    for offset in range(0, len(stream), FRAME_SAMPLES):
+        done = vad.feed(stream[offset:offset + FRAME_SAMPLES], now=offset / SAMPLE_RATE)
+        current = vad.current_audio()
+        if partial is None and current is not None and len(current) >= SAMPLE_RATE * MIN_PARTIAL_MS // 1000:
+            partial = current
+        if done:
+            return done[0], partial
+    return None, partial
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+def benchmark(name, recognize, clips):
+    """`recognize(float32 audio) -> text`."""
+    latencies, partial_latencies, errors, words = [], [], 0, 0
+    print(f"\n[{name}]")
+    for clip_name, audio, reference in clips:
+        utterance, partial = _segment(audio)
+        if utterance is None:
+            print(f"  {clip_name}: no speech detected")
+            errors, words = errors + len(_words(reference)), words + len(_words(reference))
+            continue
+        began = time.perf_counter()
+        hypothesis = recognize(utterance.audio)
+        latencies.append(time.perf_counter() - began)
+        if partial is not None:
+            began = time.perf_counter()
+            recognize(partial)
+            partial_latencies.append(time.perf_counter() - began)
+        clip_errors, clip_words = word_errors(reference, hypothesis)
+        errors, words = errors + clip_errors, words + clip_words
+        print(f"  {clip_name}: {latencies[-1] * 1000:6.0f} ms  errors {clip_errors}/{clip_words}  '{hypothesis}'")
+    if not latencies:
+        return
+    hangover = END_SILENCE_MS / 1000
+    print(f"  decode:            p50 {_percentile(latencies, 0.5) * 1000:.0f} ms, p95 {_percentile(latencies, 0.95) * 1000:.0f} ms")
+    print(f"  end of speech -> text: p50 {(hangover + _percentile(latencies, 0.5)) * 1000:.0f} ms "
+          f"({END_SILENCE_MS} ms endpoint silence + decode)")
+    if partial_latencies:
+        print(f"  first partial:     {MIN_PARTIAL_MS} ms into the utterance + "
+              f"p50 {_percentile(partial_latencies, 0.5) * 1000:.0f} ms decode")
+    print(f"  WER:               {errors / words:.1%} ({errors} errors / {words} words)")
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    directory = args[0] if args else CLIP_DIR
+    if not os.path.isdir(directory) or not any(n.endswith(".wav") for n in os.listdir(directory)):
+        make_clips(directory)
+    clips = load_clips(directory)
+    print(f"--- Speech Recognition Benchmark ({len(clips)} clips from {directory}/) ---")
+
+    began = time.perf_counter()
+    get_whisper_model()
+    print(f"Whisper model load: {time.perf_counter() - began:.1f} s (once per process, shared with meetings)")
+    benchmark("whisper (offline)", _recognize_whisper, clips)
+    if "--google" in sys.argv:
+        benchmark("google (network)", lambda audio: _recognize_google(CapturedUtterance(audio, 0, 0, 0, False)), clips)
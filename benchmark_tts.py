@@ -0,0 +1,77 @@
+# File: benchmark_tts.py
+# Synthesis latency and real-time factor (synthesis time / audio duration;
+# below 1.0 is faster than real time) for each installed TTS backend, on
+# short, medium and long utterances. Backends that are not installed or
+# cannot be reached are reported and skipped. Run: python benchmark_tts.py [rounds]
+import struct
+import sys
+import time
+from tasks.tts_backends import GTTSBackend, EspeakBackend
+
+PHRASES = {
+    "short": "Got it.",
+    "medium": "Your reminder to call the dentist is set for three thirty this afternoon.",
+    "long": ("Here is a quick summary of your day. You have two meetings this morning, a lunch "
+             "reservation at one, and the quarterly report is due by five. The weather looks clear, "
+             "and the stock you are watching is up a little over two percent since the open."),
+}
+
+# MPEG audio frame header tables (Layer III)
+_BITRATES = {3: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],          # MPEG-1
+             2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160]}              # MPEG-2/2.5
+_SAMPLE_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000], 0: [11025, 12000, 8000]}
+
+def mp3_duration(data):
+    """Seconds of audio in an MP3 stream, counted frame by frame (skips an ID3v2 tag)."""
+    offset, seconds = 0, 0.0
+    if data[:3] == b"ID3":
+        size = data[6:10]
+        offset = 10 + ((size[0] << 21) | (size[1] << 14) | (size[2] << 7) | size[3])
+    while offset + 4 <= len(data):
+        header = struct.unpack(">I", data[offset:offset + 4])[0]
+        version = (header >> 19) & 3
+        bitrate_index, rate_index = (header >> 12) & 15, (header >> 10) & 3
+        if (header >> 21) != 0x7FF or version == 1 or bitrate_index in (0, 15) or rate_index == 3:
+            offset += 1         # not a frame header: resync
+            continue
+        bitrate = _BITRATES[3 if version == 3 else 2][bitrate_index] * 1000
+        sample_rate = _SAMPLE_RATES[version][rate_index]
+        samples = 1152 if version == 3 else 576
+        padding = (header >> 9) & 1
+        offset += samples // 8 * bitrate // sample_rate + padding
+        seconds += samples / sample_rate
+    return seconds
+
+def _time_backend(backend, text):
+    began = time.perf_counter()
+    if backend.produces_pcm:
+        samples, sample_rate = backend.render_pcm(text)
+        elapsed = time.perf_counter() - began
+        return elapsed, len(samples) / sample_rate
+    audio = backend.synthesize(text)
+    return time.perf_counter() - began, mp3_duration(audio)
+
+def benchmark_backend(backend, rounds):
+    print(f"\n[{backend.name}]")
+    if not backend.available():
+        print("  not installed, skipped")
+        return
+    for label, text in PHRASES.items():
+        runs = []
+        for _ in range(rounds):
+            try:
+                runs.append(_time_backend(backend, text))
+            except Exception as e:
+                print(f"  {label:6}: failed ({e})")
+                return
+        latencies = sorted(elapsed for elapsed, _ in runs)
+        audio_seconds = runs[0][1]
+        p50 = latencies[len(latencies) // 2]
+        print(f"  {label:6}: p50 {p50 * 1000:8.1f} ms, max {latencies[-1] * 1000:8.1f} ms, "
+              f"audio {audio_seconds:5.2f} s, RTF {p50 / audio_seconds if audio_seconds else float('nan'):.3f}")
+
+if __name__ == "__main__":
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"--- TTS Backend Benchmark ({rounds} rounds per utterance) ---")
+    for backend in (GTTSBackend(), EspeakBackend()):
+        benchmark_backend(backend, rounds)
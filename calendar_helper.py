@@ -1,49 +1,175 @@
 # --- File: calendar_helper.py ---
+import os
 import json
+import hashlib
+import threading
 import datetime as dt
 import streamlit as st
 from google.oauth2.credentials import Credentials
+from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
+from calendar_store import get_event_store
 
 SCOPES = ['https://www.googleapis.com/auth/calendar.readonly'] # Read-only for safety first
 
+# Override to point the client at a local fake Calendar endpoint (see fake_servers.py)
+CALENDAR_API_ENDPOINT = os.environ.get("CALENDAR_API_ENDPOINT")
+
+# Discovery + client construction is one of the slowest steps of a briefing, so
+# services are cached per user (keyed by refresh token) and reused.
+# { fingerprint: {"access_token": str, "creds": Credentials, "service": Resource} }
+_service_cache = {}
+_service_cache_lock = threading.Lock()
+
+def _token_fingerprint(token_info):
+    identity = token_info.get("refresh_token") or token_info.get("token") or json.dumps(token_info, sort_keys=True)
+    return hashlib.sha256(f"{token_info.get('client_id')}:{identity}".encode("utf-8")).hexdigest()
+
+def _build_service(creds):
+    options = {"api_endpoint": CALENDAR_API_ENDPOINT} if CALENDAR_API_ENDPOINT else None
+    # static_discovery uses the discovery document bundled with the client library
+    # instead of fetching it over the network.
+    return build('calendar', 'v3', credentials=creds, static_discovery=True,
+                 cache_discovery=False, client_options=options)
+
 def get_calendar_service():
     if 'google_token' not in st.session_state:
         return "ERROR: You are not logged into Google Calendar. The token is missing."
-    
+
+    token_info = st.session_state.google_token
+    fingerprint = _token_fingerprint(token_info)
     try:
-        creds = Credentials.from_authorized_user_info(st.session_state.google_token, SCOPES)
-        if not creds or not creds.valid:
-             return "ERROR: Your Google authentication token is invalid or expired."
-        
-        service = build('calendar', 'v3', credentials=creds)
-        return service
+        with _service_cache_lock:
+            entry = _service_cache.get(fingerprint)
+
+            # The login flow handed us a rotated access token: rebuild with it.
+            if entry and entry["access_token"] != token_info.get("token"):
+                entry = None
+
+            if entry is None:
+                creds = Credentials.from_authorized_user_info(token_info, SCOPES)
+                entry = {"access_token": token_info.get("token"), "creds": creds, "service": None}
+
+            creds = entry["creds"]
+            if not creds.valid and creds.expired and creds.refresh_token:
+                # The service holds a reference to creds, so refreshing in place is enough.
+                creds.refresh(Request())
+            if not creds or not creds.valid:
+                _service_cache.pop(fingerprint, None)
+                return "ERROR: Your Google authentication token is invalid or expired."
+
+            if entry["service"] is None:
+                entry["service"] = _build_service(creds)
+            _service_cache[fingerprint] = entry
+            return entry["service"]
     except Exception as e:
         return f"ERROR: Could not build Google Calendar service. Error: {e}"
 
-def get_daily_briefing(day):
+def _resolve_window(day):
+    """
+    Turns a day/range description into (start, end, label) in local time.
+    Accepts "today", "tomorrow", "this week", "next week", "YYYY-MM-DD" and
+    "YYYY-MM-DD..YYYY-MM-DD" (inclusive).
+    """
+    day = (day or "today").strip().lower()
+    midnight = dt.datetime.now().astimezone().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    if day == "tomorrow":
+        start = midnight + dt.timedelta(days=1)
+        return start, start + dt.timedelta(days=1), "tomorrow"
+    if day in ("this week", "week"):
+        # From today until the end of Sunday
+        return midnight, midnight + dt.timedelta(days=7 - midnight.weekday()), "this week"
+    if day == "next week":
+        start = midnight + dt.timedelta(days=7 - midnight.weekday())
+        return start, start + dt.timedelta(days=7), "next week"
+    if ".." in day:
+        first, last = (dt.date.fromisoformat(part.strip()) for part in day.split("..", 1))
+        start = midnight.replace(year=first.year, month=first.month, day=first.day)
+        end = midnight.replace(year=last.year, month=last.month, day=last.day) + dt.timedelta(days=1)
+        return start, end, f"{first:%b %d} to {last:%b %d}"
+    if day != "today":
+        try:
+            date = dt.date.fromisoformat(day)
+            start = midnight.replace(year=date.year, month=date.month, day=date.day)
+            return start, start + dt.timedelta(days=1), f"{date:%A, %b %d}"
+        except ValueError:
+            pass
+    return midnight, midnight + dt.timedelta(days=1), "today"
+
+def _format_event(event, multi_day):
+    start = event['start'].get('dateTime', event['start'].get('date'))
+    if 'dateTime' in event['start']:
+        moment = dt.datetime.fromisoformat(start.replace('Z', '+00:00')).astimezone()
+        when = moment.strftime('%a %b %d, %I:%M %p' if multi_day else '%I:%M %p')
+    else:
+        when = dt.date.fromisoformat(start).strftime('%a %b %d, all day' if multi_day else 'All day')
+    return f"- {when}: {event.get('summary', '(no title)')}\n"
+
+def _get_synced_store():
+    """
+    Returns (store, note). The local store is synced incrementally first; if the
+    API is slow or unavailable we still answer from the last synced copy.
+    """
     service_or_error = get_calendar_service()
+    if isinstance(service_or_error, str) and 'google_token' not in st.session_state:
+        return None, service_or_error
+
+    store = get_event_store(_token_fingerprint(st.session_state.google_token))
     if isinstance(service_or_error, str):
-        return service_or_error
-    
-    # ... rest of the function is the same logic as before ...
-    # This code only runs if get_calendar_service() was successful
-    service = service_or_error
-    now = dt.datetime.utcnow()
-    time_min = now.replace(hour=0, minute=0, second=0, microsecond=0).isoformat() + 'Z'
-    
-    events_result = service.events().list(
-        calendarId='primary', timeMin=time_min, maxResults=10, 
-        singleEvents=True, orderBy='startTime'
-    ).execute()
-    events = events_result.get('items', [])
-
-    if not events:
-        return "You have no upcoming events today."
-    
-    briefing = "Here is your schedule for today:\n"
-    for event in events:
-        start = event['start'].get('dateTime', event['start'].get('date'))
-        event_time = dt.datetime.fromisoformat(start.replace('Z', '+00:00')).strftime('%I:%M %p')
-        briefing += f"- {event_time}: {event['summary']}\n"
-    return briefing
\ No newline at end of file
+        if not store.last_sync:
+            return None, service_or_error
+        return store, "(Calendar is unreachable right now, so this is from my last sync.)\n"
+
+    store.start_background_sync(service_or_error)
+    fresh = store.sync_if_stale(service_or_error)
+    return store, "" if fresh else "(Calendar is unreachable right now, so this is from my last sync.)\n"
+
+def get_daily_briefing(day="today"):
+    store, note = _get_synced_store()
+    if store is None:
+        return note
+
+    start, end, label = _resolve_window(day)
+    multi_day = (end - start) > dt.timedelta(days=1)
+
+    briefing = ""
+    for event in store.events_between(start, end):
+        briefing += _format_event(event, multi_day)
+
+    if not briefing:
+        return note + f"You have no events scheduled for {label}."
+    return note + f"Here is your schedule for {label}:\n" + briefing
+
+def get_next_event():
+    store, note = _get_synced_store()
+    if store is None:
+        return note
+
+    event = store.next_event()
+    if event is None:
+        return note + "You have nothing else coming up on your calendar."
+    return note + "Your next event is:\n" + _format_event(event, multi_day=True)
+
+def check_availability(day="today"):
+    """Lists the free time slots (and busy blocks) for a day or range."""
+    store, note = _get_synced_store()
+    if store is None:
+        return note
+
+    start, end, label = _resolve_window(day)
+    now = dt.datetime.now().astimezone()
+    if start < now < end:
+        start = now.replace(second=0, microsecond=0)
+
+    fmt = '%a %I:%M %p' if (end - start) > dt.timedelta(days=1) else '%I:%M %p'
+    busy = store.busy_intervals(start, end)
+    if not busy:
+        return note + f"You are completely free {label}."
+
+    summary = f"Here is your availability for {label}:\nBusy:\n"
+    summary += "".join(f"- {b_start.astimezone():{fmt}} to {b_end.astimezone():{fmt}}\n" for b_start, b_end in busy)
+    summary += "Free:\n"
+    summary += "".join(f"- {f_start.astimezone():{fmt}} to {f_end.astimezone():{fmt}}\n"
+                       for f_start, f_end in store.free_intervals(start, end))
+    return note + summary
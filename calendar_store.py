@@ -0,0 +1,249 @@
+# --- File: calendar_store.py ---
+# Local copy of a user's primary calendar, kept up to date with Calendar API
+# sync tokens. Briefings, "what's next" and free/busy questions are answered
+# from here instead of a live events().list call.
+
+import bisect
+import json
+import threading
+import time
+import datetime as dt
+
+from googleapiclient.errors import HttpError
+
+from tasks.sqlite_util import open_wal_connection, SharedInstances
+
+STORE_FILE_TEMPLATE = "kunnabuddy_calendar_{account}.sqlite3"
+SYNC_MAX_AGE_SECONDS = 5 * 60        # On-demand sync skips if the store is fresher than this
+BACKGROUND_SYNC_INTERVAL = 5 * 60
+SYNC_PAGE_SIZE = 250
+
+
+def _event_bounds(event):
+    """Returns (start, end) as POSIX timestamps; all-day events span local midnights."""
+    def _to_ts(value):
+        if "dateTime" in value:
+            return dt.datetime.fromisoformat(value["dateTime"].replace("Z", "+00:00")).timestamp()
+        return dt.datetime.combine(dt.date.fromisoformat(value["date"]), dt.time()).astimezone().timestamp()
+    start = _to_ts(event["start"])
+    end = _to_ts(event.get("end", event["start"]))
+    return start, max(start, end)
+
+
+class IntervalIndex:
+    """
+    Events sorted by start time. Because no event is longer than max_duration,
+    every event overlapping [lo, hi) starts in [lo - max_duration, hi), so an
+    overlap query is a bisect plus a scan of the matches: O(log n + k).
+    """
+
+    def __init__(self):
+        self._keys = []          # (start, event_id), sorted
+        self._ends = {}          # event_id -> end
+        self._starts = {}        # event_id -> start
+        self.max_duration = 0.0
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, event_id, start, end):
+        self.remove(event_id)
+        bisect.insort(self._keys, (start, event_id))
+        self._starts[event_id] = start
+        self._ends[event_id] = end
+        self.max_duration = max(self.max_duration, end - start)
+
+    def remove(self, event_id):
+        start = self._starts.pop(event_id, None)
+        if start is None:
+            return
+        del self._ends[event_id]
+        position = bisect.bisect_left(self._keys, (start, event_id))
+        del self._keys[position]
+
+    def clear(self):
+        self.__init__()
+
+    def overlapping(self, lo, hi):
+        """Event ids overlapping [lo, hi), ordered by start time."""
+        position = bisect.bisect_left(self._keys, (lo - self.max_duration, ""))
+        matches = []
+        for start, event_id in self._keys[position:]:
+            if start >= hi:
+                break
+            if self._ends[event_id] > lo or start >= lo:
+                matches.append(event_id)
+        return matches
+
+    def first_after(self, moment):
+        """The id of the first event starting at or after `moment`, or None."""
+        position = bisect.bisect_left(self._keys, (moment, ""))
+        return self._keys[position][1] if position < len(self._keys) else None
+
+
+class CalendarStore:
+    """SQLite-backed event store with an in-memory interval index."""
+
+    def __init__(self, path, calendar_id="primary"):
+        self.calendar_id = calendar_id
+        self._lock = threading.RLock()
+        self._conn = open_wal_connection(path)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS events (
+                id TEXT PRIMARY KEY, start_ts REAL NOT NULL, end_ts REAL NOT NULL, payload TEXT NOT NULL
+            )""")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS sync_state (
+                calendar_id TEXT PRIMARY KEY, sync_token TEXT, last_sync REAL
+            )""")
+        self._conn.commit()
+
+        self._events = {}
+        self._index = IntervalIndex()
+        for event_id, start, end, payload in self._conn.execute("SELECT id, start_ts, end_ts, payload FROM events"):
+            self._events[event_id] = json.loads(payload)
+            self._index.add(event_id, start, end)
+
+        row = self._conn.execute(
+            "SELECT sync_token, last_sync FROM sync_state WHERE calendar_id = ?", (calendar_id,)
+        ).fetchone()
+        self.sync_token, self.last_sync = row if row else (None, 0.0)
+        self._background_thread = None
+        self._stop_background = threading.Event()
+
+    # --- Sync ---
+
+    def _apply(self, event):
+        event_id = event["id"]
+        if event.get("status") == "cancelled":
+            self._events.pop(event_id, None)
+            self._index.remove(event_id)
+            self._conn.execute("DELETE FROM events WHERE id = ?", (event_id,))
+            return
+        start, end = _event_bounds(event)
+        self._events[event_id] = event
+        self._index.add(event_id, start, end)
+        self._conn.execute("INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?)",
+                           (event_id, start, end, json.dumps(event)))
+
+    def _reset(self):
+        self._events.clear()
+        self._index.clear()
+        self._conn.execute("DELETE FROM events")
+        self.sync_token = None
+
+    def sync(self, service):
+        """
+        Pulls changes since the stored sync token (or everything if there is
+        none). A token the server has invalidated (HTTP 410) triggers a full
+        resync. Returns the number of changed events.
+        """
+        with self._lock:
+            try:
+                return self._sync_pages(service)
+            except HttpError as e:
+                if getattr(e, "resp", None) is None or e.resp.status != 410:
+                    raise
+                print("INFO: Calendar sync token expired. Running a full resync.")
+                self._reset()
+                return self._sync_pages(service)
+
+    def _sync_pages(self, service):
+        changed, page_token = 0, None
+        while True:
+            # Incremental results always include deleted events as "cancelled".
+            params = {"calendarId": self.calendar_id, "singleEvents": True, "maxResults": SYNC_PAGE_SIZE}
+            if page_token:
+                params["pageToken"] = page_token
+            elif self.sync_token:
+                params["syncToken"] = self.sync_token
+            result = service.events().list(**params).execute()
+            for event in result.get("items", []):
+                self._apply(event)
+                changed += 1
+            page_token = result.get("nextPageToken")
+            if not page_token:
+                break
+
+        self.sync_token = result.get("nextSyncToken", self.sync_token)
+        self.last_sync = time.time()
+        self._conn.execute("INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?)",
+                           (self.calendar_id, self.sync_token, self.last_sync))
+        self._conn.commit()
+        return changed
+
+    def sync_if_stale(self, service, max_age=SYNC_MAX_AGE_SECONDS):
+        """Syncs only if the last successful sync is older than max_age. Returns True if fresh."""
+        if time.time() - self.last_sync < max_age:
+            return True
+        try:
+            self.sync(service)
+            return True
+        except Exception as e:
+            print(f"❌ Calendar sync failed, answering from the local store: {e}")
+            return False
+
+    def start_background_sync(self, service, interval=BACKGROUND_SYNC_INTERVAL):
+        """Keeps the store fresh on a daemon thread. Safe to call more than once."""
+        if self._background_thread and self._background_thread.is_alive():
+            return
+
+        def _loop():
+            while not self._stop_background.is_set():
+                self.sync_if_stale(service, max_age=0)
+                self._stop_background.wait(interval)
+
+        self._stop_background.clear()
+        self._background_thread = threading.Thread(target=_loop, daemon=True)
+        self._background_thread.start()
+
+    def stop_background_sync(self):
+        self._stop_background.set()
+
+    # --- Queries ---
+
+    def events_between(self, start, end):
+        """Events overlapping [start, end) (aware datetimes), ordered by start."""
+        with self._lock:
+            ids = self._index.overlapping(start.timestamp(), end.timestamp())
+            return [self._events[event_id] for event_id in ids]
+
+    def next_event(self, after=None):
+        with self._lock:
+            moment = (after or dt.datetime.now().astimezone()).timestamp()
+            event_id = self._index.first_after(moment)
+            return self._events[event_id] if event_id else None
+
+    def busy_intervals(self, start, end):
+        """Merged (start, end) datetimes during which at least one event is running."""
+        merged = []
+        for event in self.events_between(start, end):
+            if event.get("transparency") == "transparent":
+                continue   # "Show me as available"
+            lo, hi = _event_bounds(event)
+            lo, hi = max(lo, start.timestamp()), min(hi, end.timestamp())
+            if merged and lo <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], hi)
+            else:
+                merged.append([lo, hi])
+        tz = start.tzinfo
+        return [(dt.datetime.fromtimestamp(lo, tz), dt.datetime.fromtimestamp(hi, tz)) for lo, hi in merged]
+
+    def free_intervals(self, start, end):
+        """Gaps in [start, end) not covered by busy_intervals."""
+        free, cursor = [], start
+        for busy_start, busy_end in self.busy_intervals(start, end):
+            if busy_start > cursor:
+                free.append((cursor, busy_start))
+            cursor = max(cursor, busy_end)
+        if cursor < end:
+            free.append((cursor, end))
+        return free
+
+
+_stores = SharedInstances(lambda account_key: CalendarStore(STORE_FILE_TEMPLATE.format(account=account_key[:16])))
+
+
+def get_event_store(account_key):
+    """Returns the (process-wide) store for one account, loading it from disk on first use."""
+    return _stores.get(account_key)
@@ -1,16 +1,19 @@
 # --- File: dispatcher.py (COMPLETE AND CORRECTED) ---
 
 # These imports are now correct and match the available functions
-from gemini_helper import ask_gemini
+from gemini_helper import ask_gemini, ask_gemini_stream
 from google_search import google_search
 # The broken 'create_calendar_event' import is now REMOVED
-from calendar_helper import get_daily_briefing
+from calendar_helper import get_daily_briefing, get_next_event, check_availability
 from memory_helper import remember_info, recall_info, forget_info
 
-def dispatch_command(command_data, user_prompt):
+def dispatch_command(command_data, user_prompt, stream=False):
     """
     Executes the command determined by the agent_router.
     This version is now in sync with all other helper files.
+
+    With stream=True, general chat returns a generator of text fragments
+    instead of a string so the caller can start speaking early.
     """
     command = command_data.get("command")
     params = command_data.get("params", {})
@@ -19,10 +22,16 @@ def dispatch_command(command_data, user_prompt):
 
     try:
         if command == "google_search":
-            return google_search(params.get("query"))
+            return google_search(params.get("query"), deep=bool(params.get("deep", False)))
         
         elif command == "get_daily_briefing":
             return get_daily_briefing(params.get("day", "today"))
+
+        elif command == "get_next_event":
+            return get_next_event()
+
+        elif command == "check_availability":
+            return check_availability(params.get("day", "today"))
             
         # The entire block for the broken function is now REMOVED
         # elif command == "create_calendar_event": ...
@@ -37,11 +46,14 @@ def dispatch_command(command_data, user_prompt):
             return forget_info(params.get("key"))
 
         elif command == "general_chat":
-            return ask_gemini(user_prompt)
+            if stream:
+                return ask_gemini_stream(user_prompt)
+            # Chat should stay fresh, so it bypasses the response cache.
+            return ask_gemini(user_prompt, use_cache=False)
             
         else:
             # Fallback for any unknown commands
-            return ask_gemini(f"The command '{command}' is unknown. Please answer this user prompt directly: {user_prompt}")
+            return ask_gemini(f"The command '{command}' is unknown. Please answer this user prompt directly: {user_prompt}", use_cache=False)
             
     except Exception as e:
         print(f"❌ Error during command dispatch: {e}")
@@ -0,0 +1,107 @@
+# File: evaluate_router.py
+# Offline accuracy/latency report for the local intent classifier.
+# Run: python evaluate_router.py
+import time
+from collections import Counter
+from intent_classifier import classify_intent, CONFIDENCE_THRESHOLD
+
+# Labelled prompts that are NOT part of the classifier's training examples.
+# An expected label of None means the prompt must fall back to the LLM.
+EVAL_CORPUS = [
+    ("what's on my calendar tomorrow", "get_daily_briefing"),
+    ("check my schedule for today", "get_daily_briefing"),
+    ("do i have any meetings today", "get_daily_briefing"),
+    ("show me tomorrow's agenda", "get_daily_briefing"),
+    ("what events do i have today", "get_daily_briefing"),
+    ("am i busy tomorrow", "check_availability"),
+    ("am i free tomorrow", "check_availability"),
+    ("when am i free tomorrow", "check_availability"),
+    ("what's my availability next week", "check_availability"),
+    ("what's after this on my calendar", "get_next_event"),
+    ("when's my next meeting", "get_next_event"),
+    ("remember my locker code is 42", "remember_info"),
+    ("please remember that the garage code is 7781", "remember_info"),
+    ("note that my passport number is x1234567", "remember_info"),
+    ("store that the spare key is under the mat", "remember_info"),
+    ("what's my locker code", "recall_info"),
+    ("what is my passport number?", "recall_info"),
+    ("do you remember my garage code", "recall_info"),
+    ("recall the spare key", "recall_info"),
+    ("forget my passport number", "forget_info"),
+    ("delete the garage code", "forget_info"),
+    ("please forget about the spare key", "forget_info"),
+    ("search for cheap flights to goa", "google_search"),
+    ("look up the population of japan", "google_search"),
+    ("google latest cricket score", "google_search"),
+    ("who won the oscar for best picture", "google_search"),
+    ("what's the weather tomorrow in mumbai", "google_search"),
+    ("latest news on electric cars", "google_search"),
+    ("how far is the moon from earth", "google_search"),
+    ("price of bitcoin today", "google_search"),
+    ("hi", "general_chat"),
+    ("good morning", "general_chat"),
+    ("thank you!", "general_chat"),
+    ("tell me a funny joke", "general_chat"),
+    ("write a short poem about rain", "general_chat"),
+    ("help me write a birthday message", "general_chat"),
+    ("i'm feeling tired today", "general_chat"),
+    # Calendar questions shaped like memory recall ("what's my X")
+    ("what is my agenda for this week", "get_daily_briefing"),
+    ("what's my schedule today", "get_daily_briefing"),
+    ("what's my next meeting", "get_next_event"),
+    # No key to act on: must go to the LLM, not a local memory command
+    ("forget it", None),
+    # Calendar words without first-person context are not the user's calendar
+    ("what is the schedule for the world cup", "google_search"),
+    ("any news about the apple event", "google_search"),
+    ("what is my calendar password", "recall_info"),
+    ("delete my calendar event tomorrow", None),
+    ("what is next for spacex", "google_search"),
+    ("tell me about the next event in formula 1", "google_search"),
+    ("check the availability of hotels in goa", "google_search"),
+]
+
+
+def _percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def main(repeats=200):
+    latencies_us = []
+    handled = correct = 0
+    confusion = Counter()
+
+    for prompt, expected in EVAL_CORPUS:
+        for _ in range(repeats):
+            start = time.perf_counter()
+            command_data, confidence = classify_intent(prompt)
+            latencies_us.append((time.perf_counter() - start) * 1e6)
+
+        if command_data and confidence >= CONFIDENCE_THRESHOLD:
+            handled += 1
+            predicted = command_data["command"]
+            if predicted == expected:
+                correct += 1
+            else:
+                confusion[(expected or "LLM fallback", predicted)] += 1
+        elif expected is not None:
+            confusion[(expected, "LLM fallback")] += 1
+
+    latencies_us.sort()
+    total = len(EVAL_CORPUS)
+    print("--- Local Router Report ---")
+    print(f"Prompts evaluated:        {total}")
+    print(f"Confidence threshold:     {CONFIDENCE_THRESHOLD}")
+    print(f"Handled locally:          {handled} ({handled / total:.0%})")
+    print(f"Accuracy when handled:    {correct / handled:.0%}" if handled else "Accuracy when handled:    n/a")
+    print(f"Latency p50 / p99 / max:  {_percentile(latencies_us, 50):.1f} / "
+          f"{_percentile(latencies_us, 99):.1f} / {latencies_us[-1]:.1f} µs")
+    if confusion:
+        print("\nMisses (expected -> got):")
+        for (expected, got), count in confusion.most_common():
+            print(f"- {expected} -> {got}: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+# File: fake_servers.py
+# Local stand-ins for the external APIs KunnaBuddy talks to, for load tests
+# and benchmarks. Each server runs on a background thread on 127.0.0.1.
+#
+#   with FakeGeminiServer(latency=0.2, error_rate=0.3) as server:
+#       generate = make_rest_generate("test-key", "gemini-1.5-flash", api_base=server.url)
+
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _FakeServer:
+    """Starts a ThreadingHTTPServer with the subclass's handler on a free port."""
+
+    def __init__(self):
+        self.counters = Counter()
+        self._httpd = None
+        self._thread = None
+
+    def handle(self, handler, method):
+        raise NotImplementedError
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real APIs
+
+            def do_GET(self):
+                server.handle(self, "GET")
+
+            def do_POST(self):
+                server.handle(self, "POST")
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    @staticmethod
+    def read_json(handler):
+        length = int(handler.headers.get("Content-Length") or 0)
+        return json.loads(handler.rfile.read(length) or b"{}")
+
+    @staticmethod
+    def send_json(handler, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class FakeGeminiServer(_FakeServer):
+    """
+    Mimics POST /v1beta/models/<model>:generateContent. Every request waits
+    `latency` seconds; a fraction `error_rate` is answered with HTTP 429.
+    """
+
+    def __init__(self, latency=0.1, error_rate=0.0, reply=None):
+        super().__init__()
+        self.latency = latency
+        self.error_rate = error_rate
+        self.reply = reply or (lambda prompt: f"Echo: {prompt[:50]}")
+
+    def handle(self, handler, method):
+        body = self.read_json(handler)
+        self.counters["requests"] += 1
+        time.sleep(self.latency)
+        if random.random() < self.error_rate:
+            self.counters["429"] += 1
+            self.send_json(handler, 429, {"error": {"code": 429, "status": "RESOURCE_EXHAUSTED"}})
+            return
+        prompt = body["contents"][0]["parts"][0]["text"]
+        self.send_json(handler, 200, {
+            "candidates": [{"content": {"parts": [{"text": self.reply(prompt)}], "role": "model"}}]
+        })
+
+
+class FakeSerperServer(_FakeServer):
+    """Mimics POST /search on google.serper.dev, returning `results` organic hits per query."""
+
+    def __init__(self, latency=0.05, results=8):
+        super().__init__()
+        self.latency = latency
+        self.results = results
+
+    def handle(self, handler, method):
+        query = self.read_json(handler).get("q", "")
+        self.counters["requests"] += 1
+        time.sleep(self.latency)
+        organic = [{
+            "title": f"{query.title()} - result {i + 1}",
+            "link": f"https://example.com/{i + 1}",
+            "snippet": f"Snippet {i + 1} about {query}: details, background and the latest updates.",
+            "position": i + 1,
+        } for i in range(self.results)]
+        self.send_json(handler, 200, {
+            "searchParameters": {"q": query, "type": "search", "engine": "google"},
+            "organic": organic,
+        })
+
+
+class FakeCalendarServer(_FakeServer):
+    """
+    Mimics GET /calendar/v3/calendars/primary/events: timeMin/timeMax
+    filtering, pageToken paging and syncToken incremental sync (with 410 for
+    invalidated tokens). Start the client with CALENDAR_API_ENDPOINT=server.url + "/".
+    """
+
+    def __init__(self, events=(), latency=0.0, page_size=250):
+        super().__init__()
+        self.latency = latency
+        self.page_size = page_size
+        self.events = {}
+        self._changes = []          # event ids in modification order; syncToken = offset
+        self._token_floor = 0       # tokens below this answer 410 Gone
+        for event in events:
+            self.upsert_event(event)
+
+    @staticmethod
+    def make_event(event_id, summary, start, end):
+        return {"id": event_id, "summary": summary, "status": "confirmed",
+                "start": {"dateTime": start.isoformat()}, "end": {"dateTime": end.isoformat()}}
+
+    def upsert_event(self, event):
+        self.events[event["id"]] = event
+        self._changes.append(event["id"])
+
+    def delete_event(self, event_id):
+        self.events[event_id] = {**self.events[event_id], "status": "cancelled"}
+        self._changes.append(event_id)
+
+    def invalidate_sync_tokens(self):
+        self._token_floor = len(self._changes)
+
+    def handle(self, handler, method):
+        from datetime import datetime
+        from urllib.parse import urlparse, parse_qs
+
+        url = urlparse(handler.path)
+        if not url.path.endswith("/events"):
+            self.send_json(handler, 404, {"error": {"code": 404, "message": "Not Found"}})
+            return
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        self.counters["requests"] += 1
+        time.sleep(self.latency)
+
+        def _parse(value):
+            return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+        if "syncToken" in params:
+            since = int(params["syncToken"])
+            if since < self._token_floor:
+                self.counters["410"] += 1
+                self.send_json(handler, 410, {"error": {"code": 410, "message": "Sync token is no longer valid"}})
+                return
+            changed = dict.fromkeys(self._changes[since:])
+            items = [self.events[event_id] for event_id in changed]
+        else:
+            items = [e for e in self.events.values() if e.get("status") != "cancelled"]
+            if "timeMin" in params:
+                items = [e for e in items if _parse(e["end"]["dateTime"]) > _parse(params["timeMin"])]
+            if "timeMax" in params:
+                items = [e for e in items if _parse(e["start"]["dateTime"]) < _parse(params["timeMax"])]
+            items.sort(key=lambda e: _parse(e["start"]["dateTime"]))
+
+        offset = int(params.get("pageToken", 0))
+        page_size = min(int(params.get("maxResults", 250)), self.page_size)
+        payload = {"kind": "calendar#events", "items": items[offset:offset + page_size]}
+        if offset + page_size < len(items):
+            payload["nextPageToken"] = str(offset + page_size)
+        else:
+            payload["nextSyncToken"] = str(len(self._changes))
+        self.send_json(handler, 200, payload)
+
+
+class FakeQuoteServer(_FakeServer):
+    """
+    Mimics a batch quote API: GET /quotes?symbols=A,B -> {"quotes": {"A": 101.2, ...}}.
+    Prices random-walk by up to `volatility` (relative) per request; symbols
+    listed in `unknown` get null. Each request costs `latency` seconds,
+    however many symbols it asks for.
+    """
+
+    def __init__(self, latency=0.05, volatility=0.002, unknown=()):
+        super().__init__()
+        self.latency = latency
+        self.volatility = volatility
+        self.unknown = {s.upper() for s in unknown}
+        self.prices = {}
+
+    def set_price(self, symbol, price):
+        self.prices[symbol.upper()] = float(price)
+
+    def handle(self, handler, method):
+        from urllib.parse import urlparse, parse_qs
+
+        url = urlparse(handler.path)
+        if url.path != "/quotes":
+            self.send_json(handler, 404, {"error": {"code": 404, "message": "Not Found"}})
+            return
+        symbols = [s for s in parse_qs(url.query).get("symbols", [""])[0].upper().split(",") if s]
+        self.counters["requests"] += 1
+        self.counters["symbols"] += len(symbols)
+        time.sleep(self.latency)
+        quotes = {}
+        for symbol in symbols:
+            if symbol in self.unknown:
+                quotes[symbol] = None
+                continue
+            price = self.prices.get(symbol) or random.uniform(10, 500)
+            self.prices[symbol] = round(price * (1 + random.uniform(-self.volatility, self.volatility)), 4)
+            quotes[symbol] = self.prices[symbol]
+        self.send_json(handler, 200, {"quotes": quotes})
@@ -1,6 +1,18 @@
 # --- File: gemini_helper.py ---
+import os
+import threading
 import streamlit as st
 import google.generativeai as genai
+from llm_cache import get_response_cache, make_cache_key, CALL_SITE_TTLS
+from llm_client import AsyncLLMClient, RequestLimiter, make_rest_generate
+from singleflight import get_group, get_async_group
+
+MODEL_NAME = 'gemini-1.5-flash'
+
+# One set of Gemini limits for the whole process: every Streamlit session
+# thread, every event loop and both the sync and async APIs share the same
+# concurrency slots and token bucket.
+_limiter = RequestLimiter()
 
 @st.cache_resource
 def get_gemini_model():
@@ -8,20 +20,122 @@ def get_gemini_model():
     try:
         api_key = st.secrets["GOOGLE_API_KEY"]
         genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-1.5-flash')
+        model = genai.GenerativeModel(MODEL_NAME)
         return model
     except Exception as e:
         st.error(f"Fatal Error: Could not configure Gemini model. Please check GOOGLE_API_KEY in secrets. Error: {e}")
         return None
 
-def ask_gemini(prompt_text):
-    """Sends a prompt to the Gemini model and returns the response text."""
+def ask_gemini(prompt_text, call_site="default", use_cache=True):
+    """
+    Sends a prompt to the Gemini model and returns the response text.
+
+    Args:
+        prompt_text (str): The prompt to send.
+        call_site (str): Which feature is asking (e.g. "router", "search"). Selects the cache TTL.
+        use_cache (bool): Set to False for answers that should stay non-deterministic (chat).
+    """
+    cache_key = None
+    if use_cache:
+        cache_key = make_cache_key(MODEL_NAME, prompt_text)
+        cached = get_response_cache().get(cache_key, call_site)
+        if cached is not None:
+            return cached
+
+    if cache_key is None:
+        return _generate(prompt_text)
+
+    # Identical prompts already in flight (e.g. several sessions asking for the
+    # same news) wait for that request instead of sending their own.
+    def _generate_and_cache():
+        text = _generate(prompt_text)
+        if text is not None and not text.startswith(_ERROR_PREFIXES):
+            ttl = CALL_SITE_TTLS.get(call_site, CALL_SITE_TTLS["default"])
+            get_response_cache().put(cache_key, MODEL_NAME, text, call_site, ttl)
+        return text
+
+    return get_group("gemini").do(cache_key, _generate_and_cache)
+
+_MODEL_UNAVAILABLE = "The AI model is not available due to a configuration error."
+_ERROR_PREFIXES = (_MODEL_UNAVAILABLE, "An error occurred while communicating with the AI model")
+
+def _generate(prompt_text):
     model = get_gemini_model()
     if model is None:
-        return "The AI model is not available due to a configuration error."
-    
+        return _MODEL_UNAVAILABLE
+
     try:
-        response = model.generate_content(prompt_text)
+        with _limiter.slot():
+            response = model.generate_content(prompt_text)
         return response.text
     except Exception as e:
-        return f"An error occurred while communicating with the AI model: {e}"
\ No newline at end of file
+        return f"An error occurred while communicating with the AI model: {e}"
+
+def ask_gemini_stream(prompt_text):
+    """
+    Streams the Gemini response, yielding text fragments as they are generated.
+    Streaming responses are never cached (they are only used for live chat).
+    """
+    model = get_gemini_model()
+    if model is None:
+        yield _MODEL_UNAVAILABLE
+        return
+
+    try:
+        for chunk in model.generate_content(prompt_text, stream=True):
+            if chunk.text:
+                yield chunk.text
+    except Exception as e:
+        yield f"An error occurred while communicating with the AI model: {e}"
+
+# --- ============================= ---
+# ---         ASYNC API             ---
+# --- ============================= ---
+
+# The in-tree callers (Streamlit sessions, the CLI) are thread-based and use
+# ask_gemini, which waits on the same limiter. ask_gemini_async is the entry
+# point for asyncio code (and benchmark_llm_client.py's load test); it can be
+# called from any event loop in any thread.
+_async_client = None
+_async_client_lock = threading.Lock()
+
+def get_async_client():
+    """Returns the process-wide AsyncLLMClient, creating it on first use."""
+    global _async_client
+    with _async_client_lock:
+        if _async_client is None:
+            api_key = os.environ.get("GOOGLE_API_KEY") or st.secrets["GOOGLE_API_KEY"]
+            _async_client = AsyncLLMClient(make_rest_generate(api_key, MODEL_NAME), limiter=_limiter)
+        return _async_client
+
+def get_llm_limiter_metrics():
+    """Queue depth and wait time for the process-wide Gemini limits."""
+    return _limiter.get_metrics()
+
+async def ask_gemini_async(prompt_text, call_site="default", use_cache=True):
+    """
+    asyncio version of ask_gemini. Shares the response cache and the
+    process-wide concurrency/rate limits, and retries transient failures.
+
+    Raises:
+        LLMRequestError: if the request fails permanently or exhausts its retries.
+    """
+    cache_key = None
+    if use_cache:
+        cache_key = make_cache_key(MODEL_NAME, prompt_text)
+        cached = get_response_cache().get(cache_key, call_site)
+        if cached is not None:
+            return cached
+
+    client = get_async_client()
+    if cache_key is None:
+        return await client.ask(prompt_text)
+
+    async def _ask_and_cache():
+        text = await client.ask(prompt_text)
+        ttl = CALL_SITE_TTLS.get(call_site, CALL_SITE_TTLS["default"])
+        get_response_cache().put(cache_key, MODEL_NAME, text, call_site, ttl)
+        return text
+
+    # Coalesced across every event loop in the process, like the sync path
+    return await get_async_group("gemini-async").do(cache_key, _ask_and_cache)
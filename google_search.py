@@ -1,30 +1,154 @@
 # --- File: google_search.py ---
+import os
+import threading
+import time
 import requests
 import json
 import streamlit as st
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from gemini_helper import ask_gemini
+from singleflight import get_group
+from search_ranking import expand_query, dedupe_snippets, bm25_rank, select_within_budget
 
-def google_search(query: str):
+SERPER_URL = os.environ.get("SERPER_URL", "https://google.serper.dev/search")
+
+# Connection pool tuning for the shared session
+POOL_CONNECTIONS = 4        # Distinct hosts kept in the pool
+POOL_MAXSIZE = 16           # Keep-alive connections per host (≈ concurrent sessions)
+REQUEST_TIMEOUT = 15
+
+# How long raw Serper results stay reusable. The synthesized answer has its own
+# TTL in llm_cache.CALL_SITE_TTLS["search"], so the two expire independently.
+RESULTS_TTL_SECONDS = 10 * 60
+RESULTS_CACHE_MAX_ENTRIES = 512
+
+# Deep (multi-query) mode: snippets passed to Gemini must fit this budget
+SNIPPET_TOKEN_BUDGET = 600
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_http_session():
+    """Returns the process-wide keep-alive session used for Serper calls."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+class _TTLCache:
+    """Small thread-safe TTL cache; the oldest entry is dropped when full."""
+
+    def __init__(self, ttl, max_entries):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = self.misses = 0
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self._data.pop(key, None)
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        with self._lock:
+            if key not in self._data and len(self._data) >= self.max_entries:
+                self._data.pop(next(iter(self._data)))
+            self._data[key] = (time.monotonic() + self.ttl, value)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+_results_cache = _TTLCache(RESULTS_TTL_SECONDS, RESULTS_CACHE_MAX_ENTRIES)
+
+def _normalize_query(query):
+    return " ".join(query.lower().split())
+
+def fetch_search_results(query, api_key):
+    """Returns the raw Serper JSON for a query, served from the TTL cache when fresh."""
+    key = _normalize_query(query)
+    results = _results_cache.get(key)
+    if results is None:
+        response = get_http_session().post(
+            SERPER_URL, timeout=REQUEST_TIMEOUT,
+            headers={'X-API-KEY': api_key, 'Content-Type': 'application/json'},
+            data=json.dumps({"q": query}),
+        )
+        response.raise_for_status()
+        results = response.json()
+        _results_cache.put(key, results)
+    return results
+
+def get_search_cache_stats():
+    return {"hits": _results_cache.hits, "misses": _results_cache.misses}
+
+def google_search(query: str, deep=False):
+    """
+    Searches the web and has Gemini answer from the results.
+
+    With deep=True the question is expanded into several sub-queries that are
+    searched concurrently; results are de-duplicated and ranked locally, and
+    only the best snippets within SNIPPET_TOKEN_BUDGET go into the prompt.
+    """
+    # Concurrent identical searches (e.g. a burst of morning-news questions)
+    # share one Serper call and one synthesis.
+    handler = _deep_search_and_answer if deep else _search_and_answer
+    key = ("deep:" if deep else "") + _normalize_query(query)
+    return get_group("search").do(key, lambda: handler(query))
+
+def _build_context(query, snippets):
+    context = f"Based on these search results, answer the user's query: '{query}'\n\n"
+    for result in snippets:
+        context += f"Title: {result.get('title')}\nSnippet: {result.get('snippet')}\n---\n"
+    return context
+
+def _search_and_answer(query: str):
     api_key = st.secrets.get("SERPER_API_KEY")
     if not api_key:
         return "ERROR: SERPER_API_KEY is missing from Streamlit secrets. I cannot perform a web search."
 
-    url = "https://google.serper.dev/search"
-    payload = json.dumps({"q": query})
-    headers = {'X-API-KEY': api_key, 'Content-Type': 'application/json'}
-
     try:
-        response = requests.post(url, headers=headers, data=payload)
-        response.raise_for_status()
-        results = response.json()
-        
+        results = fetch_search_results(query, api_key)
+
         if not results.get("organic"):
             return f"I searched for '{query}' but found no results."
 
-        context = f"Based on these search results, answer the user's query: '{query}'\n\n"
-        for result in results["organic"][:5]:
-            context += f"Title: {result.get('title')}\nSnippet: {result.get('snippet')}\n---\n"
-        
-        return ask_gemini(context)
+        return ask_gemini(_build_context(query, results["organic"][:5]), call_site="search")
+    except Exception as e:
+        return f"API ERROR: The web search failed. This could be due to an invalid API key or a billing issue. Error: {e}"
+
+def _deep_search_and_answer(query: str):
+    api_key = st.secrets.get("SERPER_API_KEY")
+    if not api_key:
+        return "ERROR: SERPER_API_KEY is missing from Streamlit secrets. I cannot perform a web search."
+
+    try:
+        sub_queries = expand_query(query)
+        print(f"INFO: Deep search fan-out: {sub_queries}")
+        # The pooled session is thread-safe, so sub-queries run concurrently and
+        # wall-clock time stays close to a single query.
+        with ThreadPoolExecutor(max_workers=len(sub_queries)) as pool:
+            result_sets = list(pool.map(lambda q: fetch_search_results(q, api_key), sub_queries))
+
+        snippets = [hit for results in result_sets for hit in results.get("organic", [])]
+        if not snippets:
+            return f"I searched for '{query}' but found no results."
+
+        ranked = bm25_rank(query, dedupe_snippets(snippets))
+        selected = select_within_budget(ranked, SNIPPET_TOKEN_BUDGET)
+        print(f"INFO: Deep search kept {len(selected)} of {len(snippets)} snippets.")
+        return ask_gemini(_build_context(query, selected), call_site="search")
     except Exception as e:
-        return f"API ERROR: The web search failed. This could be due to an invalid API key or a billing issue. Error: {e}"
\ No newline at end of file
+        return f"API ERROR: The web search failed. This could be due to an invalid API key or a billing issue. Error: {e}"
@@ -0,0 +1,277 @@
+# --- File: intent_classifier.py ---
+# Local fast path for the router. Common commands are resolved here in
+# microseconds; anything we are not confident about still goes to Gemini.
+
+import math
+import re
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+
+# Below this confidence agent_router falls back to the LLM.
+CONFIDENCE_THRESHOLD = 0.80
+
+# --- ============================= ---
+# ---   TIER 1: PATTERN / SLOTS     ---
+# --- ============================= ---
+
+_FILLER = r"(?:please\s+|can you\s+|could you\s+|hey\s+kunnabuddy[,\s]+|kunnabuddy[,\s]+)*"
+
+_REMEMBER_RE = re.compile(
+    rf"^{_FILLER}(?:remember|note|save|store|keep in mind)(?:\s+that)?\s+(?:my\s+|the\s+)?(?P<key>.+?)\s+(?:is|are|=)\s+(?P<value>.+?)[.!]?$"
+)
+_FORGET_RE = re.compile(
+    rf"^{_FILLER}(?:forget|delete|remove|erase)(?:\s+about|\s+what you know about)?\s+(?:my\s+|the\s+)?(?P<key>.+?)[.!]?$"
+)
+_RECALL_RE = re.compile(
+    rf"^{_FILLER}(?:what(?:'s|\s+is|\s+are|\s+was)\s+my|recall(?:\s+my)?|do you remember(?:\s+my)?|tell me my|remind me (?:of|what) my)\s+(?P<key>.+?)(?:\s+is)?\s*\??$"
+)
+_SEARCH_RE = re.compile(
+    rf"^{_FILLER}(?:search(?:\s+the\s+web)?(?:\s+for)?|google|look\s+up|find\s+out)\s+(?P<query>.+?)\s*\??$"
+)
+# Calendar patterns only fire on first-person context ("my calendar", "do I
+# have", "am I free"): "the world cup schedule" or "the next event in
+# formula 1" are questions for search, not for the user's calendar.
+_CALENDAR_NOUNS = r"(?:calendar|schedule|agenda|plans|meetings?|events?|appointments?|briefing)"
+_BRIEFING_RE = re.compile(
+    rf"\b(?:my|today's|tomorrow's|this week's|next week's)\s+(?:daily\s+)?{_CALENDAR_NOUNS}\b"
+    rf"|\b(?:what|which|any)\s+{_CALENDAR_NOUNS}\s+(?:do|have|did)\s+(?:i|we)\b"
+    rf"|\bdo\s+(?:i|we)\s+have\s+(?:any\s+)?{_CALENDAR_NOUNS}\b"
+    r"|\bdo\s+(?:i|we)\s+have\s+anything\s+(?:scheduled|planned|on)\b"
+)
+# Calendar nouns that are not about what is on the calendar
+_NOT_BRIEFING_RE = re.compile(
+    r"\b(?:create|add|schedule a|book|set up|delete|remove|cancel|move|reschedule"
+    r"|password|passcode|pin|login|username|account|settings|app|news|headlines|tickets?|score|results?)\b"
+)
+_NEXT_EVENT_RE = re.compile(
+    r"\bmy\s+(?:next|upcoming)\s+(?:meeting|event|appointment|call)\b"
+    r"|\b(?:what's|what is|what comes)\s+(?:next|after this)\s+(?:on|in)\s+my\s+(?:calendar|schedule|agenda|day)\b"
+    r"|\bwhat do i have (?:next|after this)\b|^(?:what's|what is) (?:next|after this)\??$"
+)
+_AVAILABILITY_RE = re.compile(
+    r"\b(?:am i|are we)\s+(?:free|available|busy|booked)\b|\bwhen am i (?:free|available)\b"
+    r"|\b(?:do\s+(?:i|we)\s+have|find\s+me)\s+(?:any\s+|an\s+|some\s+)?(?:free|open)\s+(?:time|slots?)\b"
+    r"|\bmy\s+availability\b"
+)
+# "delete my calendar event" is not a memory to forget (and has no local tool)
+_CALENDAR_ITEM_RE = re.compile(r"\b(?:calendar|meetings?|events?|appointments?)\b")
+# "forget it", "remember that": nothing to key a memory on, so these go to the LLM
+_PRONOUN_KEYS = {"it", "that", "this", "them", "those", "these", "everything", "all", "all of it", "about it"}
+_GREETING_RE = re.compile(
+    r"^(?:hi|hello|hey|yo|good (?:morning|afternoon|evening)|thanks|thank you|how are you)\b[\s!.?]*$"
+)
+
+
+def _normalize(text):
+    return re.sub(r"\s+", " ", text.strip().lower())
+
+
+def _briefing_day(text, today=None):
+    """Day (or "YYYY-MM-DD..YYYY-MM-DD" range) a calendar question is about; "today" by default."""
+    if re.search(r"\bweekend\b", text):
+        today = today or date.today()
+        saturday = today + timedelta(days=5 - today.weekday())      # yesterday on a Sunday
+        if re.search(r"\bnext weekend\b", text):
+            saturday += timedelta(days=7)
+        first = max(saturday, today)
+        return f"{first.isoformat()}..{(saturday + timedelta(days=1)).isoformat()}"
+    for day in ("tomorrow", "next week", "this week"):
+        if re.search(rf"\b{day}\b", text):
+            return day
+    return "today"
+
+
+def _match_patterns(text):
+    """Deterministic rules. Returns (command_data, confidence) or (None, 0.0)."""
+    match = _REMEMBER_RE.match(text)
+    if match and match.group("key") not in _PRONOUN_KEYS:
+        return {"command": "remember_info",
+                "params": {"key": match.group("key"), "value": match.group("value")}}, 0.98
+
+    match = _FORGET_RE.match(text)
+    if match and match.group("key") not in _PRONOUN_KEYS and not _CALENDAR_ITEM_RE.search(match.group("key")):
+        return {"command": "forget_info", "params": {"key": match.group("key")}}, 0.97
+
+    # Calendar questions before recall: "what's my schedule today" is not a stored memory
+    if _NEXT_EVENT_RE.search(text):
+        return {"command": "get_next_event", "params": {}}, 0.95
+
+    if _AVAILABILITY_RE.search(text):
+        return {"command": "check_availability", "params": {"day": _briefing_day(text)}}, 0.95
+
+    if _BRIEFING_RE.search(text) and not _NOT_BRIEFING_RE.search(text):
+        return {"command": "get_daily_briefing", "params": {"day": _briefing_day(text)}}, 0.95
+
+    match = _RECALL_RE.match(text)
+    if match and match.group("key") not in _PRONOUN_KEYS:
+        return {"command": "recall_info", "params": {"key": match.group("key")}}, 0.95
+
+    match = _SEARCH_RE.match(text)
+    if match:
+        return {"command": "google_search", "params": {"query": match.group("query")}}, 0.97
+
+    if _GREETING_RE.match(text):
+        return {"command": "general_chat", "params": {"prompt": text}}, 0.99
+
+    return None, 0.0
+
+
+# --- ============================= ---
+# ---   TIER 2: N-GRAM CLASSIFIER   ---
+# --- ============================= ---
+
+# Small seed corpus. Keep it disjoint from the evaluation set in evaluate_router.py.
+_TRAINING_EXAMPLES = [
+    ("what's on my calendar today", "get_daily_briefing"),
+    ("what do i have going on today", "get_daily_briefing"),
+    ("read me my schedule", "get_daily_briefing"),
+    ("any meetings tomorrow", "get_daily_briefing"),
+    ("what is my agenda for tomorrow", "get_daily_briefing"),
+    ("give me my daily briefing", "get_daily_briefing"),
+    ("do i have anything scheduled today", "get_daily_briefing"),
+    ("what meetings do i have", "get_daily_briefing"),
+    ("what's next on my calendar", "get_next_event"),
+    ("when is my next appointment", "get_next_event"),
+    ("what's my upcoming call", "get_next_event"),
+    ("what do i have next", "get_next_event"),
+    ("am i free tomorrow morning", "check_availability"),
+    ("am i busy this afternoon", "check_availability"),
+    ("when am i available this week", "check_availability"),
+    ("do i have any free time today", "check_availability"),
+    ("find me an open slot tomorrow", "check_availability"),
+    ("remember my locker code is 42", "remember_info"),
+    ("save that my car is parked on level 3", "remember_info"),
+    ("note that the wifi password is hunter2", "remember_info"),
+    ("keep in mind that mom's birthday is june 4", "remember_info"),
+    ("remember i left my keys in the drawer", "remember_info"),
+    ("store my gym membership number 1234", "remember_info"),
+    ("what's my locker code", "recall_info"),
+    ("where did i park my car", "recall_info"),
+    ("do you remember the wifi password", "recall_info"),
+    ("recall my gym membership number", "recall_info"),
+    ("what did i tell you about mom's birthday", "recall_info"),
+    ("what was my locker code again", "recall_info"),
+    ("forget my locker code", "forget_info"),
+    ("delete the wifi password from memory", "forget_info"),
+    ("remove what you know about my car", "forget_info"),
+    ("erase my gym membership number", "forget_info"),
+    ("you can forget about mom's birthday", "forget_info"),
+    ("who won the football match yesterday", "google_search"),
+    ("what is the weather in bangalore", "google_search"),
+    ("latest news about the stock market", "google_search"),
+    ("how tall is the eiffel tower", "google_search"),
+    ("what is the capital of australia", "google_search"),
+    ("search for the best pizza near me", "google_search"),
+    ("when does the new iphone come out", "google_search"),
+    ("who is the prime minister of india", "google_search"),
+    ("what's the exchange rate from dollars to rupees", "google_search"),
+    ("current price of gold", "google_search"),
+    ("morning news headlines", "google_search"),
+    ("when is the next formula 1 race", "google_search"),
+    ("ipl match schedule for this season", "google_search"),
+    ("upcoming concerts and events in bangalore", "google_search"),
+    ("fun things to do with kids in my free time", "google_search"),
+    ("when is apple's next product event", "google_search"),
+    ("hello there", "general_chat"),
+    ("tell me a joke", "general_chat"),
+    ("write a poem about the sea", "general_chat"),
+    ("how are you doing today", "general_chat"),
+    ("thanks a lot", "general_chat"),
+    ("can you help me write an email to my boss", "general_chat"),
+    ("explain recursion like i'm five", "general_chat"),
+    ("give me a motivational quote", "general_chat"),
+    ("i'm feeling bored", "general_chat"),
+    ("good night", "general_chat"),
+]
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+
+def _features(text):
+    tokens = _TOKEN_RE.findall(text)
+    features = list(tokens)
+    features += [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    return features
+
+
+class NgramIntentClassifier:
+    """Multinomial Naive Bayes over word unigrams and bigrams."""
+
+    def __init__(self, examples=None, alpha=0.5):
+        self.alpha = alpha
+        self._feature_counts = defaultdict(Counter)
+        self._total_counts = Counter()
+        self._label_counts = Counter()
+        self._vocabulary = set()
+        for text, label in (examples or _TRAINING_EXAMPLES):
+            self.add_example(text, label)
+
+    def add_example(self, text, label):
+        features = _features(_normalize(text))
+        self._label_counts[label] += 1
+        self._feature_counts[label].update(features)
+        self._total_counts[label] += len(features)
+        self._vocabulary.update(features)
+
+    def predict(self, text):
+        """Returns (label, probability) for the most likely intent."""
+        features = [f for f in _features(text) if f in self._vocabulary]
+        if not features:
+            return "general_chat", 0.0
+
+        total_examples = sum(self._label_counts.values())
+        vocab_size = len(self._vocabulary)
+        scores = {}
+        for label, count in self._label_counts.items():
+            denominator = self._total_counts[label] + self.alpha * vocab_size
+            score = math.log(count / total_examples)
+            for feature in features:
+                score += math.log((self._feature_counts[label][feature] + self.alpha) / denominator)
+            scores[label] = score
+
+        best = max(scores, key=scores.get)
+        # Softmax over log-scores gives a normalized confidence.
+        peak = scores[best]
+        normalizer = sum(math.exp(s - peak) for s in scores.values())
+        return best, 1.0 / normalizer
+
+
+_classifier = None
+
+
+def _get_classifier():
+    global _classifier
+    if _classifier is None:
+        _classifier = NgramIntentClassifier()
+    return _classifier
+
+
+def classify_intent(user_prompt):
+    """
+    Routes a prompt without calling the LLM.
+
+    Returns:
+        tuple: (command_data, confidence). command_data is None when the local
+        tiers cannot produce a complete command (e.g. a memory intent whose
+        key/value could not be extracted).
+    """
+    text = _normalize(user_prompt or "")
+    if not text:
+        return None, 0.0
+
+    command_data, confidence = _match_patterns(text)
+    if command_data:
+        return command_data, confidence
+
+    label, confidence = _get_classifier().predict(text)
+    # Only intents whose parameters can be derived from the prompt itself are
+    # answered here; memory commands need the slot extractor above.
+    if label == "google_search":
+        return {"command": label, "params": {"query": user_prompt}}, confidence
+    if label == "general_chat":
+        return {"command": label, "params": {"prompt": user_prompt}}, confidence
+    if label in ("get_daily_briefing", "check_availability"):
+        return {"command": label, "params": {"day": _briefing_day(text)}}, confidence
+    if label == "get_next_event":
+        return {"command": label, "params": {}}, confidence
+    return None, confidence
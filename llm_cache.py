@@ -0,0 +1,144 @@
+# --- File: llm_cache.py ---
+# Persistent, content-addressed cache for LLM responses (SQLite on local disk).
+
+import hashlib
+import re
+import threading
+import time
+from collections import Counter
+
+from tasks.sqlite_util import open_wal_connection, SharedInstances
+
+CACHE_FILE = "kunnabuddy_llm_cache.sqlite3"
+MAX_CACHE_BYTES = 50 * 1024 * 1024
+
+# Seconds a response stays valid, per call site. None = never expires.
+CALL_SITE_TTLS = {
+    "default": 6 * 3600,
+    "router": 24 * 3600,
+    "search": 15 * 60,
+    "file_summary": 30 * 24 * 3600,
+    "meeting_summary": 30 * 24 * 3600,
+}
+
+# Timestamps such as the router's "Current time: 2024-05-01 09:13:52" would make
+# every prompt unique. They are reduced to the date before hashing, or to the
+# minute when the prompt asks for a time relative to now ("remind me in 10
+# minutes"): the right answer to those changes with the clock.
+_TIMESTAMP_RE = re.compile(r"(\d{4}-\d{2}-\d{2})[ T](\d{2}:\d{2})(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?")
+_RELATIVE_TIME_RE = re.compile(
+    r"\b(?:in|after|within)\s+(?:[\w.-]+\s+|\d+\s*){1,3}?(?:seconds?|secs?|minutes?|mins?|hours?|hrs?)\b"
+    r"|\bnow\b|\bnext\s+(?:few\s+)?(?:minute|hour)s?\b",
+    re.IGNORECASE,
+)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def canonicalize_prompt(prompt_text):
+    """Strips volatile fields and insignificant whitespace from a prompt."""
+    precision = r"\1 \2" if _RELATIVE_TIME_RE.search(prompt_text) else r"\1"
+    text = _TIMESTAMP_RE.sub(precision, prompt_text)
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def make_cache_key(model_name, prompt_text):
+    canonical = canonicalize_prompt(prompt_text)
+    return hashlib.sha256(f"{model_name}\x00{canonical}".encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed cache with per-entry TTLs and LRU eviction by total size."""
+
+    def __init__(self, path=CACHE_FILE, max_bytes=MAX_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.stats = Counter()
+        self._lock = threading.Lock()
+        self._conn = open_wal_connection(path)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                call_site TEXT NOT NULL,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL,
+                last_access REAL NOT NULL
+            )""")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_lru ON responses(last_access)")
+        self._conn.commit()
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, key, call_site="default"):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, expires_at, size FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.stats[f"{call_site}.miss"] += 1
+                return None
+            response, expires_at, size = row
+            if expires_at is not None and expires_at < now:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self._total_bytes -= size
+                self.stats[f"{call_site}.expired"] += 1
+                self.stats[f"{call_site}.miss"] += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.stats[f"{call_site}.hit"] += 1
+            return response
+
+    def put(self, key, model_name, response, call_site="default", ttl=None):
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        expires_at = now + ttl if ttl else None
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, model_name, call_site, response, size, expires_at, now),
+            )
+            self._total_bytes += size - (old[0] if old else 0)
+            self._evict()
+            self._conn.commit()
+            self.stats[f"{call_site}.store"] += 1
+
+    def _evict(self):
+        """Drops expired entries, then least-recently-used ones, until under max_bytes."""
+        if self._total_bytes <= self.max_bytes:
+            return
+        self._conn.execute("DELETE FROM responses WHERE expires_at IS NOT NULL AND expires_at < ?", (time.time(),))
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        cursor = self._conn.execute("SELECT key, size FROM responses ORDER BY last_access ASC")
+        victims = []
+        for key, size in cursor:
+            if self._total_bytes <= self.max_bytes:
+                break
+            victims.append((key,))
+            self._total_bytes -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+        self.stats["evicted"] += len(victims)
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self._total_bytes = 0
+
+    def get_stats(self):
+        """Returns hit/miss counters plus the current on-disk footprint."""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["entries"] = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            stats["bytes"] = self._total_bytes
+        return stats
+
+
+_caches = SharedInstances(ResponseCache)
+
+
+def get_response_cache():
+    """Returns the process-wide cache instance, opening it on first use."""
+    return _caches.get()
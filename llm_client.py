@@ -0,0 +1,295 @@
+# --- File: llm_client.py ---
+# asyncio client for Gemini: bounded concurrency, token-bucket rate limiting and
+# jittered retries. Used by gemini_helper.ask_gemini_async. The limits live in
+# a RequestLimiter that is not bound to an event loop, so gemini_helper shares
+# one across every session thread, loop and the sync ask_gemini path.
+
+import asyncio
+import collections
+import contextlib
+import os
+import random
+import threading
+import time
+from collections import Counter
+
+import requests
+
+GEMINI_API_BASE = os.environ.get("GEMINI_API_BASE", "https://generativelanguage.googleapis.com")
+
+MAX_CONCURRENCY = 8         # Simultaneous in-flight requests
+RATE_PER_SECOND = 4.0       # Sustained request rate
+BURST = 8                   # Token bucket capacity
+MAX_RETRIES = 4
+BASE_BACKOFF = 0.5          # Seconds; doubled per attempt, with full jitter
+MAX_BACKOFF = 8.0
+REQUEST_TIMEOUT = 60
+
+_TRANSIENT_STATUS = {408, 429, 500, 502, 503, 504}
+# google-api-core exception names that mean "try again later"
+_TRANSIENT_EXCEPTIONS = {"ResourceExhausted", "ServiceUnavailable", "DeadlineExceeded",
+                         "InternalServerError", "TooManyRequests"}
+
+
+class LLMRequestError(Exception):
+    """Raised when a request fails permanently or runs out of retries."""
+
+    def __init__(self, message, status=None, transient=False):
+        super().__init__(message)
+        self.status = status
+        self.transient = transient
+
+
+def _is_transient(error):
+    if isinstance(error, LLMRequestError):
+        return error.transient
+    if isinstance(error, (requests.ConnectionError, requests.Timeout, asyncio.TimeoutError)):
+        return True
+    return type(error).__name__ in _TRANSIENT_EXCEPTIONS
+
+
+class TokenBucket:
+    """
+    Refills `rate` tokens per second up to `capacity`. Thread-safe and not tied
+    to an event loop, so one bucket limits every thread and loop in the process.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Takes a token; returns how many seconds the caller must wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1           # may go negative: later callers queue behind this reservation
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+
+class SharedSemaphore:
+    """
+    Counting semaphore usable from threads (acquire) and from any number of
+    event loops (acquire_async) at once. A release hands its slot straight to
+    the longest waiter; async waiters are woken on their own loop.
+    """
+
+    def __init__(self, value):
+        self._value = value
+        self._lock = threading.Lock()
+        self._waiters = collections.deque()     # (loop, future) or (None, threading.Event)
+
+    def acquire(self):
+        with self._lock:
+            if self._value > 0 and not self._waiters:
+                self._value -= 1
+                return
+            event = threading.Event()
+            self._waiters.append((None, event))
+        event.wait()
+
+    async def acquire_async(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._value > 0 and not self._waiters:
+                self._value -= 1
+                return
+            future = loop.create_future()
+            self._waiters.append((loop, future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters.remove((loop, future))
+                    handed_over = False
+                except ValueError:
+                    handed_over = True
+            if handed_over and future.done() and not future.cancelled():
+                self.release()          # woken just as we were cancelled: pass the slot on
+            raise
+
+    def release(self):
+        with self._lock:
+            while self._waiters:
+                loop, waiter = self._waiters.popleft()
+                if loop is None:
+                    waiter.set()
+                    return
+                try:
+                    loop.call_soon_threadsafe(self._wake, waiter)
+                    return
+                except RuntimeError:
+                    continue            # that loop has closed
+            self._value += 1
+
+    def _wake(self, future):
+        if future.cancelled():
+            self.release()              # its task went away before it got the slot
+        else:
+            future.set_result(None)
+
+
+class RequestLimiter:
+    """
+    Concurrency limit plus token bucket for one upstream API, shared by every
+    thread and event loop that talks to it. Tracks queue depth and wait time.
+    """
+
+    def __init__(self, max_concurrency=MAX_CONCURRENCY, rate_per_second=RATE_PER_SECOND, burst=BURST):
+        self._semaphore = SharedSemaphore(max_concurrency)
+        self._bucket = TokenBucket(rate_per_second, burst)
+        self._lock = threading.Lock()
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.acquired = 0
+        self.total_wait_seconds = 0.0
+
+    def _enqueue(self):
+        with self._lock:
+            self.queue_depth += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        return time.monotonic()
+
+    def _dequeue(self, start):
+        with self._lock:
+            self.queue_depth -= 1
+            self.acquired += 1
+            self.total_wait_seconds += time.monotonic() - start
+
+    def acquire(self):
+        """Blocks until a slot and a token are available. Pair with release()."""
+        start = self._enqueue()
+        try:
+            self._semaphore.acquire()
+            try:
+                delay = self._bucket.reserve()
+                if delay:
+                    time.sleep(delay)
+            except BaseException:
+                self._semaphore.release()
+                raise
+        finally:
+            self._dequeue(start)
+
+    async def acquire_async(self):
+        start = self._enqueue()
+        try:
+            await self._semaphore.acquire_async()
+            try:
+                delay = self._bucket.reserve()
+                if delay:
+                    await asyncio.sleep(delay)
+            except BaseException:
+                self._semaphore.release()
+                raise
+        finally:
+            self._dequeue(start)
+
+    def release(self):
+        self._semaphore.release()
+
+    @contextlib.contextmanager
+    def slot(self):
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def get_metrics(self):
+        with self._lock:
+            return {
+                "queue_depth": self.queue_depth,
+                "max_queue_depth": self.max_queue_depth,
+                "avg_wait_seconds": self.total_wait_seconds / self.acquired if self.acquired else 0.0,
+            }
+
+
+class AsyncLLMClient:
+    """
+    Wraps an async `generate(prompt) -> str` callable with a concurrency limit,
+    a rate limiter and retries. Pass a shared `limiter` to apply one set of
+    limits across clients, threads and event loops. Exposes queue depth and
+    wait-time metrics.
+    """
+
+    def __init__(self, generate, max_concurrency=MAX_CONCURRENCY, rate_per_second=RATE_PER_SECOND,
+                 burst=BURST, max_retries=MAX_RETRIES, base_backoff=BASE_BACKOFF, max_backoff=MAX_BACKOFF,
+                 limiter=None):
+        self._generate = generate
+        self.limiter = limiter if limiter is not None else RequestLimiter(max_concurrency, rate_per_second, burst)
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.counters = Counter()
+
+    async def ask(self, prompt_text):
+        """Returns the model's text, raising LLMRequestError once retries are exhausted."""
+        self.counters["requests"] += 1
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.acquire_async()
+            try:
+                result = await self._generate(prompt_text)
+                self.counters["succeeded"] += 1
+                return result
+            except Exception as e:
+                if not _is_transient(e) or attempt == self.max_retries:
+                    self.counters["failed"] += 1
+                    if isinstance(e, LLMRequestError):
+                        raise
+                    raise LLMRequestError(str(e), transient=_is_transient(e)) from e
+                self.counters["retries"] += 1
+                if getattr(e, "status", None) == 429:
+                    self.counters["rate_limited"] += 1
+            finally:
+                self.limiter.release()
+            delay = random.uniform(0, min(self.max_backoff, self.base_backoff * 2 ** attempt))
+            await asyncio.sleep(delay)
+
+    def get_metrics(self):
+        """Snapshot of counters, current/peak queue depth and average wait."""
+        metrics = dict(self.counters)
+        metrics.update(self.limiter.get_metrics())
+        return metrics
+
+
+# --- ============================= ---
+# ---        REST BACKEND           ---
+# --- ============================= ---
+
+_session = requests.Session()
+
+
+def make_rest_generate(api_key, model_name, api_base=GEMINI_API_BASE):
+    """
+    Builds a `generate` coroutine that calls the Gemini REST API. Point `api_base`
+    at fake_servers.FakeGeminiServer to test latency and 429 handling locally.
+    """
+    url = f"{api_base.rstrip('/')}/v1beta/models/{model_name}:generateContent"
+
+    def _post(prompt_text):
+        response = _session.post(
+            url, params={"key": api_key}, timeout=REQUEST_TIMEOUT,
+            json={"contents": [{"parts": [{"text": prompt_text}]}]},
+        )
+        if response.status_code != 200:
+            raise LLMRequestError(
+                f"Gemini API returned HTTP {response.status_code}: {response.text[:200]}",
+                status=response.status_code, transient=response.status_code in _TRANSIENT_STATUS,
+            )
+        data = response.json()
+        try:
+            parts = data["candidates"][0]["content"]["parts"]
+        except (KeyError, IndexError):
+            raise LLMRequestError(f"Unexpected Gemini response: {str(data)[:200]}")
+        return "".join(part.get("text", "") for part in parts)
+
+    async def generate(prompt_text):
+        return await asyncio.to_thread(_post, prompt_text)
+
+    return generate
@@ -5,13 +5,39 @@ from dotenv import load_dotenv
 load_dotenv()
 
 import pygame
+import threading
 # We now import the new stop_speaking function as well
-from tasks.speaker import say_text_non_blocking, say_text, stop_speaking 
-from tasks.listener import listen_for_command
+from tasks.speaker import say_text_non_blocking, say_text, stop_speaking, say_text_streaming, prewarm_speech_cache, is_speaking
+from tasks.listener import listen_for_command, start_background_listener, warm_up_recognizer
 from tasks.agent_router import determine_command
+from tasks.intent_classifier import classify_intent, CONFIDENCE_THRESHOLD
 from tasks.dispatcher import dispatch_command 
+from tasks.reminder_helper import restore_reminders
+from tasks.finance_helper import resume_price_alerts
 
 pygame.mixer.init()
+prewarm_speech_cache()
+
+# Voice mode routes the latest partial transcript while the user is still
+# talking; if the final transcript matches it, that routing result is reused.
+# Partials only go through the local classifier: an interim hypothesis is never
+# worth an LLM call (or an entry in the LLM cache).
+_early_route = None     # (partial text, command), written by the partials thread
+_early_route_lock = threading.Lock()
+
+def _route_early(partial):
+    global _early_route
+    command, confidence = classify_intent(partial)
+    with _early_route_lock:
+        _early_route = (partial, command) if command and confidence >= CONFIDENCE_THRESHOLD else None
+
+def _route(user_prompt):
+    global _early_route
+    with _early_route_lock:
+        early, _early_route = _early_route, None
+    if early is not None and early[0] == user_prompt:
+        return early[1]
+    return determine_command(user_prompt)
 
 def main():
     print("\n--- Welcome to KunnaBuddy ---")
@@ -27,11 +53,18 @@ def main():
         print("\n--- KunnaBuddy is Ready! (Text Mode) ---")
     else:
         print("\n--- KunnaBuddy is Ready! (Voice Mode) ---")
+        warm_up_recognizer()    # Whisper loads while the greeting plays
         say_text("Voice mode activated. How can I help you?")
+        # The microphone stays open from here on; each turn just takes the next queued utterance
+        start_background_listener(is_playing=is_speaking)
 
     print("(Say/Type 'stop' to interrupt me, or 'exit'/'quit' to end the session)")
     print("-" * 30)
 
+    # Reminders and price alerts from earlier sessions pick up where they left off
+    restore_reminders()
+    resume_price_alerts()
+
     while True:
         try:
             user_prompt = ""
@@ -39,7 +72,7 @@ def main():
                 user_prompt = input("🤖 You (Text): ").strip().lower()
             else:
                 print("🎤 Listening...")
-                user_prompt = listen_for_command()
+                user_prompt = listen_for_command(on_partial=_route_early)
                 if user_prompt: 
                     print(f"🗣️ You (Voice): {user_prompt}")
                 else:
@@ -59,11 +92,17 @@ def main():
                 continue
 
             # --- REGULAR COMMAND PROCESSING ---
-            command_data = determine_command(user_prompt)
-            result = dispatch_command(command_data, user_prompt)
-            
-            print(f"\n✅ Task Result:\n{result}")
-            say_text_non_blocking(result)
+            command_data = _route(user_prompt)
+            result = dispatch_command(command_data, user_prompt, stream=True)
+
+            if isinstance(result, str):
+                print(f"\n✅ Task Result:\n{result}")
+                say_text_non_blocking(result)
+            else:
+                # Streaming answer: print and speak sentences as they arrive
+                print("\n✅ Task Result:")
+                say_text_streaming(result, on_text=lambda chunk: print(chunk, end="", flush=True))
+                print()
 
         except Exception as e:
             error_msg = f"A critical error occurred in the main loop: {e}"
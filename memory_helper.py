@@ -1,24 +1,24 @@
 # --- File: memory_helper.py ---
-import streamlit as st
-
-def initialize_memory():
-    if 'memory' not in st.session_state:
-        st.session_state.memory = {}
+# Memories used to live in st.session_state and vanished with the session.
+# They now go to the same durable store as the CLI (tasks/memory_store.py).
+from tasks.memory_store import get_memory_store
+from tasks.memory_index import resolve_memory_key, FORGET_MIN_SCORE
 
 def remember_info(key, value):
-    initialize_memory()
-    st.session_state.memory[key.lower()] = value
+    get_memory_store().set(key.lower(), value)
     return f"Okay, I've remembered that '{key}' is '{value}'."
 
 def recall_info(key):
-    initialize_memory()
-    value = st.session_state.memory.get(key.lower())
-    return f"I remember that '{key}' is '{value}'." if value else f"I don't have any information for '{key}'."
+    store = get_memory_store()
+    stored_key, _ = resolve_memory_key(store, key.lower())
+    item = store.get(stored_key) if stored_key else None
+    value = item["value"] if item else None
+    return f"I remember that '{stored_key}' is '{value}'." if value else f"I don't have any information for '{key}'."
 
 def forget_info(key):
-    initialize_memory()
-    if key.lower() in st.session_state.memory:
-        del st.session_state.memory[key.lower()]
-        return f"Okay, I have forgotten about '{key}'."
+    store = get_memory_store()
+    stored_key, _ = resolve_memory_key(store, key.lower(), min_score=FORGET_MIN_SCORE)
+    if stored_key and store.delete(stored_key):
+        return f"Okay, I have forgotten about '{stored_key}'."
     else:
-        return f"I don't have any information for '{key}' to forget."
\ No newline at end of file
+        return f"I don't have any information for '{key}' to forget."
@@ -0,0 +1,137 @@
+# --- File: search_ranking.py ---
+# Local post-processing for multi-query search: query expansion, near-duplicate
+# removal (shingles + MinHash) and BM25 ranking under a prompt token budget.
+
+import hashlib
+import math
+import re
+from collections import Counter
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "of", "to", "in", "on", "for", "and", "or",
+    "what", "which", "who", "how", "why", "when", "where", "does", "do", "did", "me", "tell",
+    "about", "with", "between", "vs", "versus", "compare", "it", "its", "be", "can", "i", "my",
+}
+_SPLIT_RE = re.compile(r"\s*(?:,|;|\band\b|\bvs\.?\b|\bversus\b|\bcompared to\b)\s*")
+
+MAX_SUBQUERIES = 4
+
+
+def tokenize(text):
+    return _WORD_RE.findall(text.lower())
+
+
+def expand_query(question):
+    """
+    Splits a compound question into sub-queries without an LLM call. Always
+    includes the original question; adds one query per clause and a
+    keyword-only variant.
+    """
+    question = question.strip().rstrip("?")
+    queries = [question]
+    clauses = [c for c in _SPLIT_RE.split(question) if len(tokenize(c)) >= 2]
+    if len(clauses) > 1:
+        queries.extend(clauses)
+    keywords = " ".join(t for t in tokenize(question) if t not in _STOPWORDS)
+    if keywords and keywords != question.lower():
+        queries.append(keywords)
+
+    unique = []
+    for query in queries:
+        if query.lower() not in (q.lower() for q in unique):
+            unique.append(query)
+    return unique[:MAX_SUBQUERIES]
+
+
+# --- ============================= ---
+# ---     NEAR-DUPLICATE REMOVAL    ---
+# --- ============================= ---
+
+NUM_PERMUTATIONS = 64
+SHINGLE_SIZE = 3
+DUPLICATE_THRESHOLD = 0.7
+
+
+def _shingles(text):
+    tokens = tokenize(text)
+    if len(tokens) < SHINGLE_SIZE:
+        return {" ".join(tokens)}
+    return {" ".join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+
+
+def _minhash(shingles):
+    signature = []
+    for seed in range(NUM_PERMUTATIONS):
+        salt = seed.to_bytes(2, "little")
+        signature.append(min(
+            int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8, salt=salt).digest(), "little")
+            for s in shingles
+        ))
+    return signature
+
+
+def _estimated_similarity(sig_a, sig_b):
+    return sum(a == b for a, b in zip(sig_a, sig_b)) / NUM_PERMUTATIONS
+
+
+def dedupe_snippets(snippets, threshold=DUPLICATE_THRESHOLD):
+    """Drops snippets with the same link or a near-identical text (estimated Jaccard >= threshold)."""
+    kept, signatures, links = [], [], set()
+    for snippet in snippets:
+        link = snippet.get("link")
+        if link and link in links:
+            continue
+        signature = _minhash(_shingles(f"{snippet.get('title', '')} {snippet.get('snippet', '')}"))
+        if any(_estimated_similarity(signature, other) >= threshold for other in signatures):
+            continue
+        kept.append(snippet)
+        signatures.append(signature)
+        if link:
+            links.add(link)
+    return kept
+
+
+# --- ============================= ---
+# ---         BM25 RANKING          ---
+# --- ============================= ---
+
+def bm25_rank(question, snippets, k1=1.5, b=0.75):
+    """Returns snippets sorted by BM25 score against the question, best first."""
+    documents = [tokenize(f"{s.get('title', '')} {s.get('snippet', '')}") for s in snippets]
+    if not documents:
+        return []
+    avg_length = sum(len(d) for d in documents) / len(documents) or 1
+    document_frequency = Counter(term for d in documents for term in set(d))
+    query_terms = [t for t in tokenize(question) if t not in _STOPWORDS] or tokenize(question)
+
+    scored = []
+    for snippet, document in zip(snippets, documents):
+        frequencies = Counter(document)
+        score = 0.0
+        for term in query_terms:
+            tf = frequencies.get(term)
+            if not tf:
+                continue
+            idf = math.log(1 + (len(documents) - document_frequency[term] + 0.5) / (document_frequency[term] + 0.5))
+            score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(document) / avg_length))
+        scored.append((score, snippet))
+    scored.sort(key=lambda pair: pair[0], reverse=True)
+    return [snippet for _, snippet in scored]
+
+
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token), good enough for budgeting."""
+    return max(1, len(text) // 4)
+
+
+def select_within_budget(ranked_snippets, token_budget):
+    """Takes snippets in rank order until the token budget is used up."""
+    selected, used = [], 0
+    for snippet in ranked_snippets:
+        cost = estimate_tokens(f"Title: {snippet.get('title')}\nSnippet: {snippet.get('snippet')}\n---\n")
+        if used + cost > token_budget:
+            continue
+        selected.append(snippet)
+        used += cost
+    return selected
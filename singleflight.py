@@ -0,0 +1,120 @@
+# --- File: singleflight.py ---
+# Request coalescing: while a call for a key is in flight, identical calls
+# wait for its result instead of issuing a duplicate request.
+
+import asyncio
+import concurrent.futures
+import threading
+from collections import Counter
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Thread-based single-flight group (Streamlit runs each session on its own thread)."""
+
+    def __init__(self, name):
+        self.name = name
+        self.counters = Counter()
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        """Runs fn() once per key at a time; concurrent callers share its result or exception."""
+        with self._lock:
+            self.counters["calls"] += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.counters["coalesced"] += 1
+
+        if not leader:
+            call.done.wait()
+        else:
+            try:
+                call.result = fn()
+            except Exception as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+
+class AsyncSingleFlight:
+    """
+    asyncio variant, shared by every event loop in the process (each
+    Streamlit session thread may run its own): the leader's result is
+    published through a thread-safe future that followers await from any loop.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.counters = Counter()
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    async def do(self, key, coro_fn):
+        with self._lock:
+            self.counters["calls"] += 1
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = concurrent.futures.Future()
+            else:
+                self.counters["coalesced"] += 1
+
+        if leader:
+            task = asyncio.ensure_future(coro_fn())
+
+            def _publish(task):
+                with self._lock:
+                    self._calls.pop(key, None)
+                if task.cancelled():
+                    future.cancel()
+                elif task.exception() is not None:
+                    future.set_exception(task.exception())
+                else:
+                    future.set_result(task.result())
+            task.add_done_callback(_publish)
+        # shield() so one cancelled caller does not cancel the shared request
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+
+_groups = {}
+_async_groups = {}
+_groups_lock = threading.Lock()
+
+
+def get_group(name):
+    """Returns the process-wide SingleFlight group with this name."""
+    with _groups_lock:
+        if name not in _groups:
+            _groups[name] = SingleFlight(name)
+        return _groups[name]
+
+
+def get_async_group(name):
+    """Returns the process-wide AsyncSingleFlight group with this name (usable from any event loop)."""
+    with _groups_lock:
+        if name not in _async_groups:
+            _async_groups[name] = AsyncSingleFlight(name)
+        return _async_groups[name]
+
+
+def get_coalescing_stats():
+    """Counters for every group, e.g. {'gemini': {'calls': 10, 'coalesced': 3}}."""
+    with _groups_lock:
+        groups = {**_groups, **_async_groups}
+    return {name: dict(group.counters) for name, group in groups.items()}
@@ -0,0 +1,320 @@
+# File: tasks/alert_engine.py
+# Price alerts for tasks/finance_helper.py. Any number of alerts per ticker,
+# kept in per-ticker heaps so a new price finds every crossed alert in
+# O(log n + k) instead of scanning all of them. Alerts persist in SQLite.
+#
+# Alert kinds:
+#   price     fires when the price goes above/below an absolute target
+#   percent   fires on a move of `pct` percent from a reference price
+#             (stored as an absolute target, so it lives in the price heaps)
+#   trailing  "below": fires when the price falls `pct` percent from its
+#             highest point since the alert was set (a trailing stop);
+#             "above": fires when it rises `pct` percent from its lowest point
+
+import heapq
+import itertools
+import math
+import threading
+from datetime import datetime
+
+from .sqlite_util import open_wal_connection, SharedInstances
+
+ALERTS_DB_FILE = "kunnabuddy_alerts.sqlite3"
+DIRECTIONS = ("above", "below")
+
+
+class _TrailingBook:
+    """
+    Trailing alerts of one direction for one ticker, in x = +/-log(price)
+    space where both directions read "fire when x <= peak - distance".
+
+    Alerts sharing a peak form a group (a heap by distance). Once the price
+    makes a new extreme, every group whose peak it passed now has that same
+    peak, so they are merged. Groups sit in a heap by trigger level
+    (peak - smallest distance); stale heap entries are skipped via versions.
+    """
+
+    def __init__(self, sign):
+        self.sign = sign
+        self._groups = {}          # group id -> [peak, [(distance, alert_id)], version]
+        self._by_peak = []         # (peak, group id): candidates for merging
+        self._by_level = []        # (-level, group id, version): candidates for firing
+        self._ids = itertools.count()
+
+    def _x(self, price):
+        return self.sign * math.log(price)
+
+    def _push_level(self, group_id):
+        peak, members, version = self._groups[group_id]
+        heapq.heappush(self._by_level, (-(peak - members[0][0]), group_id, version))
+
+    def _new_group(self, peak, members):
+        group_id = next(self._ids)
+        self._groups[group_id] = [peak, members, 0]
+        heapq.heappush(self._by_peak, (peak, group_id))
+        self._push_level(group_id)
+
+    def add(self, alert_id, pct, extreme):
+        # below: x = log p, fire at log(peak) + log(1 - pct); above: x = -log p, fire at -log(low) - log(1 + pct)
+        distance = -math.log(1 - pct / 100) if self.sign > 0 else math.log(1 + pct / 100)
+        self._new_group(self._x(extreme), [(distance, alert_id)])
+
+    def remove(self, alert_id):
+        for group_id, group in list(self._groups.items()):
+            members = [m for m in group[1] if m[1] != alert_id]
+            if len(members) != len(group[1]):
+                heapq.heapify(members)
+                group[1] = members
+                group[2] += 1
+                if members:
+                    self._push_level(group_id)
+                else:
+                    del self._groups[group_id]
+                return
+
+    def update(self, price):
+        """Returns the ids of alerts that fire at `price`."""
+        x = self._x(price)
+
+        merged = []
+        while self._by_peak and self._by_peak[0][0] < x:
+            _, group_id = heapq.heappop(self._by_peak)
+            group = self._groups.pop(group_id, None)
+            if group:
+                merged.append(group[1])
+        if merged:
+            merged.sort(key=len, reverse=True)
+            members = merged[0]               # smaller heaps are pushed into the largest
+            for other in merged[1:]:
+                for member in other:
+                    heapq.heappush(members, member)
+            self._new_group(x, members)
+
+        fired = []
+        while self._by_level and -self._by_level[0][0] >= x:
+            _, group_id, version = heapq.heappop(self._by_level)
+            group = self._groups.get(group_id)
+            if group is None or group[2] != version:
+                continue
+            peak, members = group[0], group[1]
+            while members and peak - members[0][0] >= x:
+                fired.append(heapq.heappop(members)[1])
+            group[2] += 1
+            if members:
+                self._push_level(group_id)
+            else:
+                del self._groups[group_id]
+        return fired
+
+    def next_trigger(self):
+        """Price at which the next alert would fire if the extreme did not move, or None."""
+        while self._by_level:
+            level, group_id, version = self._by_level[0]
+            group = self._groups.get(group_id)
+            if group is not None and group[2] == version:
+                return math.exp(-level * self.sign)
+            heapq.heappop(self._by_level)
+        return None
+
+    def extremes(self):
+        """alert id -> best price seen (the high for "below", the low for "above")."""
+        return {alert_id: math.exp(self.sign * peak)
+                for peak, members, _ in self._groups.values() for _, alert_id in members}
+
+    def __bool__(self):
+        return bool(self._groups)
+
+    def __len__(self):
+        return sum(len(group[1]) for group in self._groups.values())
+
+
+class _TickerBook:
+    def __init__(self):
+        self.above = []            # min-heap of (target, alert_id)
+        self.below = []            # max-heap of (-target, alert_id)
+        self.trailing = {"above": _TrailingBook(-1), "below": _TrailingBook(1)}
+
+    def update(self, price, live):
+        fired = []
+        while self.above and self.above[0][0] < price:
+            fired.append(heapq.heappop(self.above)[1])
+        while self.below and -self.below[0][0] > price:
+            fired.append(heapq.heappop(self.below)[1])
+        fired = [alert_id for alert_id in fired if alert_id in live]
+        for book in self.trailing.values():
+            fired += book.update(price)
+        return fired
+
+    def discard(self, alert_id):
+        """Drops a price/percent alert now, so a later alert reusing its id can't inherit its target."""
+        for heap in (self.above, self.below):
+            kept = [entry for entry in heap if entry[1] != alert_id]
+            if len(kept) != len(heap):
+                heapq.heapify(kept)
+                heap[:] = kept
+
+    def nearest_targets(self, live):
+        """(lowest "above" target, highest "below" target), trailing levels included."""
+        while self.above and self.above[0][1] not in live:
+            heapq.heappop(self.above)
+        while self.below and self.below[0][1] not in live:
+            heapq.heappop(self.below)
+        above = [self.above[0][0]] if self.above else []
+        below = [-self.below[0][0]] if self.below else []
+        rise, fall = self.trailing["above"].next_trigger(), self.trailing["below"].next_trigger()
+        return min(above + ([rise] if rise else []), default=None), max(below + ([fall] if fall else []), default=None)
+
+
+class AlertEngine:
+    def __init__(self, path=ALERTS_DB_FILE):
+        self._lock = threading.RLock()
+        self._conn = open_wal_connection(path)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS alerts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ticker TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                direction TEXT NOT NULL,
+                target REAL,
+                pct REAL,
+                reference REAL,
+                created TEXT NOT NULL
+            )""")
+        self._conn.commit()
+        self._alerts = {}          # id -> alert dict
+        self._books = {}           # ticker -> _TickerBook
+        self._extremes_dirty = False
+        for row in self._conn.execute(
+                "SELECT id, ticker, kind, direction, target, pct, reference, created FROM alerts"):
+            self._index(dict(zip(("id", "ticker", "kind", "direction", "target", "pct", "reference", "created"), row)))
+
+    def _index(self, alert):
+        self._alerts[alert["id"]] = alert
+        book = self._books.setdefault(alert["ticker"], _TickerBook())
+        if alert["kind"] == "trailing":
+            book.trailing[alert["direction"]].add(alert["id"], alert["pct"], alert["reference"])
+        elif alert["direction"] == "above":
+            heapq.heappush(book.above, (alert["target"], alert["id"]))
+        else:
+            heapq.heappush(book.below, (-alert["target"], alert["id"]))
+
+    def _add(self, ticker, kind, direction, target=None, pct=None, reference=None):
+        direction = direction.lower()
+        if direction not in DIRECTIONS:
+            raise ValueError(f"direction must be 'above' or 'below', got {direction!r}")
+        alert = {"ticker": ticker.upper(), "kind": kind, "direction": direction, "target": target,
+                 "pct": pct, "reference": reference, "created": datetime.now().isoformat(timespec="seconds")}
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO alerts (ticker, kind, direction, target, pct, reference, created) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (alert["ticker"], kind, direction, target, pct, reference, alert["created"]))
+            self._conn.commit()
+            alert["id"] = cursor.lastrowid
+            self._index(alert)
+        return alert
+
+    # --- Public API ---
+
+    def add_price_alert(self, ticker, direction, target):
+        return self._add(ticker, "price", direction, target=float(target))
+
+    def add_percent_alert(self, ticker, direction, pct, reference):
+        """Fires when the price moves `pct` percent above/below `reference`."""
+        pct, reference = float(pct), float(reference)
+        factor = 1 + pct / 100 if direction.lower() == "above" else 1 - pct / 100
+        return self._add(ticker, "percent", direction, target=reference * factor, pct=pct, reference=reference)
+
+    def add_trailing_alert(self, ticker, direction, pct, reference):
+        """Trailing alert starting from the current price `reference` (see module notes)."""
+        pct = float(pct)
+        if not 0 < pct < 100:
+            raise ValueError("Trailing percentage must be between 0 and 100.")
+        return self._add(ticker, "trailing", direction, pct=pct, reference=float(reference))
+
+    def cancel(self, alert_id):
+        with self._lock:
+            alert = self._alerts.pop(alert_id, None)
+            if alert is None:
+                return False
+            book = self._books[alert["ticker"]]
+            if alert["kind"] == "trailing":
+                book.trailing[alert["direction"]].remove(alert_id)
+            else:
+                book.discard(alert_id)
+            self._conn.execute("DELETE FROM alerts WHERE id = ?", (alert_id,))
+            self._conn.commit()
+            return True
+
+    def on_price(self, ticker, price):
+        """Feeds one price; removes and returns the alerts it triggers."""
+        return self.check({ticker: price})
+
+    def check(self, prices):
+        """Feeds {ticker: price}; removes and returns every triggered alert (with "price" set)."""
+        triggered = []
+        with self._lock:
+            for ticker, price in prices.items():
+                book = self._books.get(ticker.upper())
+                if book is None or not price:
+                    continue
+                if any(book.trailing.values()):
+                    self._extremes_dirty = True
+                for alert_id in book.update(price, self._alerts):
+                    alert = self._alerts.pop(alert_id)
+                    triggered.append({**alert, "price": price})
+            if triggered:
+                self._conn.executemany("DELETE FROM alerts WHERE id = ?", [(a["id"],) for a in triggered])
+                self._conn.commit()
+        return triggered
+
+    def distance_to_trigger(self, ticker, price):
+        """
+        Relative distance from `price` to the closest alert on `ticker`
+        (0.02 = 2% away), or None if it has no alerts. O(1) amortized.
+        """
+        with self._lock:
+            book = self._books.get(ticker.upper())
+            if book is None or not price:
+                return None
+            above, below = book.nearest_targets(self._alerts)
+            distances = [abs(target - price) / price for target in (above, below) if target is not None]
+            return min(distances, default=None)
+
+    def save_trailing_extremes(self):
+        """Persists the highs/lows trailing alerts have seen, so a restart resumes from them."""
+        with self._lock:
+            if not self._extremes_dirty:
+                return
+            extremes = {}
+            for book in self._books.values():
+                for trailing in book.trailing.values():
+                    extremes.update(trailing.extremes())
+            self._conn.executemany("UPDATE alerts SET reference = ? WHERE id = ?",
+                                   [(price, alert_id) for alert_id, price in extremes.items()])
+            self._conn.commit()
+            self._extremes_dirty = False
+
+    def symbols(self):
+        with self._lock:
+            return sorted({alert["ticker"] for alert in self._alerts.values()})
+
+    def alerts(self, ticker=None):
+        with self._lock:
+            return [dict(a) for a in self._alerts.values() if ticker is None or a["ticker"] == ticker.upper()]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._alerts)
+
+    def close(self):
+        with self._lock:
+            self.save_trailing_extremes()
+            self._conn.close()
+
+
+_engines = SharedInstances(AlertEngine)
+
+
+def get_alert_engine():
+    """Returns the process-wide AlertEngine, loading saved alerts on first use."""
+    return _engines.get()
@@ -25,7 +25,7 @@ def _summarize_text_with_ai(text, file_path):
     """
     # We slice the text [:8000] to avoid exceeding the token limit for the prompt.
     
-    summary = ask_gemini(prompt)
+    summary = ask_gemini(prompt, call_site="file_summary")
     return f"Here is a summary of '{os.path.basename(file_path)}':\n\n{summary}"
 
 def _extract_text_from_pdf(file_path):
@@ -1,13 +1,16 @@
 # File: tasks/finance_helper.py
 
-import yfinance as yf
-import schedule
+import threading
 import time
-from .speaker import say_text
+from .speaker import say_text, PRIORITY_ALERT
+from .quotes import get_quote_service
+from .alert_engine import get_alert_engine
+from .price_poller import AdaptivePoller
 
-# A dictionary to hold our active price alerts
-# Format: { 'ticker': {'target': 123.45, 'direction': 'above'/'below'} }
-_price_alerts = {}
+# Active price alerts live in tasks/alert_engine.py (persisted across restarts)
+# and are checked by an AdaptivePoller (tasks/price_poller.py).
+_poller = None
+_poller_lock = threading.Lock()
 
 def get_current_price(ticker):
     """
@@ -21,17 +24,9 @@ def get_current_price(ticker):
     """
     try:
         print(f"💰 Fetching current price for {ticker}...")
-        stock = yf.Ticker(ticker)
-        
-        # 'regularMarketPrice' is a reliable field for the current price
-        # We can also use 'currentPrice' or other fields as a fallback
-        current_price = stock.info.get('regularMarketPrice') or stock.info.get('currentPrice')
-        
-        if current_price is None:
-            # For some assets, we might need to look at recent history
-            hist = stock.history(period="1d")
-            if not hist.empty:
-                current_price = hist['Close'].iloc[-1]
+        # Served from the shared quote cache when the alert checker (or an
+        # earlier question) fetched this symbol in the last few seconds.
+        current_price = get_quote_service().get_quote(ticker)
         
         if current_price:
             return f"The current price of {ticker.upper()} is ${current_price:,.2f}."
@@ -41,43 +36,87 @@ def get_current_price(ticker):
     except Exception as e:
         return f"Sorry, I encountered an error while fetching the price for {ticker}. Error: {e}"
 
-def _check_price_alerts():
-    """
-    This function runs periodically in the background to check all active alerts.
-    It is called by the main scheduler thread.
-    """
-    # We iterate over a copy of the items to allow safe modification during the loop
-    for ticker, alert_info in list(_price_alerts.items()):
+def _describe_alert(alert):
+    if alert['kind'] == 'trailing':
+        return f"{alert['ticker']}: trailing {alert['pct']:g}% {alert['direction']} (from ${alert['reference']:,.2f})"
+    if alert['kind'] == 'percent':
+        return (f"{alert['ticker']}: {alert['pct']:g}% move {alert['direction']} ${alert['reference']:,.2f} "
+                f"(${alert['target']:,.2f})")
+    return f"{alert['ticker']}: price goes {alert['direction']} ${alert['target']:,.2f}"
+
+def _handle_prices(prices):
+    """Feeds fresh quotes to the alert engine and announces whatever fired."""
+    engine = get_alert_engine()
+    # The engine removes (and persists the removal of) every alert that fired
+    for alert in engine.check(prices):
         try:
-            stock = yf.Ticker(ticker)
-            current_price = stock.info.get('regularMarketPrice') or stock.info.get('currentPrice')
-            if not current_price: continue # Skip if we can't get a price
-            
-            target = alert_info['target']
-            direction = alert_info['direction']
-            
-            print(f"DEBUG: Checking alert for {ticker}. Current: ${current_price}, Target: {direction} ${target}")
-
-            # Check if the alert condition is met
-            if (direction == 'above' and current_price > target) or \
-               (direction == 'below' and current_price < target):
-                
-                alert_message = f"Price alert for {ticker.upper()}! It has gone {direction} your target of ${target:,.2f} and is now at ${current_price:,.2f}."
-                print(f"🎯 PRICE ALERT: {alert_message}")
-                say_text(alert_message)
-                
-                # Remove the alert after it has been triggered
-                del _price_alerts[ticker]
-                print(f"INFO: Alert for {ticker} has been triggered and removed.")
-                
+            ticker, price = alert['ticker'], alert['price']
+            if alert['kind'] == 'trailing':
+                alert_message = (f"Price alert for {ticker}! It has moved {alert['pct']:g}% {alert['direction']} "
+                                 f"its recent {'high' if alert['direction'] == 'below' else 'low'} and is now at ${price:,.2f}.")
+            else:
+                alert_message = f"Price alert for {ticker}! It has gone {alert['direction']} your target of ${alert['target']:,.2f} and is now at ${price:,.2f}."
+            print(f"🎯 PRICE ALERT: {alert_message}")
+            say_text(alert_message, priority=PRIORITY_ALERT)   # interrupts chat, which resumes after
+            print(f"INFO: Alert {alert['id']} for {ticker} has been triggered and removed.")
+
         except Exception as e:
             # Don't crash the checker thread, just log the error
-            print(f"ERROR: Could not check price alert for {ticker}. Reason: {e}")
+            print(f"ERROR: Could not announce price alert {alert['id']}. Reason: {e}")
+    engine.save_trailing_extremes()
+
+def _check_price_alerts():
+    """Checks every active alert now, with one batched quote fetch."""
+    symbols = get_alert_engine().symbols()
+    if not symbols:
+        return
+    try:
+        prices = get_quote_service().get_quotes(symbols)
+    except Exception as e:
+        print(f"ERROR: Could not fetch quotes for price alerts. Reason: {e}")
+        return
+    _handle_prices(prices)
+
+def get_price_poller():
+    """The background poller, created (not started) on first use."""
+    global _poller
+    with _poller_lock:
+        if _poller is None:
+            engine = get_alert_engine()
+            _poller = AdaptivePoller(
+                fetch=get_quote_service().get_quotes,
+                on_prices=_handle_prices,
+                distance=engine.distance_to_trigger,
+                symbols=engine.symbols,
+            )
+        return _poller
 
+def _ensure_price_checker(ticker=None):
+    # Starts the adaptive poller on the first alert; a new alert's ticker is
+    # polled right away and then at an interval that depends on how close it is.
+    poller = get_price_poller()
+    if not poller.is_running():
+        poller.start()
+        print("INFO: Started the adaptive price alert poller.")
+    if ticker:
+        poller.watch(ticker)
+
+def get_price_poller_stats():
+    """Observed poll intervals and request counts, for tuning tasks/price_poller.py."""
+    return get_price_poller().get_stats()
+
+def resume_price_alerts():
+    """Restarts the checker for alerts saved by a previous session. Call once at startup."""
+    count = len(get_alert_engine())
+    if count:
+        _ensure_price_checker()
+        print(f"INFO: Resumed {count} saved price alert(s).")
+    return count
 
 def set_price_alert(ticker, direction, target_price):
     """
-    Sets a new price alert for a given ticker.
+    Sets a new price alert for a given ticker. A ticker can have any number
+    of alerts, above and below.
     
     Args:
         ticker (str): The stock or crypto ticker.
@@ -92,13 +131,8 @@ def set_price_alert(ticker, direction, target_price):
         
     try:
         target = float(target_price)
-        _price_alerts[ticker.upper()] = {'target': target, 'direction': direction.lower()}
-        
-        # If this is the first alert, we schedule the checker function to run.
-        # It will run every 5 minutes.
-        if len(schedule.get_jobs('price-checker')) == 0:
-            schedule.every(5).minutes.do(_check_price_alerts).tag('price-checker')
-            print("INFO: Started the periodic price alert checker (runs every 5 minutes).")
+        get_alert_engine().add_price_alert(ticker, direction, target)
+        _ensure_price_checker(ticker)
             
         confirmation = f"I will alert you if {ticker.upper()} goes {direction} ${target:,.2f}."
         print(f"✅ Alert set: {confirmation}")
@@ -109,13 +143,71 @@ def set_price_alert(ticker, direction, target_price):
     except Exception as e:
         return f"Sorry, I couldn't set the alert. Error: {e}"
 
+def set_percent_alert(ticker, direction, percent):
+    """
+    Alerts when the price moves `percent` percent above/below today's price.
+
+    Returns:
+        str: A confirmation message.
+    """
+    if direction.lower() not in ['above', 'below']:
+        return "Invalid direction. Please specify 'above' or 'below'."
+    try:
+        reference = get_quote_service().get_quote(ticker)
+        if not reference:
+            return f"Sorry, I couldn't get a current price for {ticker.upper()} to measure the move from."
+        alert = get_alert_engine().add_percent_alert(ticker, direction, float(percent), reference)
+        _ensure_price_checker(ticker)
+        confirmation = (f"I will alert you if {ticker.upper()} moves {float(percent):g}% {direction} "
+                        f"${reference:,.2f}, that is past ${alert['target']:,.2f}.")
+        print(f"✅ Alert set: {confirmation}")
+        return f"Okay, alert set. {confirmation}"
+    except ValueError:
+        return f"Invalid percentage '{percent}'. Please provide a number."
+    except Exception as e:
+        return f"Sorry, I couldn't set the alert. Error: {e}"
+
+def set_trailing_alert(ticker, percent, direction="below"):
+    """
+    Trailing alert: with "below", alerts when the price falls `percent`
+    percent from its highest point from now on (a trailing stop); with
+    "above", when it rises `percent` percent from its lowest point.
+
+    Returns:
+        str: A confirmation message.
+    """
+    if direction.lower() not in ['above', 'below']:
+        return "Invalid direction. Please specify 'above' or 'below'."
+    try:
+        reference = get_quote_service().get_quote(ticker)
+        if not reference:
+            return f"Sorry, I couldn't get a current price for {ticker.upper()} to start trailing from."
+        get_alert_engine().add_trailing_alert(ticker, direction, float(percent), reference)
+        _ensure_price_checker(ticker)
+        extreme = "high" if direction.lower() == "below" else "low"
+        confirmation = (f"I will alert you if {ticker.upper()} moves {float(percent):g}% {direction.lower()} "
+                        f"its {extreme} (currently ${reference:,.2f}).")
+        print(f"✅ Alert set: {confirmation}")
+        return f"Okay, trailing alert set. {confirmation}"
+    except ValueError as e:
+        return f"Invalid trailing alert: {e}"
+    except Exception as e:
+        return f"Sorry, I couldn't set the alert. Error: {e}"
+
+def cancel_price_alert(alert_id):
+    """Cancels an alert by the number shown in get_active_alerts()."""
+    if get_alert_engine().cancel(int(alert_id)):
+        return f"Okay, alert {alert_id} is cancelled."
+    return f"I couldn't find an alert with number {alert_id}."
+
 def get_active_alerts():
     """Returns a list of all currently active price alerts."""
-    if not _price_alerts:
+    alerts = sorted(get_alert_engine().alerts(), key=lambda a: (a['ticker'], a['id']))
+    if not alerts:
         return "You have no active price alerts."
         
     alert_list = "Here are your active alerts:\n"
-    for ticker, info in _price_alerts.items():
-        alert_list += f"- {ticker}: Alert if price goes {info['direction']} ${info['target']:,}\n"
+    for alert in alerts:
+        alert_list += f"- #{alert['id']} {_describe_alert(alert)}\n"
         
-    return alert_list.strip()
\ No newline at end of file
+    return alert_list.strip()
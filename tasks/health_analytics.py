@@ -0,0 +1,87 @@
+# File: tasks/health_analytics.py
+# Aggregate questions over the health log ("average water per day this
+# month", "is my running trending up"). Everything is computed with NumPy
+# over the precomputed rollups in tasks/health_store.py, so the cost depends on
+# the number of days asked about, not on how many rows were ever logged.
+
+from datetime import date
+
+import numpy as np
+
+from .health_store import get_health_store
+
+MOVING_AVERAGE_DAYS = 7
+TREND_FLAT_THRESHOLD = 0.05   # Relative change per week below which a trend counts as flat
+
+
+def _window(period):
+    """Maps "today" / "week" / "month" / "year" / a number of days to [start, end) date ordinals."""
+    today = date.today()
+    end = today.toordinal() + 1
+    if period in ("today", "day"):
+        return today.toordinal(), end, "today"
+    if period in ("week", "this week"):
+        return today.toordinal() - today.weekday(), end, "this week"
+    if period in ("month", "this month"):
+        return today.replace(day=1).toordinal(), end, "this month"
+    if period in ("year", "this year"):
+        return today.replace(month=1, day=1).toordinal(), end, "this year"
+    days = int(period)
+    return end - days, end, f"the last {days} days"
+
+
+def moving_average(values, window=MOVING_AVERAGE_DAYS):
+    """Trailing moving average; the first window-1 points average what is available."""
+    values = np.asarray(values, dtype=np.float64)
+    sums = np.convolve(values, np.ones(window))[:len(values)]
+    return sums / np.minimum(np.arange(1, len(values) + 1), window)
+
+
+def daily_stats(metric_type, period="week"):
+    """Totals and per-day statistics for a metric. Returns a dict, or None if nothing was logged."""
+    start, end, label = _window(period)
+    days, totals, counts, unit = get_health_store().rollup_series(metric_type, start, end)
+    if unit is None:
+        return None
+    active = counts > 0
+    return {
+        "label": label,
+        "unit": unit,
+        "total": float(totals.sum()),
+        "days": len(days),
+        "active_days": int(active.sum()),
+        "average_per_day": float(totals.mean()),
+        "average_per_active_day": float(totals[active].mean()),
+        "best_day": date.fromordinal(int(days[np.argmax(totals)])),
+        "best_total": float(totals.max()),
+    }
+
+
+def trend(metric_type, days=30):
+    """
+    Fits a least-squares line through the daily totals of active days.
+    Returns a dict with the slope per week and a direction, or None.
+    """
+    start, end, label = _window(days)
+    day_ordinals, totals, counts, unit = get_health_store().rollup_series(metric_type, start, end)
+    active = counts > 0
+    if active.sum() < 3:
+        return None
+    x = (day_ordinals[active] - start).astype(np.float64)
+    y = totals[active]
+    slope, _ = np.polyfit(x, y, 1)
+    mean = y.mean()
+    relative_per_week = (slope * 7) / mean if mean else 0.0
+    if abs(relative_per_week) < TREND_FLAT_THRESHOLD:
+        direction = "flat"
+    else:
+        direction = "up" if relative_per_week > 0 else "down"
+    return {
+        "label": label,
+        "unit": unit,
+        "direction": direction,
+        "slope_per_week": float(slope * 7),
+        "relative_per_week": float(relative_per_week),
+        "moving_average": float(moving_average(totals)[-1]),
+        "active_days": int(active.sum()),
+    }
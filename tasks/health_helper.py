@@ -1,45 +1,29 @@
 # File: tasks/health_helper.py
 
-import os
-import csv
-from datetime import datetime
+from datetime import datetime, timedelta
+from .health_store import get_health_store, BufferedHealthWriter
+from .health_analytics import daily_stats, trend
 
 # --- CONFIGURATION ---
-HEALTH_LOG_FILE = "kunnabuddy_health_log.csv"
-LOG_HEADERS = ["Timestamp", "MetricType", "Value", "Unit"]
-
-def _ensure_log_file_exists():
-    """Checks if the log file exists, and creates it with headers if it doesn't."""
-    if not os.path.exists(HEALTH_LOG_FILE):
-        with open(HEALTH_LOG_FILE, mode='w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow(LOG_HEADERS)
-        print(f"INFO: Created new health log file: {HEALTH_LOG_FILE}")
+# Entries are stored in tasks/health_store.py. The old CSV log
+# (kunnabuddy_health_log.csv) is imported automatically the first time.
+SUMMARY_ENTRIES = 5
 
 def log_health_metric(metric_type, value, unit=""):
     """
-    Logs a new health-related metric to the CSV file.
-    
+    Logs a new health-related metric to the health store.
+
     Args:
         metric_type (str): The type of metric (e.g., "water", "run", "calories").
         value (str): The value of the metric (e.g., "500", "5").
         unit (str): The unit for the value (e.g., "ml", "km").
-        
+
     Returns:
         str: A confirmation message.
     """
     try:
-        _ensure_log_file_exists()
-        
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        # Prepare the new row of data
-        new_row = [timestamp, metric_type.lower(), value, unit.lower()]
-        
-        with open(HEALTH_LOG_FILE, mode='a', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow(new_row)
-            
+        get_health_store().append(metric_type, value, unit)
+
         confirmation = f"Logged: {metric_type.title()} - {value} {unit}."
         print(f"✅ Health Log: {confirmation}")
         return f"Got it. I've logged that for you."
@@ -49,36 +33,99 @@ def log_health_metric(metric_type, value, unit=""):
         print(f"❌ {error_message}")
         return error_message
 
+def log_health_metrics(entries):
+    """
+    Logs many metrics at once, e.g. a backfill from a fitness-app export.
+
+    Args:
+        entries (iterable): dicts with "metric", "value" and optional "unit" /
+            "timestamp" (datetime) keys, or (metric, value[, unit[, timestamp]]) tuples.
+
+    Returns:
+        str: A confirmation message.
+    """
+    try:
+        count = get_health_store().append_many(entries)
+        print(f"✅ Health Log: Logged {count} entries.")
+        return f"Done. I've logged {count} entries for you."
+
+    except Exception as e:
+        error_message = f"Sorry, I couldn't log those health metrics. Error: {e}"
+        print(f"❌ {error_message}")
+        return error_message
+
+def open_health_writer(**options):
+    """
+    A BufferedHealthWriter on the shared store for continuous sources (e.g. a
+    wearable). Options: flush_size, flush_interval. Close it (or use it as a
+    context manager) to write whatever is still buffered.
+    """
+    return BufferedHealthWriter(get_health_store(), **options)
+
 def get_health_summary(metric_type, days=7):
     """
-    Reads the health log and provides a summary for a specific metric
-    over a given number of days. (For now, it will just show recent entries).
+    Provides a summary for a specific metric over the last `days` days,
+    listing the most recent entries.
     """
     try:
-        if not os.path.exists(HEALTH_LOG_FILE):
-            return "You haven't logged any health data yet."
-        
-        recent_entries = []
-        with open(HEALTH_LOG_FILE, mode='r', newline='', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                # Simple filter for the requested metric type
-                if metric_type.lower() in row["MetricType"].lower():
-                    # We can add date filtering here later
-                    recent_entries.append(
-                        f"- On {row['Timestamp']}, you logged: {row['Value']} {row['Unit']}"
-                    )
-        
-        if not recent_entries:
+        store = get_health_store()
+        if not store.resolve_metrics(metric_type):
             return f"I couldn't find any recent entries for '{metric_type}'."
-            
-        # Get the last 5 entries for a concise summary
-        summary = f"Here are your last 5 entries for '{metric_type.title()}':\n"
-        summary += "\n".join(recent_entries[-5:])
-        
+
+        since = datetime.now() - timedelta(days=int(days))
+        recent_entries = store.tail(metric_type, SUMMARY_ENTRIES, since=since)
+
+        if not recent_entries:
+            return f"I couldn't find any entries for '{metric_type}' in the last {days} days."
+
+        summary = f"Here are your last {len(recent_entries)} entries for '{metric_type.title()}' (past {days} days):\n"
+        summary += "\n".join(
+            f"- On {entry['timestamp']:%Y-%m-%d %H:%M:%S}, you logged: {entry['value']} {entry['unit']}"
+            for entry in recent_entries
+        )
+
         return summary
-        
+
     except Exception as e:
         error_message = f"Sorry, I couldn't get the health summary. Error: {e}"
         print(f"❌ {error_message}")
-        return error_message
\ No newline at end of file
+        return error_message
+
+def get_health_average(metric_type, period="week"):
+    """
+    Answers "how much X per day" questions for "today", "week", "month",
+    "year" or a number of days. Units are normalized (e.g. l -> ml).
+    """
+    try:
+        stats = daily_stats(metric_type, period)
+        if stats is None or not stats["active_days"]:
+            return f"I couldn't find any '{metric_type}' entries for that period."
+
+        unit = stats["unit"]
+        return (f"For {stats['label']}, you averaged {stats['average_per_day']:,.1f} {unit} of "
+                f"{metric_type} per day ({stats['total']:,.1f} {unit} in total over {stats['days']} days, "
+                f"logged on {stats['active_days']} of them). Your best day was "
+                f"{stats['best_day']:%b %d} with {stats['best_total']:,.1f} {unit}.")
+
+    except Exception as e:
+        error_message = f"Sorry, I couldn't calculate that average. Error: {e}"
+        print(f"❌ {error_message}")
+        return error_message
+
+def get_health_trend(metric_type, days=30):
+    """Tells whether a metric is trending up, down or flat over the last `days` days."""
+    try:
+        result = trend(metric_type, days)
+        if result is None:
+            return f"I need at least three days of '{metric_type}' entries in the last {days} days to spot a trend."
+
+        unit = result["unit"]
+        change = f"{result['slope_per_week']:+,.1f} {unit} per week ({result['relative_per_week']:+.0%})"
+        verdict = {"up": "trending up", "down": "trending down", "flat": "holding steady"}[result["direction"]]
+        return (f"Your {metric_type} is {verdict} over {result['label']}: {change}. "
+                f"Your 7-day average is {result['moving_average']:,.1f} {unit} per day.")
+
+    except Exception as e:
+        error_message = f"Sorry, I couldn't work out the trend. Error: {e}"
+        print(f"❌ {error_message}")
+        return error_message
@@ -0,0 +1,427 @@
+# File: tasks/health_store.py
+# Storage engine for the health log. Rows live in SQLite with a
+# (metric, timestamp) index, so date-range queries and "last N entries" reads
+# are index seeks instead of a scan of the whole history.
+
+import csv
+import heapq
+import itertools
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, date, timedelta
+
+import numpy as np
+
+from .sqlite_util import open_wal_connection, SharedInstances
+
+HEALTH_DB_FILE = "kunnabuddy_health.sqlite3"
+LEGACY_CSV_FILE = "kunnabuddy_health_log.csv"   # Imported once, on first open
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+# PRAGMA synchronous: FULL fsyncs every commit, NORMAL (the WAL default) only
+# at checkpoints - an application crash loses nothing, an OS crash may lose
+# the last few commits. OFF leaves flushing to the OS entirely.
+SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL")
+DEFAULT_SYNCHRONOUS = "NORMAL"
+BULK_CHUNK_ROWS = 10_000        # append_many commits in chunks of this size
+FLUSH_SIZE = 500                # BufferedHealthWriter flushes after this many rows...
+FLUSH_INTERVAL_SECONDS = 2.0    # ...or when the oldest buffered row is this old
+_INSERT_SQL = "INSERT INTO entries (metric, ts, value, numeric_value, unit) VALUES (?, ?, ?, ?, ?)"
+
+
+# unit -> (canonical unit, factor). Rollups are kept in canonical units so
+# "500 ml" and "1.5 l" of water add up correctly.
+UNIT_CONVERSIONS = {
+    "ml": ("ml", 1.0), "l": ("ml", 1000.0), "liter": ("ml", 1000.0), "liters": ("ml", 1000.0),
+    "litre": ("ml", 1000.0), "litres": ("ml", 1000.0), "oz": ("ml", 29.5735), "cup": ("ml", 240.0),
+    "cups": ("ml", 240.0), "glass": ("ml", 250.0), "glasses": ("ml", 250.0),
+    "km": ("km", 1.0), "m": ("km", 0.001), "meters": ("km", 0.001), "mi": ("km", 1.609344),
+    "mile": ("km", 1.609344), "miles": ("km", 1.609344),
+    "kg": ("kg", 1.0), "g": ("kg", 0.001), "lb": ("kg", 0.45359237), "lbs": ("kg", 0.45359237),
+    "min": ("min", 1.0), "mins": ("min", 1.0), "minutes": ("min", 1.0), "h": ("min", 60.0),
+    "hr": ("min", 60.0), "hrs": ("min", 60.0), "hours": ("min", 60.0), "s": ("min", 1 / 60),
+    "kcal": ("kcal", 1.0), "cal": ("kcal", 1.0), "calories": ("kcal", 1.0),
+}
+
+
+def canonical_unit(unit):
+    return UNIT_CONVERSIONS.get(unit, (unit, 1.0))[0]
+
+
+def normalize_units(values, units):
+    """Vectorized: converts arrays of values/units to canonical units. Returns (values, units)."""
+    units = np.asarray(units, dtype=object)
+    values = np.asarray(values, dtype=np.float64)
+    factors = np.ones(len(values))
+    canonical = units.copy()
+    for unit in set(units.tolist()):
+        target, factor = UNIT_CONVERSIONS.get(unit, (unit, 1.0))
+        mask = units == unit
+        factors[mask] = factor
+        canonical[mask] = target
+    return values * factors, canonical
+
+
+def week_start(day_ordinal):
+    """Ordinal of the Monday starting the week that contains `day_ordinal` (works on arrays too)."""
+    # Ordinal 1 (0001-01-01) was a Monday.
+    return day_ordinal - (day_ordinal - 1) % 7
+
+
+def local_day_ordinals(timestamps):
+    """
+    Vectorized local-date ordinals. The timezone is consulted once per local
+    midnight in the covered range (so half-hour offsets and DST are right),
+    and each timestamp is placed between midnights with a binary search.
+    """
+    stamps = np.asarray(timestamps, dtype=np.float64)
+    if not len(stamps):
+        return np.zeros(0, dtype=np.int64)
+    first = date.fromtimestamp(stamps.min()).toordinal()
+    last = date.fromtimestamp(stamps.max()).toordinal()
+    midnights = np.array([datetime.combine(date.fromordinal(day), datetime.min.time()).timestamp()
+                          for day in range(first, last + 2)])
+    return first + np.searchsorted(midnights, stamps, side="right") - 1
+
+
+def _to_number(value):
+    try:
+        return float(str(value).replace(",", "").strip())
+    except ValueError:
+        return None
+
+
+class HealthStore:
+    def __init__(self, path=HEALTH_DB_FILE, legacy_csv=LEGACY_CSV_FILE, synchronous=DEFAULT_SYNCHRONOUS):
+        synchronous = synchronous.upper()
+        if synchronous not in SYNCHRONOUS_MODES:
+            raise ValueError(f"synchronous must be one of {SYNCHRONOUS_MODES}, got {synchronous!r}")
+        self._lock = threading.RLock()
+        self._conn = open_wal_connection(path, synchronous=synchronous)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                id INTEGER PRIMARY KEY,
+                metric TEXT NOT NULL,
+                ts REAL NOT NULL,
+                value TEXT NOT NULL,
+                numeric_value REAL,
+                unit TEXT NOT NULL DEFAULT ''
+            )""")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_metric_ts ON entries(metric, ts)")
+        # Precomputed per-day and per-week aggregates in canonical units,
+        # maintained on every append. `period` is a date ordinal (weeks: Monday).
+        for table in ("daily_rollups", "weekly_rollups"):
+            self._conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    metric TEXT NOT NULL, period INTEGER NOT NULL, unit TEXT NOT NULL,
+                    total REAL NOT NULL, count INTEGER NOT NULL, min REAL NOT NULL, max REAL NOT NULL,
+                    PRIMARY KEY (metric, period, unit)
+                )""")
+        self._conn.commit()
+        self._metrics = {row[0] for row in self._conn.execute("SELECT DISTINCT metric FROM entries")}
+        if not self._metrics and legacy_csv and os.path.exists(legacy_csv):
+            count = self.import_csv(legacy_csv)
+            print(f"INFO: Imported {count} health log rows from {legacy_csv}")
+        elif self._metrics and not self._conn.execute("SELECT 1 FROM daily_rollups LIMIT 1").fetchone():
+            self.rebuild_rollups()
+
+    # --- Writes ---
+
+    def _row(self, metric, value, unit="", timestamp=None):
+        timestamp = timestamp or datetime.now()
+        metric = metric.lower()
+        with self._lock:
+            self._metrics.add(metric)
+        return (metric, timestamp.timestamp(), str(value), _to_number(value), (unit or "").lower())
+
+    def _update_rollups(self, rows):
+        """
+        Folds new entry rows into the daily and weekly rollups (same
+        transaction). A batch is grouped first, so each touched
+        (metric, period, unit) costs one UPSERT however many rows it has.
+        """
+        # Plain Python here: batches are small next to a rebuild, and NumPy's
+        # fixed per-call overhead would dominate single-row appends.
+        daily = {}
+        for metric, ts, _, value, unit in rows:
+            if value is None:
+                continue
+            unit, factor = UNIT_CONVERSIONS.get(unit, (unit, 1.0))
+            value *= factor
+            _fold(daily, (metric, date.fromtimestamp(ts).toordinal(), unit), value, 1, value, value)
+        weekly = {}
+        for (metric, day, unit), (total, count, low, high) in daily.items():
+            _fold(weekly, (metric, week_start(day), unit), total, count, low, high)
+        for table, groups in (("daily_rollups", daily), ("weekly_rollups", weekly)):
+            self._conn.executemany(f"""
+                INSERT INTO {table} VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(metric, period, unit) DO UPDATE SET
+                    total = total + excluded.total, count = count + excluded.count,
+                    min = MIN(min, excluded.min), max = MAX(max, excluded.max)""",
+                [(*key, *aggregate) for key, aggregate in groups.items()])
+
+    def _write_rows(self, rows):
+        with self._lock:
+            self._conn.executemany(_INSERT_SQL, rows)
+            self._update_rollups(rows)
+            self._conn.commit()
+
+    def append(self, metric, value, unit="", timestamp=None):
+        self._write_rows([self._row(metric, value, unit, timestamp or datetime.now())])
+
+    def append_many(self, entries, chunk_size=BULK_CHUNK_ROWS):
+        """
+        Bulk ingestion. `entries` is any iterable of dicts with "metric",
+        "value" and optional "unit"/"timestamp" keys, or of
+        (metric, value[, unit[, timestamp]]) tuples. Rows are written with
+        executemany, one transaction per `chunk_size` rows. Returns the row count.
+        """
+        written, chunk = 0, []
+        for entry in entries:
+            chunk.append(self._row(*_entry_fields(entry)))
+            if len(chunk) >= chunk_size:
+                self._write_rows(chunk)
+                written += len(chunk)
+                chunk = []
+        if chunk:
+            self._write_rows(chunk)
+            written += len(chunk)
+        return written
+
+    def rebuild_rollups(self):
+        """Recomputes all rollups from the raw entries (vectorized with NumPy)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT metric, ts, numeric_value, unit FROM entries WHERE numeric_value IS NOT NULL"
+            ).fetchall()
+            self._conn.execute("DELETE FROM daily_rollups")
+            self._conn.execute("DELETE FROM weekly_rollups")
+            if rows:
+                metrics, stamps, values, units = zip(*rows)
+                values, units = normalize_units(values, units)
+                days = local_day_ordinals(stamps)
+                for table, periods in (("daily_rollups", days), ("weekly_rollups", week_start(days))):
+                    self._conn.executemany(f"INSERT INTO {table} VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                           _group_rollups(metrics, periods, units, values))
+            self._conn.commit()
+
+    def import_csv(self, path):
+        """Bulk-loads a legacy CSV log (Timestamp, MetricType, Value, Unit). Returns the row count."""
+        with open(path, mode='r', newline='', encoding='utf-8') as f:
+            rows = [
+                self._row(row["MetricType"], row["Value"], row.get("Unit", ""),
+                          datetime.strptime(row["Timestamp"], TIMESTAMP_FORMAT))
+                for row in csv.DictReader(f)
+            ]
+        with self._lock:
+            self._conn.executemany(_INSERT_SQL, rows)
+            self._conn.commit()
+            self.rebuild_rollups()
+        return len(rows)
+
+    # --- Reads ---
+
+    def resolve_metrics(self, metric_type):
+        """Exact metric name if known, otherwise every metric containing the text."""
+        metric_type = metric_type.lower().strip()
+        with self._lock:
+            if metric_type in self._metrics:
+                return [metric_type]
+            return sorted(m for m in self._metrics if metric_type in m)
+
+    def _query(self, metric, where, params, order, limit=None):
+        # One metric per query keeps every read an index seek on (metric, ts);
+        # results for several metrics are merged in Python.
+        sql = f"SELECT metric, ts, value, numeric_value, unit FROM entries WHERE metric = ? {where} ORDER BY ts {order}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        with self._lock:
+            rows = self._conn.execute(sql, (metric, *params)).fetchall()
+        return [
+            {"metric": m, "timestamp": datetime.fromtimestamp(ts), "value": v, "numeric_value": n, "unit": u}
+            for m, ts, v, n, u in rows
+        ]
+
+    def tail(self, metric_type, count=5, since=None):
+        """The most recent `count` entries (oldest first), read backwards from the index."""
+        where, params = ("AND ts >= ?", (since.timestamp(),)) if since else ("", ())
+        newest = heapq.merge(
+            *(self._query(m, where, params, "DESC", count) for m in self.resolve_metrics(metric_type)),
+            key=lambda entry: entry["timestamp"], reverse=True,
+        )
+        return list(reversed(list(itertools.islice(newest, count))))
+
+    def range(self, metric_type, start, end):
+        """Entries with start <= timestamp < end, oldest first."""
+        return list(heapq.merge(
+            *(self._query(m, "AND ts >= ? AND ts < ?", (start.timestamp(), end.timestamp()), "ASC")
+              for m in self.resolve_metrics(metric_type)),
+            key=lambda entry: entry["timestamp"],
+        ))
+
+    def rollup_series(self, metric_type, start_day, end_day, weekly=False):
+        """
+        Dense per-day (or per-week) arrays for the window [start_day, end_day)
+        given as date ordinals. Returns (periods, totals, counts, unit); periods
+        with no entries have total 0 and count 0. If the metric was logged in
+        several incompatible units the most common one is used.
+        """
+        table, stride = ("weekly_rollups", 7) if weekly else ("daily_rollups", 1)
+        if weekly:
+            start_day = week_start(start_day)
+        periods = np.arange(start_day, end_day, stride, dtype=np.int64)
+        totals, counts = np.zeros(len(periods)), np.zeros(len(periods), dtype=np.int64)
+
+        rows = []
+        with self._lock:
+            for metric in self.resolve_metrics(metric_type):
+                rows += self._conn.execute(
+                    f"SELECT period, unit, total, count FROM {table} WHERE metric = ? AND period >= ? AND period < ?",
+                    (metric, start_day, end_day)).fetchall()
+        if not rows:
+            return periods, totals, counts, None
+
+        row_periods, row_units, row_totals, row_counts = (np.array(column) for column in zip(*rows))
+        unit_names, unit_counts = np.unique(row_units.astype(str), return_counts=True)
+        unit = unit_names[np.argmax(unit_counts)]
+        keep = row_units.astype(str) == unit
+        slots = (row_periods[keep] - start_day) // stride
+        np.add.at(totals, slots, row_totals[keep].astype(np.float64))
+        np.add.at(counts, slots, row_counts[keep].astype(np.int64))
+        return periods, totals, counts, unit
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+
+def _fold(groups, key, total, count, low, high):
+    current = groups.get(key)
+    if current is None:
+        groups[key] = [total, count, low, high]
+    else:
+        current[0] += total
+        current[1] += count
+        current[2] = min(current[2], low)
+        current[3] = max(current[3], high)
+
+
+def _entry_fields(entry):
+    """(metric, value, unit, timestamp) from a dict or a short tuple."""
+    if isinstance(entry, dict):
+        return entry["metric"], entry["value"], entry.get("unit", ""), entry.get("timestamp")
+    metric, value, *rest = entry
+    return (metric, value, *rest)
+
+
+class BufferedHealthWriter:
+    """
+    Collects entries in memory and writes them to a HealthStore in batches:
+    after `flush_size` rows, when the oldest buffered row is `flush_interval`
+    seconds old (checked by a daemon thread), and on flush()/close(). Meant
+    for high-rate sources such as wearables; rows still in the buffer are lost
+    if the process dies, so durability is bounded by the flush interval plus
+    the store's synchronous mode.
+
+    Usable as a context manager.
+    """
+
+    def __init__(self, store=None, flush_size=FLUSH_SIZE, flush_interval=FLUSH_INTERVAL_SECONDS):
+        self.store = store if store is not None else get_health_store()
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._oldest = None
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._flusher = None
+        if flush_interval:
+            self._flusher = threading.Thread(target=self._flush_periodically, daemon=True)
+            self._flusher.start()
+
+    def write(self, metric, value, unit="", timestamp=None):
+        row = self.store._row(metric, value, unit, timestamp)
+        with self._lock:
+            if self._closed.is_set():
+                raise RuntimeError("BufferedHealthWriter is closed")
+            self._buffer.append(row)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            full = len(self._buffer) >= self.flush_size
+        if full:
+            self.flush()
+
+    def write_many(self, entries):
+        for entry in entries:
+            self.write(*_entry_fields(entry))
+
+    def flush(self):
+        """Writes everything buffered so far. Returns the number of rows written."""
+        with self._lock:
+            rows, self._buffer, self._oldest = self._buffer, [], None
+        if not rows:
+            return 0
+        try:
+            self.store._write_rows(rows)
+        except sqlite3.Error:
+            # Put the rows back (ahead of anything written meanwhile) so the next flush retries them.
+            with self._lock:
+                self._buffer[:0] = rows
+                self._oldest = time.monotonic()
+            raise
+        return len(rows)
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.flush_interval / 4):
+            with self._lock:
+                due = self._oldest is not None and time.monotonic() - self._oldest >= self.flush_interval
+            if due:
+                try:
+                    self.flush()
+                except sqlite3.Error as e:
+                    print(f"WARNING: Buffered health flush failed, will retry: {e}")
+
+    def close(self):
+        self._closed.set()
+        if self._flusher:
+            self._flusher.join()
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _group_rollups(metrics, periods, units, values):
+    """Vectorized group-by (metric, period, unit) -> rollup rows."""
+    metric_ids, metric_names = _factorize(metrics)
+    unit_ids, unit_names = _factorize(units)
+    keys = np.stack([metric_ids, periods, unit_ids], axis=1)
+    groups, inverse = np.unique(keys, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    totals = np.bincount(inverse, weights=values)
+    counts = np.bincount(inverse)
+    minimums = np.full(len(groups), np.inf)
+    maximums = np.full(len(groups), -np.inf)
+    np.minimum.at(minimums, inverse, values)
+    np.maximum.at(maximums, inverse, values)
+    return [
+        (metric_names[m], int(p), unit_names[u], float(t), int(c), float(lo), float(hi))
+        for (m, p, u), t, c, lo, hi in zip(groups.tolist(), totals, counts, minimums, maximums)
+    ]
+
+
+def _factorize(labels):
+    names, ids = np.unique(np.asarray(labels, dtype=str), return_inverse=True)
+    return ids.reshape(-1), names.tolist()
+
+
+_stores = SharedInstances(HealthStore)
+
+
+def get_health_store():
+    """Returns the process-wide HealthStore, opening (and migrating) it on first use."""
+    return _stores.get()
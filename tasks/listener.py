@@ -1,22 +1,382 @@
-import speech_recognition as sr
-
-def listen_for_command():
-    r = sr.Recognizer()
-    with sr.Microphone() as source:
-        print("Calibrating microphone...")
-        r.adjust_for_ambient_noise(source, duration=1)
-        print("Listening for your command...")
+# File: tasks/listener.py
+# Persistent microphone capture for voice mode. One input stream stays open
+# for the whole session; every 30 ms frame updates a rolling noise-floor
+# estimate and goes through an energy VAD, and complete utterances are queued
+# for the main loop. Nothing is calibrated per turn, so the next command can
+# start the moment the previous one ends (or even while it is being handled).
+#
+#   listener = start_background_listener(is_playing=is_speaking)
+#   text = listen_for_command()          # next utterance, recognized
+#
+# Recognition backend per KUNNABUDDY_STT_BACKEND: "whisper" (local, offline,
+# shares the model with meeting transcription), "google" (Web Speech API), or
+# "auto" (default: Whisper when installed, Google otherwise).
+
+import collections
+import importlib.util
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+FRAME_MS = 30
+FRAME_SAMPLES = SAMPLE_RATE * FRAME_MS // 1000
+
+# Noise floor: a low percentile of recent frame energies, so it follows a fan
+# switching on (or off) within a few seconds without being dragged up by speech.
+NOISE_WINDOW_SECONDS = 5
+NOISE_PERCENTILE = 15
+WARMUP_SECONDS = 0.3            # Only once, when the stream opens
+SPEECH_MARGIN_DB = 10           # A frame is voiced this far above the floor...
+MIN_SPEECH_DBFS = -55           # ...and above this absolute level
+
+START_MS = 90                   # Voiced run that opens an utterance
+END_SILENCE_MS = 700            # Silence that closes it
+PRE_ROLL_MS = 300               # Audio kept from before the start was detected
+TRAILING_MS = 150               # Silence kept after the last voiced frame
+MIN_SPEECH_MS = 250             # Shorter utterances (clicks, bumps) are dropped
+MAX_UTTERANCE_SECONDS = 10      # Same cap as the old phrase_time_limit
+QUEUE_SIZE = 8
+
+# Recognized only from utterances that overlap KunnaBuddy's own speech
+BARGE_IN_WORDS = ("stop", "exit", "quit")
+
+STT_BACKEND = os.environ.get("KUNNABUDDY_STT_BACKEND", "auto").lower()
+# Partial hypotheses (Whisper only): the utterance so far is re-decoded this often while it grows
+PARTIAL_INTERVAL_MS = 600
+MIN_PARTIAL_MS = 500
+PARTIAL_PAUSE_MS = 240          # No new partial once the speaker has paused this long: the final decode is near
+# Whisper segments this likely to be silence, and this unsure, are its stock hallucinations ("Thank you.")
+NO_SPEECH_PROB = 0.6
+NO_SPEECH_LOGPROB = -1.0
+
+
+def _frames(ms):
+    return max(1, ms // FRAME_MS)
+
+
+class CapturedUtterance:
+    """One segmented utterance: float32 mono samples at SAMPLE_RATE."""
+
+    def __init__(self, audio, started_at, ended_at, voiced_frames, during_playback):
+        self.audio = audio
+        self.started_at = started_at            # perf_counter() of the first captured sample
+        self.ended_at = ended_at                # perf_counter() when end of speech was detected
+        self.voiced_seconds = voiced_frames * FRAME_MS / 1000
+        self.during_playback = during_playback  # KunnaBuddy was talking at some point
+
+    @property
+    def duration(self):
+        return len(self.audio) / SAMPLE_RATE
+
+    def pcm16(self):
+        return (np.clip(self.audio, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+
+
+class VoiceActivityDetector:
+    """
+    Segments a stream of float32 samples into utterances. Frame energies are
+    computed for a whole block at once; only the start/end state machine runs
+    per frame.
+    """
+
+    def __init__(self):
+        self._remainder = np.zeros(0, dtype=np.float32)
+        self._energies = collections.deque(maxlen=NOISE_WINDOW_SECONDS * 1000 // FRAME_MS)
+        self.noise_floor_db = None
+        self._pre_roll = collections.deque(maxlen=_frames(PRE_ROLL_MS))
+        self._frames = None                     # frames of the utterance in progress
+        self._voiced_run = 0
+        self._silent_run = 0
+        self._voiced_total = 0
+        self._during_playback = False
+
+    @property
+    def in_speech(self):
+        return self._frames is not None
+
+    @property
+    def silence_ms(self):
+        """Silence since the last voiced frame of the utterance in progress."""
+        return self._silent_run * FRAME_MS if self._frames is not None else 0
+
+    def current_audio(self):
+        """Samples of the utterance in progress, or None. Safe to call from another thread."""
+        frames = self._frames
+        return np.concatenate(list(frames)) if frames else None
+
+    def feed(self, samples, playing=False, now=None):
+        """Consumes samples; returns the CapturedUtterances completed by them."""
+        now = time.perf_counter() if now is None else now
+        samples = np.concatenate((self._remainder, np.asarray(samples, dtype=np.float32).ravel()))
+        count = len(samples) // FRAME_SAMPLES
+        self._remainder = samples[count * FRAME_SAMPLES:]
+        if not count:
+            return []
+        frames = samples[:count * FRAME_SAMPLES].reshape(count, FRAME_SAMPLES)
+        energies = 10 * np.log10(np.mean(frames * frames, axis=1) + 1e-10)
+        self._energies.extend(energies.tolist())
+        if len(self._energies) < WARMUP_SECONDS * 1000 // FRAME_MS:
+            return []
+        self.noise_floor_db = float(np.percentile(self._energies, NOISE_PERCENTILE))
+        voiced = energies > max(self.noise_floor_db + SPEECH_MARGIN_DB, MIN_SPEECH_DBFS)
+
+        completed = []
+        for i in range(count):
+            # Time at the end of frame i, given the block ends at `now`
+            frame_end = now - (count - 1 - i) * FRAME_MS / 1000
+            utterance = self._step(frames[i], bool(voiced[i]), playing, frame_end)
+            if utterance is not None:
+                completed.append(utterance)
+        return completed
+
+    def _step(self, frame, voiced, playing, frame_end):
+        if self._frames is None:
+            self._pre_roll.append(frame)
+            self._voiced_run = self._voiced_run + 1 if voiced else 0
+            if self._voiced_run >= _frames(START_MS):
+                self._frames = list(self._pre_roll)
+                self._pre_roll.clear()
+                self._silent_run = 0
+                self._voiced_total = self._voiced_run
+                self._during_playback = playing
+            return None
+
+        self._frames.append(frame)
+        self._during_playback |= playing
+        if voiced:
+            self._voiced_total += 1
+            self._silent_run = 0
+        else:
+            self._silent_run += 1
+        if self._silent_run >= _frames(END_SILENCE_MS):
+            keep = len(self._frames) - self._silent_run + _frames(TRAILING_MS)
+            return self._finish(self._frames[:keep], frame_end)
+        if len(self._frames) >= MAX_UTTERANCE_SECONDS * 1000 // FRAME_MS:
+            return self._finish(self._frames, frame_end)
+        return None
+
+    def _finish(self, frames, frame_end):
+        voiced_total, during_playback = self._voiced_total, self._during_playback
+        total_frames = len(self._frames)
+        self._frames, self._voiced_run = None, 0
+        if voiced_total < _frames(MIN_SPEECH_MS):
+            return None
+        started_at = frame_end - total_frames * FRAME_MS / 1000
+        return CapturedUtterance(np.concatenate(frames), started_at, frame_end, voiced_total, during_playback)
+
+
+class BackgroundListener:
+    def __init__(self, is_playing=None, device=None):
+        """`is_playing()` reports whether KunnaBuddy is speaking (to tag echo of its own voice)."""
+        self.is_playing = is_playing or (lambda: False)
+        self.device = device
+        self.vad = VoiceActivityDetector()
+        self.utterances = queue.Queue(maxsize=QUEUE_SIZE)
+        self._stream = None
+        self._lock = threading.Lock()
+        self.stats = collections.Counter()
+        self.last_turn_start_latency = None
+        self.last_recognition_latency = None    # end of speech -> final text
+
+    # --- Capture ---
+
+    def start(self):
+        with self._lock:
+            if self._stream is None:
+                import sounddevice as sd
+                self._stream = sd.InputStream(samplerate=SAMPLE_RATE, channels=1, dtype="float32",
+                                              blocksize=FRAME_SAMPLES, device=self.device,
+                                              callback=self._callback)
+                self._stream.start()
+        return self
+
+    def stop(self):
+        with self._lock:
+            stream, self._stream = self._stream, None
+        if stream is not None:
+            stream.stop()
+            stream.close()
+
+    def is_running(self):
+        return self._stream is not None
+
+    def _callback(self, indata, frames, time_info, status):
+        if status:
+            self.stats["stream_warnings"] += 1
+        self._on_audio(indata[:, 0])
+
+    def _on_audio(self, samples):
+        # Runs on the audio thread: a few vector ops per 30 ms block
+        for utterance in self.vad.feed(samples, playing=self.is_playing()):
+            try:
+                self.utterances.put_nowait(utterance)
+                self.stats["utterances"] += 1
+            except queue.Full:
+                self.stats["dropped"] += 1      # nobody is consuming (e.g. text mode)
+
+    # --- Consumer side ---
+
+    def next_utterance(self, timeout=None):
+        """Blocks for the next complete utterance; None on timeout."""
+        began = time.perf_counter()
+        self.start()
+        self.last_turn_start_latency = time.perf_counter() - began    # ~0 once the stream is open
+        try:
+            return self.utterances.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def get_stats(self):
+        return {
+            "running": self.is_running(),
+            "noise_floor_dbfs": self.vad.noise_floor_db,
+            "utterances": self.stats["utterances"],
+            "dropped": self.stats["dropped"],
+            "ignored_echo": self.stats["ignored_echo"],
+            "stream_warnings": self.stats["stream_warnings"],
+            "turn_start_latency": self.last_turn_start_latency,
+            "recognition_latency": self.last_recognition_latency,
+            "stt_backend": _stt_backend(),
+        }
+
+
+_listener = None
+_listener_lock = threading.Lock()
+_recognizer = None
+_resolved_backend = None
+
+
+def start_background_listener(is_playing=None):
+    """Opens the persistent capture stream (once) and returns the listener."""
+    global _listener
+    with _listener_lock:
+        if _listener is None:
+            _listener = BackgroundListener(is_playing)
+        elif is_playing is not None:
+            _listener.is_playing = is_playing
+    return _listener.start()
+
+
+def get_listener_stats():
+    return _listener.get_stats() if _listener is not None else {"running": False}
+
+
+def _stt_backend():
+    global _resolved_backend
+    if _resolved_backend is None:
+        if STT_BACKEND in ("whisper", "google"):
+            _resolved_backend = STT_BACKEND
+        else:
+            _resolved_backend = "whisper" if importlib.util.find_spec("whisper") is not None else "google"
+    return _resolved_backend
+
+
+def _clean(text):
+    # Whisper punctuates ("Stop."); commands are matched on bare words
+    return text.strip().strip(".!?,").strip().lower()
+
+
+def _recognize_whisper(audio, interim=False):
+    """Text of `audio`; None for an interim decode that gave way to another one."""
+    from .whisper_stt import transcribe
+    result = transcribe(audio, interim=interim)
+    if result is None:
+        return None
+    segments = result.get("segments") or []
+    if segments and all(seg["no_speech_prob"] > NO_SPEECH_PROB and seg["avg_logprob"] < NO_SPEECH_LOGPROB
+                        for seg in segments):
+        return ""
+    return _clean(result["text"])
+
+
+def _recognize_google(utterance):
+    global _recognizer
+    import speech_recognition as sr
+    if _recognizer is None:
+        _recognizer = sr.Recognizer()
+    audio = sr.AudioData(utterance.pcm16(), SAMPLE_RATE, 2)
+    try:
+        return _recognizer.recognize_google(audio).lower()
+    except sr.UnknownValueError:
+        print("Could not understand audio.")
+        return ""
+    except sr.RequestError as e:
+        print(f"Could not request results; {e}")
+        return ""
+
+
+def recognize(utterance):
+    """Text of a captured utterance (lowercase, "" if nothing was understood)."""
+    if _stt_backend() == "whisper":
+        return _recognize_whisper(utterance.audio)
+    return _recognize_google(utterance)
+
+
+def warm_up_recognizer():
+    """Starts loading the local recognizer in the background (call when voice mode starts)."""
+    if _stt_backend() == "whisper":
+        from .whisper_stt import warm_up_whisper
+        warm_up_whisper()
+
+
+def _emit_partials(listener, on_partial, done):
+    """
+    Re-decodes the growing utterance every PARTIAL_INTERVAL_MS until `done` is
+    set. Partials never hold up the final decode: none is started once the
+    speaker pauses or the utterance is complete, and one that would have to
+    wait for the model is skipped.
+    """
+    last_length, last_text = 0, None
+    while not done.wait(PARTIAL_INTERVAL_MS / 1000):
+        audio = listener.vad.current_audio()
+        if audio is None:
+            last_length, last_text = 0, None
+            continue
+        if (len(audio) < SAMPLE_RATE * MIN_PARTIAL_MS // 1000 or len(audio) == last_length
+                or listener.vad.silence_ms >= PARTIAL_PAUSE_MS):
+            continue
+        last_length = len(audio)
+        if done.is_set():
+            return
         try:
-            audio = r.listen(source, timeout=5, phrase_time_limit=10)
-            print("Recognizing...")
-            text = r.recognize_google(audio)
-            return text.lower()
-        except sr.WaitTimeoutError:
-            print("No command heard.")
-            return ""
-        except sr.UnknownValueError:
-            print("Could not understand audio.")
-            return ""
-        except sr.RequestError as e:
-            print(f"Could not request results; {e}")
-            return ""
\ No newline at end of file
+            text = _recognize_whisper(audio, interim=True)
+        except Exception as e:
+            print(f"WARNING: Partial transcription failed: {e}")
+            return
+        if text and text != last_text and not done.is_set():
+            last_text = text
+            on_partial(text)
+
+
+def listen_for_command(timeout=None, on_partial=None):
+    """
+    Next spoken command from the background listener, recognized. While
+    KunnaBuddy is talking only BARGE_IN_WORDS are accepted, so it does not
+    answer its own voice.
+
+    With the Whisper backend, `on_partial(text)` is called with interim
+    hypotheses while the user is still speaking (e.g. to start routing early).
+    """
+    listener = start_background_listener()
+    partials_done = threading.Event()
+    if on_partial is not None and _stt_backend() == "whisper":
+        threading.Thread(target=_emit_partials, args=(listener, on_partial, partials_done),
+                         daemon=True, name="stt-partials").start()
+    try:
+        utterance = listener.next_utterance(timeout)
+    finally:
+        partials_done.set()
+    if utterance is None:
+        print("No command heard.")
+        return ""
+    print("Recognizing...")
+    text = recognize(utterance)
+    listener.last_recognition_latency = time.perf_counter() - utterance.ended_at
+    if text and utterance.during_playback and text.strip() not in BARGE_IN_WORDS:
+        listener.stats["ignored_echo"] += 1
+        return ""
+    return text
@@ -1,29 +1,7 @@
 # --- NEW FILE: tasks/memory_helper.py ---
 
-import os
-import json
-from datetime import datetime
-
-MEMORY_FILE = "kunnabuddy_memory.json"
-
-def _load_memory():
-    """Loads the memory dictionary from the JSON file."""
-    if not os.path.exists(MEMORY_FILE):
-        return {}
-    try:
-        with open(MEMORY_FILE, 'r') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError):
-        # If file is empty or corrupted, start with an empty memory
-        return {}
-
-def _save_memory(memory_data):
-    """Saves the memory dictionary to the JSON file."""
-    try:
-        with open(MEMORY_FILE, 'w') as f:
-            json.dump(memory_data, f, indent=4)
-    except IOError as e:
-        print(f"❌ Error saving memory file: {e}")
+from .memory_store import get_memory_store
+from .memory_index import resolve_memory_key, FORGET_MIN_SCORE
 
 def remember_info(key, value):
     """Saves a piece of information (a key-value pair) to memory."""
@@ -31,12 +9,7 @@ def remember_info(key, value):
         return "I need both a topic and the information you want me to remember about it."
     
     print(f"🧠 Remembering: '{key}' -> '{value}'")
-    memories = _load_memory()
-    memories[key.lower()] = {
-        "value": value,
-        "timestamp": datetime.now().isoformat()
-    }
-    _save_memory(memories)
+    get_memory_store().set(key.lower(), value)
     return f"Okay, I've remembered that '{key}' is '{value}'."
 
 def recall_info(key):
@@ -45,13 +18,13 @@ def recall_info(key):
         return "What topic do you want me to recall information about?"
 
     print(f"🧠 Recalling info for: '{key}'")
-    memories = _load_memory()
-    
-    retrieved_item = memories.get(key.lower())
+    store = get_memory_store()
+    stored_key, _ = resolve_memory_key(store, key.lower())
+    retrieved_item = store.get(stored_key) if stored_key else None
     
     if retrieved_item:
         value = retrieved_item.get("value")
-        return f"I remember you told me that '{key}' is '{value}'."
+        return f"I remember you told me that '{stored_key}' is '{value}'."
     else:
         return f"I don't have any specific memory stored for '{key}'."
 
@@ -61,11 +34,9 @@ def forget_info(key):
         return "What topic should I forget?"
         
     print(f"🧠 Forgetting info for: '{key}'")
-    memories = _load_memory()
-    
-    if key.lower() in memories:
-        del memories[key.lower()]
-        _save_memory(memories)
-        return f"Okay, I have forgotten what I knew about '{key}'."
+    store = get_memory_store()
+    stored_key, _ = resolve_memory_key(store, key.lower(), min_score=FORGET_MIN_SCORE)
+    if stored_key and store.delete(stored_key):
+        return f"Okay, I have forgotten what I knew about '{stored_key}'."
     else:
-        return f"I don't have a memory for '{key}', so there's nothing to forget."
\ No newline at end of file
+        return f"I don't have a memory for '{key}', so there's nothing to forget."
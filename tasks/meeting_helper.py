@@ -1,14 +1,9 @@
 # File: tasks/meeting_helper.py (DEFINITIVE - with AI Summarization)
 
-import os, time, re, whisper, sounddevice as sd, numpy as np, tempfile, datetime, threading
-from scipy.io.wavfile import write
+import time, re, sounddevice as sd, numpy as np, datetime, threading
 from .gemini_helper import ask_gemini # <-- NEW IMPORT
-
-# --- WHISPER MODEL (UNCHANGED) ---
-SAMPLE_RATE, MODEL_SIZE = 16000, "base.en"
-print("INFO: Loading transcription model...")
-model = whisper.load_model(MODEL_SIZE)
-print("✅ Transcription model loaded.")
+# Whisper is loaded on the first transcription (or warmed up at startup), not at import
+from .whisper_stt import SAMPLE_RATE, transcribe
 
 # --- Global variables for threaded recording (UNCHANGED) ---
 _is_listening = False
@@ -50,16 +45,12 @@ def stop_listening_and_transcribe():
     print("INFO: Concatenating recorded audio...")
     recorded_audio = np.concatenate(_audio_chunks, axis=0)
     
-    temp_filename = ""
     try:
-        audio_int16 = np.int16(recorded_audio * 32767)
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
-            temp_filename = tmp.name
-            write(temp_filename, SAMPLE_RATE, audio_int16)
-        
-        # --- STEP 1: Get the full transcript ---
+        # --- STEP 1: Get the full transcript (straight from the recorded buffer) ---
         print("INFO: Sending audio to Whisper for transcription...")
-        result = model.transcribe(temp_filename, without_timestamps=True)
+        # Long-form: keep Whisper's defaults of conditioning on earlier text and temperature fallback
+        result = transcribe(recorded_audio, condition_on_previous_text=True,
+                            temperature=(0.0, 0.2, 0.4, 0.6, 0.8, 1.0))
         transcript = result['text'].strip()
         
         if not transcript:
@@ -81,7 +72,7 @@ def stop_listening_and_transcribe():
         EXECUTIVE SUMMARY:
         """
         
-        summary = ask_gemini(summarization_prompt)
+        summary = ask_gemini(summarization_prompt, call_site="meeting_summary")
         # --- END OF NEW STEP ---
 
         # --- STEP 3: Save BOTH the summary and the full transcript ---
@@ -107,7 +98,4 @@ def stop_listening_and_transcribe():
         return f"Meeting summary and full transcript have been saved to the file: {fn}."
         
     except Exception as e:
-        return f"An error occurred during transcription or summarization: {e}"
-    finally:
-        if temp_filename and os.path.exists(temp_filename):
-            os.remove(temp_filename)
\ No newline at end of file
+        return f"An error occurred during transcription or summarization: {e}"
\ No newline at end of file
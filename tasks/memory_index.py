@@ -0,0 +1,234 @@
+# File: tasks/memory_index.py
+# Fuzzy lookup over memory keys and values, so "wifi password" finds a
+# memory stored as "wi-fi password". Registered as a MemoryStore listener,
+# it is updated incrementally on every remember/forget.
+
+import re
+import threading
+import zlib
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+
+MIN_SCORE = 0.55          # Below this a candidate is not considered a match
+FORGET_MIN_SCORE = 0.8    # Deleting is destructive, so it needs a closer match
+VALUE_WEIGHT = 0.6        # Matches on the stored value count for less than key matches
+USE_VECTOR_SEARCH = False  # Adds a hashed-trigram cosine tier (needs NumPy)
+VECTOR_DIMENSIONS = 512
+# Candidate generation walks posting lists rarest-first and stops after this
+# many entries, which keeps lookups sub-millisecond at tens of thousands of
+# memories. Very common trigrams add little signal anyway.
+MAX_POSTINGS_SCANNED = 1000
+RERANK_CANDIDATES = 20
+# Every word of a fuzzy query needs a counterpart at least this close in the
+# match, so "bank password" does not recall "wifi password" on the shared word.
+WORD_MIN_RATIO = 0.75
+
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9 ]+")
+_QUERY_FILLER_RE = re.compile(
+    r"^(?:(?:what(?:'s| is| was| are)|tell me|recall|do you remember|remind me of)\b)?\s*(?:(?:my|the)\b)?\s*"
+    r"|\s*(?:\bagain)?\??$"
+)
+
+
+def normalize(text):
+    """Lower-cases and drops punctuation, so "Wi-Fi" and "wifi" normalize alike."""
+    text = _NON_ALNUM_RE.sub("", text.lower().replace("-", ""))
+    return " ".join(text.split())
+
+
+def _covers(query, text):
+    """True if each query word (of 3+ letters) is close to some word of `text`."""
+    words = text.split()
+    return all(any(word == other or SequenceMatcher(None, word, other).ratio() >= WORD_MIN_RATIO for other in words)
+               for word in query.split() if len(word) > 2)
+
+
+def _trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class _HashedVectors:
+    """
+    Optional dense similarity tier: hashed character-trigram vectors, L2
+    normalized, stored as rows of a NumPy matrix. Deleted rows go on a free list
+    so inserts and deletes never rebuild the matrix.
+    """
+
+    def __init__(self, np, dimensions=VECTOR_DIMENSIONS):
+        self.np = np
+        self.dimensions = dimensions
+        self.matrix = np.zeros((64, dimensions), dtype=np.float32)
+        self.row_of = {}
+        self.key_of = {}
+        self.free_rows = list(range(63, -1, -1))
+
+    def _embed(self, text):
+        vector = self.np.zeros(self.dimensions, dtype=self.np.float32)
+        for gram in _trigrams(text):
+            vector[zlib.crc32(gram.encode("utf-8")) % self.dimensions] += 1.0
+        norm = self.np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def add(self, key, text):
+        self.remove(key)
+        if not self.free_rows:
+            old_rows = self.matrix.shape[0]
+            self.matrix = self.np.vstack([self.matrix, self.np.zeros_like(self.matrix)])
+            self.free_rows = list(range(self.matrix.shape[0] - 1, old_rows - 1, -1))
+        row = self.free_rows.pop()
+        self.matrix[row] = self._embed(text)
+        self.row_of[key] = row
+        self.key_of[row] = key
+
+    def remove(self, key):
+        row = self.row_of.pop(key, None)
+        if row is not None:
+            del self.key_of[row]
+            self.matrix[row] = 0.0
+            self.free_rows.append(row)
+
+    def search(self, text, limit):
+        if not self.row_of:
+            return []
+        scores = self.matrix @ self._embed(text)
+        top = self.np.argpartition(-scores, min(limit, len(scores) - 1))[:limit]
+        return [(self.key_of[row], float(scores[row])) for row in top if row in self.key_of]
+
+
+class MemoryIndex:
+    """Trigram inverted index with edit-distance re-ranking (and optional vectors)."""
+
+    def __init__(self, use_vectors=False):
+        self._lock = threading.Lock()
+        self._postings = defaultdict(set)     # trigram -> {(key, field)}
+        self._grams = {}                      # (key, field) -> trigrams
+        self._texts = {}                      # (key, field) -> normalized text
+        self._exact = {}                      # normalized key -> key
+        self._vectors = None
+        if use_vectors:
+            try:
+                import numpy as np
+                self._vectors = _HashedVectors(np)
+            except ImportError:
+                print("INFO: NumPy is not installed; memory vector search is disabled.")
+
+    # --- MemoryStore listener hooks ---
+
+    def add(self, key, item):
+        with self._lock:
+            self._remove_locked(key)
+            for field, text in (("key", key), ("value", str(item.get("value", "")))):
+                normalized = normalize(text)
+                grams = _trigrams(normalized)
+                self._grams[(key, field)] = grams
+                self._texts[(key, field)] = normalized
+                for gram in grams:
+                    self._postings[gram].add((key, field))
+            self._exact[self._texts[(key, "key")]] = key
+            if self._vectors:
+                self._vectors.add(key, normalize(key))
+
+    def remove(self, key):
+        with self._lock:
+            self._remove_locked(key)
+
+    def rebuild(self, items):
+        with self._lock:
+            self._postings.clear()
+            self._grams.clear()
+            self._texts.clear()
+            self._exact.clear()
+            if self._vectors:
+                self._vectors = _HashedVectors(self._vectors.np)
+        for key, item in items.items():
+            self.add(key, item)
+
+    def _remove_locked(self, key):
+        normalized = self._texts.get((key, "key"))
+        if normalized is not None and self._exact.get(normalized) == key:
+            del self._exact[normalized]
+        for field in ("key", "value"):
+            grams = self._grams.pop((key, field), None)
+            self._texts.pop((key, field), None)
+            for gram in grams or ():
+                entries = self._postings[gram]
+                entries.discard((key, field))
+                if not entries:
+                    del self._postings[gram]
+        if self._vectors:
+            self._vectors.remove(key)
+
+    # --- Queries ---
+
+    def search(self, query, limit=5, min_score=MIN_SCORE):
+        """
+        Returns up to `limit` (key, score) pairs, best first. Scores are in
+        [0, 1]: trigram Dice overlap blended with a SequenceMatcher ratio.
+        """
+        text = normalize(_QUERY_FILLER_RE.sub("", query.lower()) or query)
+        grams = _trigrams(text)
+        with self._lock:
+            exact = self._exact.get(text)
+            if exact is not None:
+                return [(exact, 1.0)]
+
+            overlap, scanned = Counter(), 0
+            for gram in sorted(grams, key=lambda g: len(self._postings.get(g, ()))):
+                entries = self._postings.get(gram)
+                if not entries:
+                    continue
+                if scanned and scanned + len(entries) > MAX_POSTINGS_SCANNED:
+                    break
+                scanned += len(entries)
+                overlap.update(entries)
+
+            # Exact trigram overlap for the strongest candidates, then the
+            # (slower) edit-distance ratio only for the best few of those.
+            dices = []
+            for entry, _ in overlap.most_common(max(limit, RERANK_CANDIDATES)):
+                entry_grams = self._grams[entry]
+                dices.append((2 * len(grams & entry_grams) / (len(grams) + len(entry_grams)), entry))
+            dices.sort(reverse=True)
+
+            best = {}
+            for dice, (key, field) in dices[:limit]:
+                if not _covers(text, self._texts[(key, field)]):
+                    continue
+                ratio = SequenceMatcher(None, text, self._texts[(key, field)]).ratio()
+                score = (dice + ratio) / 2 * (VALUE_WEIGHT if field == "value" else 1.0)
+                best[key] = max(best.get(key, 0.0), score)
+
+            if self._vectors:
+                for key, cosine in self._vectors.search(text, limit):
+                    if not _covers(text, self._texts[(key, "key")]):
+                        continue
+                    best[key] = max(best.get(key, 0.0), cosine)
+
+        ranked = sorted(((k, s) for k, s in best.items() if s >= min_score), key=lambda p: p[1], reverse=True)
+        return ranked[:limit]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_memory_index(store):
+    """Returns the process-wide index, attaching it to `store` on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = MemoryIndex(use_vectors=USE_VECTOR_SEARCH)
+            store.add_listener(_index)
+        return _index
+
+
+def resolve_memory_key(store, key, min_score=MIN_SCORE):
+    """
+    Finds the stored key that best matches `key`: an exact hit first, then the
+    top fuzzy candidate. Returns (stored_key, score) or (None, 0.0).
+    """
+    if store.get(key) is not None:
+        return key, 1.0
+    matches = get_memory_index(store).search(key, limit=1, min_score=min_score)
+    return matches[0] if matches else (None, 0.0)
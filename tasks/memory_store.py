@@ -0,0 +1,148 @@
+# File: tasks/memory_store.py
+# Durable key-value store behind remember/recall/forget. Both the CLI helper
+# (tasks/log_helper.py) and the web helper (memory_helper.py) use it.
+#
+# SQLite in WAL mode gives us atomic, crash-safe single-row writes and
+# cross-process locking; an in-memory dict serves reads without touching disk.
+
+import json
+import os
+import threading
+from datetime import datetime
+
+from .sqlite_util import open_wal_connection, SharedInstances
+
+MEMORY_DB_FILE = "kunnabuddy_memory.sqlite3"
+LEGACY_MEMORY_FILE = "kunnabuddy_memory.json"   # Imported once, on first open
+CHECKPOINT_EVERY_WRITES = 1000                  # WAL compaction cadence
+BUSY_TIMEOUT_MS = 5000                          # Wait this long for another process's lock
+
+
+class MemoryStore:
+    def __init__(self, path=MEMORY_DB_FILE, legacy_json=LEGACY_MEMORY_FILE):
+        self.path = path
+        self._lock = threading.RLock()
+        # NORMAL is durable across application crashes in WAL mode; only an OS
+        # crash can lose the last few commits.
+        self._conn = open_wal_connection(path, synchronous="NORMAL", busy_timeout_ms=BUSY_TIMEOUT_MS,
+                                         isolation_level=None)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS memories (
+                key TEXT PRIMARY KEY, value TEXT NOT NULL, timestamp TEXT NOT NULL
+            )""")
+        self._writes_since_checkpoint = 0
+        self._listeners = []
+        self._data_version = None
+        self._cache = {}
+        self._reload()
+        if not self._cache and legacy_json and os.path.exists(legacy_json):
+            self._import_legacy_json(legacy_json)
+
+    # --- Internal ---
+
+    def _current_data_version(self):
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _reload(self):
+        self._cache = {
+            key: {"value": value, "timestamp": timestamp}
+            for key, value, timestamp in self._conn.execute("SELECT key, value, timestamp FROM memories")
+        }
+        self._data_version = self._current_data_version()
+        for listener in self._listeners:
+            listener.rebuild(self._cache)
+
+    def _refresh_if_changed(self):
+        # data_version only changes when *another* connection commits, so this
+        # is how we pick up writes from other processes.
+        if self._current_data_version() != self._data_version:
+            self._reload()
+
+    def _import_legacy_json(self, path):
+        try:
+            with open(path, 'r') as f:
+                legacy = json.load(f)
+        except (json.JSONDecodeError, IOError):
+            return
+        rows = []
+        for key, item in legacy.items():
+            if isinstance(item, dict):
+                rows.append((key.lower(), str(item.get("value")), item.get("timestamp") or datetime.now().isoformat()))
+            else:
+                rows.append((key.lower(), str(item), datetime.now().isoformat()))
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.executemany("INSERT OR REPLACE INTO memories VALUES (?, ?, ?)", rows)
+            self._conn.execute("COMMIT")
+            self._reload()
+        print(f"INFO: Imported {len(rows)} memories from {path}")
+
+    def _after_write(self):
+        self._writes_since_checkpoint += 1
+        if self._writes_since_checkpoint >= CHECKPOINT_EVERY_WRITES:
+            self.compact()
+
+    # --- Public API ---
+
+    def add_listener(self, listener):
+        """Registers an index with add(key, item)/remove(key)/rebuild(items) hooks."""
+        with self._lock:
+            self._listeners.append(listener)
+            listener.rebuild(self._cache)
+
+    def set(self, key, value):
+        value = str(value)
+        item = {"value": value, "timestamp": datetime.now().isoformat()}
+        with self._lock:
+            self._refresh_if_changed()
+            self._conn.execute("INSERT OR REPLACE INTO memories VALUES (?, ?, ?)", (key, value, item["timestamp"]))
+            self._cache[key] = item
+            for listener in self._listeners:
+                listener.add(key, item)
+            self._after_write()
+        return item
+
+    def get(self, key):
+        with self._lock:
+            self._refresh_if_changed()
+            return self._cache.get(key)
+
+    def delete(self, key):
+        with self._lock:
+            self._refresh_if_changed()
+            if key not in self._cache:
+                return False
+            self._conn.execute("DELETE FROM memories WHERE key = ?", (key,))
+            del self._cache[key]
+            for listener in self._listeners:
+                listener.remove(key)
+            self._after_write()
+            return True
+
+    def items(self):
+        with self._lock:
+            self._refresh_if_changed()
+            return dict(self._cache)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._cache)
+
+    def compact(self):
+        """Folds the WAL back into the main database file and truncates it."""
+        with self._lock:
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._writes_since_checkpoint = 0
+
+    def close(self):
+        with self._lock:
+            self.compact()
+            self._conn.close()
+
+
+_stores = SharedInstances(MemoryStore)
+
+
+def get_memory_store():
+    """Returns the process-wide MemoryStore, opening it on first use."""
+    return _stores.get()
@@ -0,0 +1,174 @@
+# File: tasks/model_manager.py
+# Process-wide registry of heavy local models (Whisper today). A model is
+# loaded on first use, shared by every feature that asks for it, and dropped
+# again after MODEL_IDLE_SECONDS without use so an idle assistant gives the
+# memory back. warm_up() loads a model in the background at startup so the
+# first request does not pay for it.
+#
+#   register_model("whisper", lambda: whisper.load_model("base.en"))
+#   with use_model("whisper") as model:
+#       model.transcribe(audio)
+
+import contextlib
+import gc
+import os
+import sys
+import threading
+import time
+
+from .timer_engine import get_timer_engine
+
+# 0 keeps models loaded for the life of the process
+MODEL_IDLE_SECONDS = float(os.environ.get("KUNNABUDDY_MODEL_IDLE_SECONDS", 600))
+
+
+class _Slot:
+    def __init__(self, loader):
+        self.loader = loader
+        self.model = None
+        self.lock = threading.Lock()        # held while loading; serializes load/unload
+        self.users = 0
+        self.last_used = 0.0
+        self.loads = 0
+        self.load_seconds = None
+
+
+class ModelManager:
+    def __init__(self, idle_seconds=MODEL_IDLE_SECONDS, timer_engine=None):
+        self.idle_seconds = idle_seconds
+        self._timer_engine = timer_engine
+        self._slots = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, loader):
+        """`loader()` builds the model; it is called on first use (and after an idle unload)."""
+        with self._lock:
+            if name not in self._slots:
+                self._slots[name] = _Slot(loader)
+
+    def _slot(self, name):
+        with self._lock:
+            try:
+                return self._slots[name]
+            except KeyError:
+                raise KeyError(f"no model registered as {name!r}") from None
+
+    def _load(self, slot):
+        # Caller holds slot.lock
+        if slot.model is None:
+            began = time.perf_counter()
+            slot.model = slot.loader()
+            slot.load_seconds = time.perf_counter() - began
+            slot.loads += 1
+        return slot.model
+
+    def get(self, name):
+        """The shared model, loading it if needed. Prefer use() for long calls, which defers unloading."""
+        slot = self._slot(name)
+        with slot.lock:
+            model = self._load(slot)
+            slot.last_used = time.monotonic()
+        self._arm_idle_check(name)
+        return model
+
+    @contextlib.contextmanager
+    def use(self, name):
+        """Context manager: the model is not unloaded while the block runs."""
+        slot = self._slot(name)
+        with slot.lock:
+            model = self._load(slot)
+            slot.users += 1
+        try:
+            yield model
+        finally:
+            with slot.lock:
+                slot.users -= 1
+                slot.last_used = time.monotonic()
+            self._arm_idle_check(name)
+
+    def warm_up(self, *names):
+        """Loads models on a background thread. Returns the thread."""
+        def _warm():
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception as e:
+                    print(f"WARNING: Could not warm up model '{name}': {e}")
+        thread = threading.Thread(target=_warm, daemon=True, name="model-warmup")
+        thread.start()
+        return thread
+
+    def unload(self, name):
+        """Drops the model now unless it is in use. Returns True if it was unloaded."""
+        slot = self._slot(name)
+        with slot.lock:
+            if slot.model is None or slot.users:
+                return False
+            slot.model = None
+        gc.collect()
+        torch = sys.modules.get("torch")
+        if torch is not None and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        print(f"INFO: Unloaded idle model '{name}'.")
+        return True
+
+    def is_loaded(self, name):
+        return self._slot(name).model is not None
+
+    def get_stats(self):
+        with self._lock:
+            slots = dict(self._slots)
+        now = time.monotonic()
+        return {name: {"loaded": slot.model is not None, "loads": slot.loads, "in_use": slot.users,
+                       "load_seconds": slot.load_seconds,
+                       "idle_seconds": now - slot.last_used if slot.model is not None else None}
+                for name, slot in slots.items()}
+
+    # --- Idle unloading ---
+
+    def _arm_idle_check(self, name, delay=None):
+        if not self.idle_seconds:
+            return
+        engine = self._timer_engine if self._timer_engine is not None else get_timer_engine()
+        timer_id = ("model-idle", id(self), name)
+        with self._lock:        # cancel + schedule must not interleave with another re-arm
+            engine.cancel(timer_id)
+            engine.schedule(time.time() + (self.idle_seconds if delay is None else delay),
+                            self._idle_check, name, timer_id=timer_id)
+
+    def _idle_check(self, name):
+        slot = self._slot(name)
+        with slot.lock:
+            idle = time.monotonic() - slot.last_used
+            busy = slot.users > 0
+        if busy:
+            return              # re-armed when the current user releases it
+        if idle >= self.idle_seconds:
+            self.unload(name)
+        else:
+            self._arm_idle_check(name, delay=self.idle_seconds - idle)   # used since this check was armed
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_model_manager():
+    """Returns the process-wide ModelManager."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = ModelManager()
+        return _manager
+
+
+def register_model(name, loader):
+    get_model_manager().register(name, loader)
+
+
+def use_model(name):
+    return get_model_manager().use(name)
+
+
+def warm_up(*names):
+    return get_model_manager().warm_up(*names)
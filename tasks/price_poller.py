@@ -0,0 +1,242 @@
+# File: tasks/price_poller.py
+# Adaptive polling for price alerts. Each watched symbol has its own poll
+# interval, which shrinks as the price nears an alert threshold. Equities are
+# not polled while their exchange is closed (crypto trades around the clock),
+# and every fetch counts against a global hourly request budget.
+#
+# All symbols due at once (or due soon) share one batched quote request.
+
+import heapq
+import threading
+import time
+from collections import deque
+from datetime import datetime, date, timedelta, time as dt_time
+from zoneinfo import ZoneInfo
+
+MIN_INTERVAL_SECONDS = 15         # Poll this often when the price is at a threshold...
+MAX_INTERVAL_SECONDS = 300        # ...and this often when it is far away
+FAR_DISTANCE = 0.10               # 10% or more from every threshold counts as "far"
+COALESCE_SECONDS = 30             # Symbols due within this window join the current request
+MAX_REQUESTS_PER_HOUR = 240       # Global quote request budget
+
+# Exchange suffix -> (timezone, open, close). Unknown suffixes trade like US listings.
+EXCHANGES = {
+    "": ("America/New_York", dt_time(9, 30), dt_time(16, 0)),
+    ".NS": ("Asia/Kolkata", dt_time(9, 15), dt_time(15, 30)),
+    ".BO": ("Asia/Kolkata", dt_time(9, 15), dt_time(15, 30)),
+    ".L": ("Europe/London", dt_time(8, 0), dt_time(16, 30)),
+}
+# Full-day NYSE closures. Extend once a year; other exchanges only skip weekends.
+US_MARKET_HOLIDAYS = {
+    date(2025, 1, 1), date(2025, 1, 9), date(2025, 1, 20), date(2025, 2, 17), date(2025, 4, 18),
+    date(2025, 5, 26), date(2025, 6, 19), date(2025, 7, 4), date(2025, 9, 1), date(2025, 11, 27),
+    date(2025, 12, 25),
+    date(2026, 1, 1), date(2026, 1, 19), date(2026, 2, 16), date(2026, 4, 3), date(2026, 5, 25),
+    date(2026, 6, 19), date(2026, 7, 3), date(2026, 9, 7), date(2026, 11, 26), date(2026, 12, 25),
+    date(2027, 1, 1), date(2027, 1, 18), date(2027, 2, 15), date(2027, 3, 26), date(2027, 5, 31),
+    date(2027, 6, 18), date(2027, 7, 5), date(2027, 9, 6), date(2027, 11, 25), date(2027, 12, 24),
+}
+CRYPTO_QUOTE_CURRENCIES = ("-USD", "-USDT", "-USDC", "-EUR", "-GBP", "-INR", "-BTC", "-ETH")
+
+
+def is_crypto(symbol):
+    return symbol.upper().endswith(CRYPTO_QUOTE_CURRENCIES)
+
+
+def _exchange(symbol):
+    dot = symbol.rfind(".")
+    suffix = symbol[dot:].upper() if dot > 0 else ""
+    return EXCHANGES.get(suffix, EXCHANGES[""]), suffix
+
+
+def _is_trading_day(day, suffix):
+    return day.weekday() < 5 and (suffix or day not in US_MARKET_HOLIDAYS)
+
+
+def next_market_open(symbol, now=None):
+    """
+    None if `symbol` can be polled now, else the (aware) datetime its market
+    next opens. Crypto is always open; forex/futures (=X, =F) close on weekends.
+    """
+    now = now or datetime.now().astimezone()
+    symbol = symbol.upper()
+    if is_crypto(symbol):
+        return None
+    if symbol.endswith(("=X", "=F")):
+        if now.weekday() < 5:
+            return None
+        return (now + timedelta(days=7 - now.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+
+    (zone, opens, closes), suffix = _exchange(symbol)
+    local = now.astimezone(ZoneInfo(zone))
+    if _is_trading_day(local.date(), suffix) and opens <= local.time() < closes:
+        return None
+    day = local.date() if local.time() < opens else local.date() + timedelta(days=1)
+    while not _is_trading_day(day, suffix):
+        day += timedelta(days=1)
+    return datetime.combine(day, opens, tzinfo=ZoneInfo(zone))
+
+
+def poll_interval(distance):
+    """Seconds until the next poll for a price `distance` (relative) from its nearest threshold."""
+    if distance is None:
+        return MAX_INTERVAL_SECONDS
+    fraction = min(distance / FAR_DISTANCE, 1.0)
+    return MIN_INTERVAL_SECONDS + (MAX_INTERVAL_SECONDS - MIN_INTERVAL_SECONDS) * fraction
+
+
+class AdaptivePoller:
+    """
+    Background thread that fetches quotes for due symbols in one batch and
+    hands them to `on_prices(prices)`. `fetch(symbols) -> {symbol: price}`
+    and `distance(symbol, price) -> float | None` come from the quote service
+    and the alert engine; `symbols()` lists what currently needs watching.
+    """
+
+    def __init__(self, fetch, on_prices, distance, symbols, max_requests_per_hour=MAX_REQUESTS_PER_HOUR):
+        self.fetch = fetch
+        self.on_prices = on_prices
+        self.distance = distance
+        self.symbols = symbols
+        self.max_requests_per_hour = max_requests_per_hour
+        self._cond = threading.Condition()
+        self._due = []                 # (monotonic due time, symbol), with stale entries
+        self._next_due = {}            # symbol -> current due time
+        self._stats = {}               # symbol -> tuning stats
+        self._requests = deque()       # monotonic times of requests in the last hour
+        self.total_requests = 0
+        self.deferred_for_budget = 0
+        self._thread = None
+        self._stopped = False
+
+    # --- Scheduling ---
+
+    def _schedule(self, symbol, due):
+        self._next_due[symbol] = due
+        heapq.heappush(self._due, (due, symbol))
+
+    def watch(self, symbol):
+        """Polls `symbol` right away (e.g. when a new alert is set), then adaptively."""
+        with self._cond:
+            self._schedule(symbol.upper(), time.monotonic())
+            self._cond.notify()
+
+    def _budget_wait(self, now):
+        while self._requests and now - self._requests[0] >= 3600:
+            self._requests.popleft()
+        if len(self._requests) < self.max_requests_per_hour:
+            return 0.0
+        return 3600 - (now - self._requests[0])
+
+    def _take_due(self, now):
+        """Pops every symbol due now or within COALESCE_SECONDS; closed markets are rescheduled."""
+        batch = []
+        wall = datetime.now().astimezone()
+        while self._due and self._due[0][0] <= now + COALESCE_SECONDS:
+            due, symbol = heapq.heappop(self._due)
+            if self._next_due.get(symbol) != due:
+                continue                               # superseded entry
+            if due > now and not batch:
+                heapq.heappush(self._due, (due, symbol))
+                break                                  # nothing is actually due yet
+            opens = next_market_open(symbol, wall)
+            if opens is not None:
+                stats = self._stats.setdefault(symbol, {"polls": 0})
+                stats["paused_until"] = opens.isoformat(timespec="minutes")
+                self._schedule(symbol, now + (opens - wall).total_seconds())
+                continue
+            batch.append(symbol)
+        return batch
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._stopped:
+                        return
+                    now = time.monotonic()
+                    timeout = self._due[0][0] - now if self._due else None
+                    if timeout is not None and timeout <= 0:
+                        wait = self._budget_wait(now)
+                        if wait <= 0:
+                            batch = self._take_due(now)
+                            if batch:
+                                self._requests.append(now)
+                                self.total_requests += 1
+                                break
+                            continue
+                        self.deferred_for_budget += 1
+                        timeout = wait
+                    self._cond.wait(timeout)
+            self._poll(batch)
+
+    def _poll(self, batch):
+        try:
+            prices = self.fetch(batch)
+        except Exception as e:
+            print(f"ERROR: Price poll for {', '.join(batch)} failed. Reason: {e}")
+            prices = {}
+        if prices:
+            try:
+                self.on_prices(prices)
+            except Exception as e:
+                print(f"ERROR: Could not process polled prices. Reason: {e}")
+
+        watched = set(self.symbols())
+        now = time.monotonic()
+        with self._cond:
+            for symbol in batch:
+                if symbol not in watched:
+                    self._next_due.pop(symbol, None)
+                    self._stats.pop(symbol, None)
+                    continue
+                price = prices.get(symbol)
+                distance = self.distance(symbol, price) if price else None
+                interval = poll_interval(distance) if price else MAX_INTERVAL_SECONDS
+                stats = self._stats.setdefault(symbol, {"polls": 0})
+                previous = stats.get("_last_poll")
+                stats.update(polls=stats["polls"] + 1, last_price=price, distance=distance,
+                             interval=round(interval, 1), _last_poll=now, paused_until=None)
+                if previous is not None:
+                    stats["observed_interval"] = round(now - previous, 1)
+                self._schedule(symbol, now + interval)
+
+    # --- Lifecycle ---
+
+    def start(self):
+        with self._cond:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopped = False
+                for symbol in self.symbols():
+                    if symbol not in self._next_due:
+                        self._schedule(symbol, time.monotonic())
+                self._thread = threading.Thread(target=self._run, daemon=True, name="price-poller")
+                self._thread.start()
+        return self
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread:
+            self._thread.join()
+
+    def get_stats(self):
+        """Per-symbol intervals/poll counts plus request totals, for tuning the constants above."""
+        with self._cond:
+            now = time.monotonic()
+            self._budget_wait(now)
+            return {
+                "requests_total": self.total_requests,
+                "requests_last_hour": len(self._requests),
+                "request_budget_per_hour": self.max_requests_per_hour,
+                "deferred_for_budget": self.deferred_for_budget,
+                "symbols": {
+                    symbol: {**{k: v for k, v in stats.items() if not k.startswith("_")},
+                             "next_poll_in": round(self._next_due[symbol] - now, 1) if symbol in self._next_due else None}
+                    for symbol, stats in self._stats.items()
+                },
+            }
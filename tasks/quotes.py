@@ -0,0 +1,159 @@
+# File: tasks/quotes.py
+# Shared quote service for tasks/finance_helper.py. Prices come from a
+# pluggable QuoteSource that fetches many symbols in one call, and are held in
+# a short-TTL cache shared by "what's the price of X" and the alert checker.
+#
+#   set_quote_source(HttpQuoteSource(fake_server.url))   # e.g. FakeQuoteServer
+
+import math
+import threading
+import time
+
+import requests
+
+QUOTE_TTL_SECONDS = 15      # Quotes younger than this are served from the cache
+REQUEST_TIMEOUT = 10
+
+
+class QuoteSource:
+    """Interface: fetch(symbols) -> {symbol: price} for the symbols it could price."""
+
+    name = "base"
+
+    def fetch(self, symbols):
+        raise NotImplementedError
+
+
+class YFinanceQuoteSource(QuoteSource):
+    """
+    Yahoo Finance via yfinance. All symbols go into one yf.download() call
+    (one request per batch instead of a heavy Ticker.info per symbol).
+    """
+
+    name = "yfinance"
+
+    def fetch(self, symbols):
+        import yfinance as yf
+
+        prices = self._last_closes(yf, symbols, period="1d", interval="1m")
+        missing = [s for s in symbols if s not in prices]
+        if missing:
+            # Closed markets or illiquid symbols have no intraday bars; fall back to daily closes.
+            prices.update(self._last_closes(yf, missing, period="5d", interval="1d"))
+        return prices
+
+    @staticmethod
+    def _last_closes(yf, symbols, period, interval):
+        frame = yf.download(list(symbols), period=period, interval=interval,
+                            group_by="ticker", progress=False, threads=True)
+        prices = {}
+        for symbol in symbols:
+            try:
+                data = frame[symbol]
+            except KeyError:
+                # Older yfinance versions return flat columns for a single symbol.
+                if len(symbols) != 1 or "Close" not in frame:
+                    continue
+                data = frame
+            closes = data["Close"].dropna()
+            if not closes.empty:
+                prices[symbol] = float(closes.iloc[-1])
+        return prices
+
+
+class HttpQuoteSource(QuoteSource):
+    """Batch quote endpoint: GET {base_url}/quotes?symbols=A,B -> {"quotes": {"A": 1.0, ...}}."""
+
+    name = "http"
+
+    def __init__(self, base_url, session=None):
+        self.base_url = base_url.rstrip("/")
+        self.session = session or requests.Session()
+
+    def fetch(self, symbols):
+        response = self.session.get(f"{self.base_url}/quotes", params={"symbols": ",".join(symbols)},
+                                    timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        return {s: float(p) for s, p in response.json().get("quotes", {}).items() if p is not None}
+
+
+class QuoteService:
+    """TTL cache in front of a QuoteSource; misses for a whole batch cost one fetch."""
+
+    def __init__(self, source, ttl=QUOTE_TTL_SECONDS):
+        self.source = source
+        self.ttl = ttl
+        self.hits = self.misses = self.fetches = 0
+        self._quotes = {}           # symbol -> (fetched_at, price)
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+
+    def _fresh(self, symbols, now):
+        found = {}
+        for symbol in symbols:
+            entry = self._quotes.get(symbol)
+            if entry and now - entry[0] < self.ttl:
+                found[symbol] = entry[1]
+        return found
+
+    def get_quotes(self, symbols):
+        """Returns {symbol: price} (upper-cased symbols); unpriceable symbols are left out."""
+        symbols = list(dict.fromkeys(s.upper() for s in symbols))
+        with self._lock:
+            prices = self._fresh(symbols, time.monotonic())
+            self.hits += len(prices)
+        missing = [s for s in symbols if s not in prices]
+        if not missing:
+            return prices
+
+        # One fetch at a time: a concurrent caller that wanted the same symbols
+        # finds them fresh once it gets the lock instead of fetching again.
+        with self._fetch_lock:
+            with self._lock:
+                refreshed = self._fresh(missing, time.monotonic())
+            prices.update(refreshed)
+            missing = [s for s in missing if s not in refreshed]
+            if missing:
+                fetched = {s: p for s, p in self.source.fetch(missing).items()
+                           if p is not None and not math.isnan(p)}
+                now = time.monotonic()
+                with self._lock:
+                    self.fetches += 1
+                    self.misses += len(missing)
+                    for symbol, price in fetched.items():
+                        self._quotes[symbol.upper()] = (now, price)
+                prices.update({s.upper(): p for s, p in fetched.items()})
+        return prices
+
+    def get_quote(self, symbol):
+        return self.get_quotes([symbol]).get(symbol.upper())
+
+    def clear(self):
+        with self._lock:
+            self._quotes.clear()
+
+    def get_stats(self):
+        with self._lock:
+            return {"source": self.source.name, "hits": self.hits, "misses": self.misses,
+                    "fetches": self.fetches, "cached_symbols": len(self._quotes)}
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_quote_service():
+    """Returns the process-wide QuoteService (yfinance unless set_quote_source was called)."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = QuoteService(YFinanceQuoteSource())
+        return _service
+
+
+def set_quote_source(source, ttl=QUOTE_TTL_SECONDS):
+    """Swaps the quote provider (e.g. for a FakeQuoteServer); drops cached quotes."""
+    global _service
+    with _service_lock:
+        _service = QuoteService(source, ttl=ttl)
+        return _service
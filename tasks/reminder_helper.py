@@ -1,39 +1,157 @@
-import schedule, time, threading
-from .speaker import say_text
+import threading
+import time
+from datetime import datetime, timedelta
+from .speaker import say_text, say_text_non_blocking, PRIORITY_REMINDER
+from .timer_engine import get_timer_engine
+from .reminder_store import get_reminder_store
 
-_pending_reminders = []
+# Reminders are journaled in tasks/reminder_store.py. Only those due within
+# LOAD_WINDOW_SECONDS are held by the timer engine; the window slides forward
+# on its own, so a huge journal costs nothing at startup.
+LOAD_WINDOW_SECONDS = 6 * 3600
+# What to do with reminders that came due while KunnaBuddy was not running:
+#   "deliver"   - announce each one (up to MAX_DELIVERED_MISSED, then summarize the rest)
+#   "summarize" - one announcement listing them
+#   "drop"      - discard them (logged only)
+MISSED_REMINDER_POLICY = "summarize"
+MAX_DELIVERED_MISSED = 3
+PENDING_LIST_LIMIT = 20
 
-def _run_scheduler():
-    while True:
-        schedule.run_pending()
-        time.sleep(1)
+_UNIT_SECONDS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+_WINDOW_TIMER = ("reminder-window",)
 
-def start_reminder_thread():
-    thread = threading.Thread(target=_run_scheduler)
-    thread.daemon = True
-    thread.start()
+_state_lock = threading.RLock()
+_loaded_until = None        # Reminders due before this are scheduled in the timer engine
+
+def _timer_id(reminder_id):
+    return ("reminder", reminder_id)
+
+def _next_occurrence(due, repeat, now):
+    # Skips occurrences already in the past, like the timer engine does.
+    return due + (int((now - due) // repeat) + 1) * repeat
+
+def _schedule_if_loaded(reminder):
+    if _loaded_until is not None and reminder["due"] < _loaded_until:
+        get_timer_engine().schedule(reminder["due"], _trigger_reminder, reminder["id"],
+                                    timer_id=_timer_id(reminder["id"]))
 
-def _trigger_reminder(message):
+def _load_window():
+    """Schedules journal entries due in [loaded_until, now + window) and re-arms itself."""
+    global _loaded_until
+    with _state_lock:
+        end = time.time() + LOAD_WINDOW_SECONDS
+        for reminder in get_reminder_store().between(_loaded_until, end):
+            get_timer_engine().schedule(reminder["due"], _trigger_reminder, reminder["id"],
+                                        timer_id=_timer_id(reminder["id"]))
+        _loaded_until = end
+        engine = get_timer_engine()
+        engine.cancel(_WINDOW_TIMER)
+        engine.schedule(end - LOAD_WINDOW_SECONDS / 4, _load_window, timer_id=_WINDOW_TIMER)
+
+def _announce(message):
     print(f"\n🔔 REMINDER: {message}")
-    say_text(f"Hey, this is your reminder: {message}")
-    _pending_reminders.pop(0)
-    return schedule.CancelJob
+    # The fixed prefix is a pre-warmed clip in the speech cache; both parts are
+    # queued at once so the message is synthesized while the prefix plays.
+    say_text_non_blocking("Hey, this is your reminder:", priority=PRIORITY_REMINDER)
+    say_text(message, priority=PRIORITY_REMINDER)
+
+def _trigger_reminder(reminder_id):
+    store = get_reminder_store()
+    reminder = store.get(reminder_id)
+    if reminder is None: return           # cancelled after it was scheduled
+    _announce(reminder["message"])
+    # Journal updated after speaking: a crash mid-announcement repeats it on restart rather than losing it.
+    with _state_lock:
+        if reminder["repeat"]:
+            reminder["due"] = _next_occurrence(reminder["due"], reminder["repeat"], time.time())
+            store.reschedule(reminder_id, reminder["due"])
+            _schedule_if_loaded(reminder)
+        else:
+            store.delete(reminder_id)
+
+def _handle_missed(missed):
+    if not missed: return
+    messages = [r["message"] for r in missed]
+    print(f"INFO: {len(missed)} reminder(s) came due while KunnaBuddy was off (policy: {MISSED_REMINDER_POLICY}).")
+    if MISSED_REMINDER_POLICY == "drop": return
+    if MISSED_REMINDER_POLICY == "deliver":
+        for message in messages[:MAX_DELIVERED_MISSED]:
+            _announce(f"{message} (this was due while I was off)")
+        messages = messages[MAX_DELIVERED_MISSED:]
+        if not messages: return
+    summary = "; ".join(messages[:10]) + (f"; and {len(messages) - 10} more" if len(messages) > 10 else "")
+    print(f"\n🔔 MISSED REMINDERS: {summary}")
+    say_text(f"While I was off, you missed {len(messages)} reminder{'s' if len(messages) != 1 else ''}: {summary}.",
+             priority=PRIORITY_REMINDER)
+
+def restore_reminders():
+    """
+    Call once at startup. Applies the missed-reminder policy to overdue
+    entries (recurring ones move to their next occurrence) and schedules the
+    first load window. Returns the number of overdue reminders.
+    """
+    global _loaded_until
+    with _state_lock:
+        if _loaded_until is not None: return 0
+        store, now = get_reminder_store(), time.time()
+        missed = store.overdue(now)
+        for reminder in missed:
+            if reminder["repeat"]:
+                store.reschedule(reminder["id"], _next_occurrence(reminder["due"], reminder["repeat"], now))
+            else:
+                store.delete(reminder["id"])
+        _loaded_until = now
+        _load_window()
+    # Announced outside the lock: speaking can take a while.
+    threading.Thread(target=_handle_missed, args=(missed,), daemon=True).start()
+    return len(missed)
 
-def set_reminder(time_value, time_unit, message):
+def start_reminder_thread():
+    # The timer engine's thread sleeps until the next reminder is due.
+    restore_reminders()
+
+def _describe(reminder):
+    text = f"'{reminder['message']}' at {datetime.fromtimestamp(reminder['due']):%a %d %b %H:%M:%S}"
+    if reminder["repeat"]:
+        text += f", repeating every {timedelta(seconds=reminder['repeat'])}"
+    return text
+
+def set_reminder_at(when, message, repeat_seconds=None):
+    """Reminds at the datetime `when`, then every `repeat_seconds` if given."""
+    try:
+        if repeat_seconds is not None and repeat_seconds <= 0: return "The repeat interval must be positive."
+        restore_reminders()
+        with _state_lock:
+            due = when.timestamp()
+            reminder_id = get_reminder_store().add(message, due, repeat_seconds)
+            reminder = {"id": reminder_id, "message": message, "due": due, "repeat": repeat_seconds}
+            _schedule_if_loaded(reminder)
+        return f"Okay, reminder #{reminder_id} set: {_describe(reminder)}"
+    except Exception as e: return f"Error setting reminder: {e}"
+
+def set_reminder(time_value, time_unit, message, repeat=False):
     try:
         val = int(time_value)
-        job = None
-        if "minute" in time_unit: job = schedule.every(val).minutes
-        elif "second" in time_unit: job = schedule.every(val).seconds
-        elif "hour" in time_unit: job = schedule.every(val).hours
-        else: return f"Unknown time unit: {time_unit}."
-        
-        job.do(_trigger_reminder, message=message)
-        reminder_text = f"'{message}' in {val} {time_unit}"
-        _pending_reminders.append(reminder_text)
-        return f"Okay, reminder set: {reminder_text}"
+        unit = next((u for u in _UNIT_SECONDS if u in time_unit), None)
+        if unit is None: return f"Unknown time unit: {time_unit}."
+        seconds = val * _UNIT_SECONDS[unit]
+        return set_reminder_at(datetime.now() + timedelta(seconds=seconds), message,
+                               repeat_seconds=seconds if repeat else None)
     except Exception as e: return f"Error setting reminder: {e}"
 
+def cancel_reminder(reminder_id):
+    reminder_id = int(reminder_id)
+    store = get_reminder_store()
+    with _state_lock:
+        reminder = store.get(reminder_id)
+        if reminder is None: return f"No pending reminder #{reminder_id}."
+        store.delete(reminder_id)
+        get_timer_engine().cancel(_timer_id(reminder_id))
+    return f"Cancelled reminder #{reminder_id}: '{reminder['message']}'."
+
 def get_pending_reminders():
-    if not _pending_reminders: return "No pending reminders."
-    return "Pending reminders:\n" + "\n".join(f"- {r}" for r in _pending_reminders)
\ No newline at end of file
+    store = get_reminder_store()
+    reminders, total = store.upcoming(PENDING_LIST_LIMIT), len(store)
+    if not reminders: return "No pending reminders."
+    more = f"\n(and {total - len(reminders)} more)" if total > len(reminders) else ""
+    return "Pending reminders:\n" + "\n".join(f"- #{r['id']} {_describe(r)}" for r in reminders) + more
@@ -0,0 +1,97 @@
+# File: tasks/reminder_store.py
+# Durable journal for tasks/reminder_helper.py. One SQLite row per reminder
+# with an index on the due time, so startup never reads the whole journal:
+# it asks for what is overdue and what falls inside the next load window.
+
+import threading
+import time
+from datetime import datetime
+
+from .sqlite_util import open_wal_connection, SharedInstances
+
+REMINDERS_DB_FILE = "kunnabuddy_reminders.sqlite3"
+CHECKPOINT_EVERY_WRITES = 1000      # WAL compaction cadence
+
+
+class ReminderStore:
+    def __init__(self, path=REMINDERS_DB_FILE):
+        self._lock = threading.Lock()
+        self._conn = open_wal_connection(path, synchronous="NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS reminders (
+                id INTEGER PRIMARY KEY,
+                message TEXT NOT NULL,
+                due REAL NOT NULL,
+                repeat REAL,
+                created TEXT NOT NULL
+            )""")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_reminders_due ON reminders(due)")
+        self._conn.commit()
+        self._writes = 0
+
+    def _commit(self):
+        self._conn.commit()
+        self._writes += 1
+        if self._writes >= CHECKPOINT_EVERY_WRITES:
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._writes = 0
+
+    @staticmethod
+    def _as_dict(row):
+        reminder_id, message, due, repeat = row
+        return {"id": reminder_id, "message": message, "due": due, "repeat": repeat}
+
+    def add(self, message, due, repeat=None):
+        """Journals a reminder (due is a Unix timestamp). Returns its id."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO reminders (message, due, repeat, created) VALUES (?, ?, ?, ?)",
+                (message, due, repeat, datetime.now().isoformat(timespec="seconds")))
+            self._commit()
+            return cursor.lastrowid
+
+    def get(self, reminder_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, message, due, repeat FROM reminders WHERE id = ?", (reminder_id,)).fetchone()
+        return self._as_dict(row) if row else None
+
+    def delete(self, reminder_id):
+        with self._lock:
+            deleted = self._conn.execute("DELETE FROM reminders WHERE id = ?", (reminder_id,)).rowcount
+            self._commit()
+            return bool(deleted)
+
+    def reschedule(self, reminder_id, due):
+        with self._lock:
+            self._conn.execute("UPDATE reminders SET due = ? WHERE id = ?", (due, reminder_id))
+            self._commit()
+
+    def between(self, start, end):
+        """Reminders with start <= due < end, soonest first (an index range scan)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, message, due, repeat FROM reminders WHERE due >= ? AND due < ? ORDER BY due",
+                (start, end)).fetchall()
+        return [self._as_dict(row) for row in rows]
+
+    def overdue(self, now=None):
+        return self.between(float("-inf"), now if now is not None else time.time())
+
+    def upcoming(self, limit=20):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, message, due, repeat FROM reminders ORDER BY due LIMIT ?", (limit,)).fetchall()
+        return [self._as_dict(row) for row in rows]
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM reminders").fetchone()[0]
+
+
+_stores = SharedInstances(ReminderStore)
+
+
+def get_reminder_store():
+    """Returns the process-wide ReminderStore, opening it on first use."""
+    return _stores.get()
@@ -1,82 +1,223 @@
 # --- UPDATED FILE: tasks/speaker.py (with Stop Function) ---
 
-import pygame
-from gtts import gTTS
-import io
+import re
 import threading
+import time
+from .tts_cache import get_tts_cache, MappedClip
+from .tts_backends import TTS_BACKEND, GTTSBackend, EspeakBackend
+from .speech_engine import SpeechEngine, PRIORITY_ALERT, PRIORITY_REMINDER, PRIORITY_CHAT
 
-# Global flag to check if audio is currently playing
-_is_speaking = False
+# Set by stop_speaking() to abort an in-progress streaming pipeline
+_stream_stop = threading.Event()
+
+# Start time and first sentence of the most recent streamed response
+_last_stream = None
+
+_engine = None
+_engine_lock = threading.Lock()
+
+# Fixed phrases spoken all the time; synthesized once and served from the TTS cache
+SYSTEM_PHRASES = [
+    "Voice mode activated. How can I help you?",
+    "Shutting down. Goodbye!",
+    "I've run into an unexpected error. Let's try that again.",
+    "Hey, this is your reminder:",
+    "Got it. I've logged that for you.",
+]
+
+# Backends per KUNNABUDDY_TTS_BACKEND (see tasks/tts_backends.py)
+if TTS_BACKEND not in ("gtts", "local", "auto"):
+    print(f"WARNING: Unknown KUNNABUDDY_TTS_BACKEND '{TTS_BACKEND}', using 'auto'.")
+    TTS_BACKEND = "auto"
+_online_backend = GTTSBackend() if TTS_BACKEND != "local" else None
+_local_backend = EspeakBackend() if TTS_BACKEND != "gtts" else None
+if _local_backend is not None and not _local_backend.available():
+    _local_backend = None
+    if _online_backend is None:
+        # "local" without espeak-ng would leave nothing to speak with
+        print("WARNING: espeak-ng not found; falling back to gTTS for speech.")
+        _online_backend = GTTSBackend()
+    else:
+        print("WARNING: espeak-ng not found; offline speech is unavailable.")
+
+# After a gTTS failure in "auto" mode, speech stays local for this long before gTTS is retried
+OFFLINE_RETRY_SECONDS = 60
+_offline_until = 0.0
+
+def _load_clip(text, cache=True):
+    """A file-like MP3 clip for `text`: memory-mapped from the TTS cache, synthesized on a miss."""
+    return get_tts_cache().get_or_synthesize(text, _online_backend.synthesize, lang=_online_backend.lang,
+                                             voice=_online_backend.voice, cache=cache)
+
+def prewarm_speech_cache():
+    """Synthesizes SYSTEM_PHRASES into the cache on a background thread (call at startup)."""
+    if _online_backend is None:
+        return      # Local speech renders faster than a cache lookup pays off
+    def _prewarm():
+        added = get_tts_cache().prewarm(SYSTEM_PHRASES, _online_backend.synthesize,
+                                        lang=_online_backend.lang, voice=_online_backend.voice)
+        if added:
+            print(f"INFO: Pre-warmed {added} system phrase(s) into the speech cache.")
+    threading.Thread(target=_prewarm, daemon=True).start()
+
+def get_speech_cache_stats():
+    """Hit rate and estimated synthesis latency saved by the TTS cache."""
+    return get_tts_cache().get_stats()
+
+def _load_local(text, player):
+    samples, sample_rate = _local_backend.render_pcm(text)
+    return player.from_samples(samples, sample_rate)
+
+def _load_sound(text, player, cache=True):
+    global _offline_until
+    if _online_backend is None:
+        return _load_local(text, player)
+    if _local_backend is not None and time.monotonic() < _offline_until:
+        # Offline: clips cached earlier still play in the usual voice
+        path = get_tts_cache().get(text, _online_backend.lang, _online_backend.voice)
+        if path:
+            try:
+                return player.decode(MappedClip(path))
+            except (OSError, ValueError):
+                pass    # evicted between lookup and open, or a truncated file
+        return _load_local(text, player)
+    try:
+        return player.decode(_load_clip(text, cache))
+    except Exception as e:
+        if _local_backend is None:
+            raise
+        if time.monotonic() >= _offline_until:
+            print(f"WARNING: Online speech failed ({e}); using {_local_backend.name} "
+                  f"for the next {OFFLINE_RETRY_SECONDS}s.")
+        _offline_until = time.monotonic() + OFFLINE_RETRY_SECONDS
+        return _load_local(text, player)
+
+def get_speech_backend():
+    """Name of the backend new utterances are synthesized with."""
+    if _online_backend is None or (_local_backend is not None and time.monotonic() < _offline_until):
+        return _local_backend.name if _local_backend is not None else None
+    return _online_backend.name
+
+def get_speech_engine():
+    """The process-wide speech engine; its audio worker starts on first use."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = SpeechEngine(_load_sound)
+        return _engine
 
 def stop_speaking():
     """
     Public function to forcefully stop any currently playing speech.
+    Everything still queued is dropped too.
     """
-    global _is_speaking
-    if _is_speaking:
+    if is_speaking():
         print("INFO: Received stop command. Halting audio playback.")
-        pygame.mixer.music.stop()
-        _is_speaking = False
+    _stream_stop.set()
+    get_speech_engine().stop()
 
-def _play_audio(fp):
-    """Internal function that will run on a separate thread to play the audio."""
-    global _is_speaking
-    try:
-        _is_speaking = True
-        pygame.mixer.init()
-        pygame.mixer.music.load(fp)
-        pygame.mixer.music.play()
-        while pygame.mixer.music.get_busy():
-            pygame.time.Clock().tick(10)
-    except Exception as e:
-        print(f"❌ Error during audio playback: {e}")
-    finally:
-        # Check if the audio finished naturally (wasn't stopped)
-        if _is_speaking:
-             _is_speaking = False
-        fp.close()
-
-def say_text_non_blocking(text):
+def is_speaking():
+    return _engine is not None and _engine.is_speaking()
+
+def say_text_non_blocking(text, priority=PRIORITY_CHAT):
     """
-    Generates speech and plays it in a non-blocking background thread.
-    The main program can continue running while the audio plays.
+    Queues speech and returns immediately; the audio worker plays it in turn.
+    Alerts (PRIORITY_ALERT) interrupt chat, which resumes afterwards.
+
+    Returns:
+        Utterance or None: wait() on it to block until it has been spoken.
     """
-    global _is_speaking
     if not text or not text.strip():
         print("INFO: No text provided to speak.")
-        return
+        return None
 
-    if _is_speaking:
-        print("INFO: Speech is already in progress. New request ignored.")
+    print(f"🔊 KunnaBuddy speaking (in background)...")
+    return get_speech_engine().speak(text, priority)
+
+def say_text(text, priority=PRIORITY_CHAT):
+    """Speaks `text` and blocks until it has been played (or stopped)."""
+    print(f"🔊 KunnaBuddy speaking (blocking)...")
+    if not text or not text.strip():
         return
+    utterance = get_speech_engine().speak(text, priority)
+    utterance.wait()
+    if utterance.status == "failed":
+        print(f"❌ Error in text-to-speech for: {text[:40]}")
 
-    print(f"🔊 KunnaBuddy speaking (in background)...")
-    try:
-        tts = gTTS(text=text, lang='en')
-        fp = io.BytesIO()
-        tts.write_to_fp(fp)
-        fp.seek(0)
-        
-        playback_thread = threading.Thread(target=_play_audio, args=(fp,))
-        playback_thread.daemon = True
-        playback_thread.start()
+def get_speech_latency_stats():
+    """Enqueue-to-first-sample latency of recent utterances (seconds)."""
+    return get_speech_engine().get_latency_stats()
 
-    except Exception as e:
-        print(f"❌ Error in text-to-speech generation: {e}")
+# --- ============================= ---
+# ---     STREAMING PIPELINE        ---
+# --- ============================= ---
 
-def say_text(text):
-    """The original blocking version of the function."""
-    print(f"🔊 KunnaBuddy speaking (blocking)...")
-    try:
-        tts = gTTS(text=text, lang='en')
-        fp = io.BytesIO()
-        tts.write_to_fp(fp)
-        fp.seek(0)
-        
-        pygame.mixer.init()
-        pygame.mixer.music.load(fp)
-        pygame.mixer.music.play()
-        while pygame.mixer.music.get_busy():
-            pygame.time.Clock().tick(10)
-    except Exception as e:
-        print(f"❌ Error in text-to-speech: {e}")
\ No newline at end of file
+# A sentence ends with . ! or ? (plus closing quotes/brackets) followed by whitespace,
+# or at a line break. Very short fragments are merged into the next sentence.
+_SENTENCE_END_RE = re.compile(r'[.!?]+["\')\]]*\s+|\n+')
+_MIN_SENTENCE_CHARS = 20
+
+def _iter_sentences(text_chunks):
+    """Re-chunks streamed text fragments into complete sentences."""
+    buffer = ""
+    for chunk in text_chunks:
+        buffer += chunk
+        start = 0
+        for match in _SENTENCE_END_RE.finditer(buffer):
+            sentence = buffer[start:match.end()].strip()
+            if len(sentence) >= _MIN_SENTENCE_CHARS:
+                yield sentence
+                start = match.end()
+        buffer = buffer[start:]
+    if buffer.strip():
+        yield buffer.strip()
+
+def say_text_streaming(text_chunks, on_text=None):
+    """
+    Speaks a streamed response sentence by sentence through the speech engine,
+    so the first sentence is heard while later ones are still being generated.
+
+    Args:
+        text_chunks (iterable): Text fragments, e.g. from gemini_helper.ask_gemini_stream.
+        on_text (callable): Optional callback receiving each fragment (e.g. to print it).
+
+    Returns:
+        str: The full response text once the stream has been consumed.
+    """
+    global _last_stream
+    started_at = time.perf_counter()
+    _stream_stop.clear()
+    engine = get_speech_engine()
+    _last_stream = None
+    full_text = []
+
+    def _tee():
+        for chunk in text_chunks:
+            full_text.append(chunk)
+            if on_text:
+                on_text(chunk)
+            yield chunk
+
+    def _log_first_audio(first):
+        print(f"INFO: Time to first audio: {first.enqueued_at - started_at + first.first_sample_latency:.2f}s")
+
+    print(f"🔊 KunnaBuddy speaking (streaming)...")
+    for sentence in _iter_sentences(_tee()):
+        if _stream_stop.is_set():
+            break
+        # Each sentence is synthesized as soon as it is queued and played in order. Answer
+        # sentences rarely repeat, so they stay out of the clip cache (SYSTEM_PHRASES live there)
+        utterance = engine.speak(sentence, PRIORITY_CHAT, cache=False,
+                                 on_start=_log_first_audio if _last_stream is None else None)
+        if _last_stream is None:
+            _last_stream = (started_at, utterance)
+    return "".join(full_text)
+
+def get_last_time_to_first_audio():
+    """Returns the time-to-first-audio (seconds) of the last streamed response, or None."""
+    if _last_stream is None:
+        return None
+    started_at, first = _last_stream
+    if first.first_sample_latency is None:
+        return None
+    return first.enqueued_at - started_at + first.first_sample_latency
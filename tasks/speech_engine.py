@@ -0,0 +1,221 @@
+# File: tasks/speech_engine.py
+# One long-lived audio worker for everything KunnaBuddy says. Utterances go
+# into a priority queue (alerts before reminders before chat, FIFO within a
+# priority); synthesis starts as soon as an utterance is queued, so clips are
+# ready by the time the worker reaches them. A higher-priority utterance
+# preempts the one playing (which is re-queued), and stop() flushes
+# everything. The worker never polls: it sleeps on a threading.Event until
+# the clip's known end time, or until it is interrupted.
+
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+PRIORITY_ALERT = 0
+PRIORITY_REMINDER = 1
+PRIORITY_CHAT = 2
+
+SYNTH_WORKERS = 2            # Clips synthesized ahead of playback
+END_GRACE_SECONDS = 0.25     # Extra wait if the device is still draining at the clip's nominal end
+LATENCY_SAMPLES = 200
+
+
+class PygamePlayer:
+    """Plays decoded clips on a pygame mixer channel. The mixer is initialized once."""
+
+    def __init__(self):
+        import pygame
+        self._pygame = pygame
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+
+    def decode(self, clip):
+        """File-like MP3/WAV/OGG clip -> pygame Sound (decoded to PCM once, up front)."""
+        try:
+            return self._pygame.mixer.Sound(file=clip)
+        finally:
+            clip.close()
+
+    def from_pcm(self, pcm):
+        """Raw PCM bytes already in the mixer's format -> Sound."""
+        return self._pygame.mixer.Sound(buffer=pcm)
+
+    def from_samples(self, samples, sample_rate):
+        """int16 mono samples at any rate -> Sound, converted to the mixer's format in memory."""
+        import numpy as np
+        frequency, size, channels = self._pygame.mixer.get_init()
+        if size != -16:
+            raise ValueError(f"mixer sample format {size} is not signed 16-bit")
+        if sample_rate != frequency and len(samples):
+            positions = np.arange(int(len(samples) * frequency / sample_rate)) * (sample_rate / frequency)
+            samples = np.interp(positions, np.arange(len(samples)), samples).astype(np.int16)
+        if channels > 1:
+            samples = np.repeat(samples[:, None], channels, axis=1)
+        return self.from_pcm(np.ascontiguousarray(samples, dtype=np.int16).tobytes())
+
+    def play(self, sound):
+        return sound.play()
+
+    @staticmethod
+    def length(sound):
+        return sound.get_length()
+
+    @staticmethod
+    def busy(channel):
+        return channel is not None and channel.get_busy()
+
+    @staticmethod
+    def stop(channel):
+        if channel is not None:
+            channel.stop()
+
+
+class Utterance:
+    """Handle for a queued utterance. `done` is set once it has played, or was cancelled."""
+
+    def __init__(self, text, priority, seq, on_start=None, cache=True):
+        self.text = text
+        self.priority = priority
+        self.seq = seq
+        self.cache = cache                 # False for one-off text the clip cache should not keep
+        self.on_start = on_start           # called on the worker when playback first starts
+        self.enqueued_at = time.perf_counter()
+        self.first_sample_latency = None   # seconds from enqueue to playback start
+        self.status = "queued"             # queued -> playing -> done | cancelled | failed
+        self.cancelled = False
+        self.done = threading.Event()
+        self.future = None
+
+    def wait(self, timeout=None):
+        return self.done.wait(timeout)
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class SpeechEngine:
+    def __init__(self, load_sound, player=None):
+        """
+        `load_sound(text, player, cache)` returns something `player` can play
+        (see PygamePlayer.decode / from_pcm); it runs on the synthesis pool.
+        `cache` is False for one-off text that is not worth keeping.
+        """
+        self.load_sound = load_sound
+        self.player = player or PygamePlayer()
+        self._cond = threading.Condition()
+        self._queue = []                   # heap of Utterance
+        self._seq = itertools.count()
+        self._current = None
+        self._interrupt = threading.Event()
+        self._synth = ThreadPoolExecutor(max_workers=SYNTH_WORKERS, thread_name_prefix="speech-synth")
+        self._latencies = []
+        self._thread = threading.Thread(target=self._run, daemon=True, name="speech-worker")
+        self._thread.start()
+
+    # --- Public API ---
+
+    def speak(self, text, priority=PRIORITY_CHAT, on_start=None, cache=True):
+        """
+        Queues `text`; returns its Utterance. Preempts lower-priority speech.
+        `on_start(utterance)` runs on the audio worker when playback first starts;
+        cache=False keeps one-off text out of the clip cache.
+        """
+        utterance = Utterance(text, priority, next(self._seq), on_start, cache)
+        utterance.future = self._synth.submit(self._load, text, cache)
+        with self._cond:
+            heapq.heappush(self._queue, utterance)
+            current = self._current
+            if current is not None and priority < current.priority:
+                self._interrupt.set()
+            self._cond.notify()
+        return utterance
+
+    def stop(self):
+        """Stops the current utterance and drops everything queued."""
+        with self._cond:
+            flushed, self._queue = self._queue, []
+            if self._current is not None:
+                self._current.cancelled = True
+                self._interrupt.set()
+        for utterance in flushed:
+            utterance.future.cancel()
+            utterance.cancelled = True
+            utterance.status = "cancelled"
+            utterance.done.set()
+        return len(flushed)
+
+    def is_speaking(self):
+        with self._cond:
+            return self._current is not None
+
+    def pending(self):
+        with self._cond:
+            return len(self._queue)
+
+    def get_latency_stats(self):
+        """Enqueue-to-first-sample latency (seconds) over recent utterances."""
+        with self._cond:
+            samples = sorted(self._latencies)
+        if not samples:
+            return {"count": 0}
+        return {"count": len(samples), "p50": samples[len(samples) // 2],
+                "p95": samples[min(len(samples) - 1, int(len(samples) * 0.95))], "max": samples[-1]}
+
+    # --- Worker ---
+
+    def _load(self, text, cache):
+        return self.load_sound(text, self.player, cache)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                utterance = heapq.heappop(self._queue)
+                self._current = utterance
+                self._interrupt.clear()
+            try:
+                self._play(utterance)
+            except Exception as e:
+                utterance.status = "failed"
+                print(f"❌ Error during audio playback: {e}")
+            finally:
+                with self._cond:
+                    self._current = None
+                if utterance.status != "queued":
+                    utterance.done.set()
+
+    def _play(self, utterance):
+        sound = utterance.future.result()
+        if self._interrupt.is_set():
+            self._finish_interrupted(utterance)
+            return
+        channel = self.player.play(sound)
+        utterance.status = "playing"
+        if utterance.first_sample_latency is None:
+            utterance.first_sample_latency = time.perf_counter() - utterance.enqueued_at
+            with self._cond:
+                self._latencies = (self._latencies + [utterance.first_sample_latency])[-LATENCY_SAMPLES:]
+            if utterance.on_start is not None:
+                utterance.on_start(utterance)
+
+        interrupted = self._interrupt.wait(self.player.length(sound))
+        if not interrupted and self.player.busy(channel):
+            interrupted = self._interrupt.wait(END_GRACE_SECONDS)
+        if interrupted:
+            self.player.stop(channel)
+            self._finish_interrupted(utterance)
+        else:
+            utterance.status = "done"
+
+    def _finish_interrupted(self, utterance):
+        if utterance.cancelled:
+            utterance.status = "cancelled"
+            return
+        # Preempted by something more urgent: play it again (from the start) afterwards
+        with self._cond:
+            utterance.status = "queued"
+            heapq.heappush(self._queue, utterance)
+            self._cond.notify()
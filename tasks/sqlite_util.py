@@ -0,0 +1,45 @@
+# File: tasks/sqlite_util.py
+# Plumbing shared by KunnaBuddy's SQLite stores (health, memory, reminders,
+# alerts, calendar, LLM cache): one WAL-mode connection per store, shared by
+# every thread under the store's own lock, and one lazily opened instance
+# per process.
+#
+#   self._conn = open_wal_connection(path, synchronous="NORMAL")
+#
+#   _stores = SharedInstances(ReminderStore)
+#   def get_reminder_store():
+#       return _stores.get()
+
+import sqlite3
+import threading
+
+
+def open_wal_connection(path, synchronous=None, busy_timeout_ms=None, **connect_args):
+    """
+    A connection usable from any thread (callers serialize access with their
+    own lock), in WAL mode. `synchronous` sets PRAGMA synchronous (FULL,
+    NORMAL, ...) and `busy_timeout_ms` how long to wait for another process's
+    lock; both keep SQLite's defaults when None.
+    """
+    conn = sqlite3.connect(path, check_same_thread=False, **connect_args)
+    if busy_timeout_ms is not None:
+        conn.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+    conn.execute("PRAGMA journal_mode=WAL")
+    if synchronous is not None:
+        conn.execute(f"PRAGMA synchronous={synchronous}")
+    return conn
+
+
+class SharedInstances:
+    """Process-wide instances built by `factory(*key)` on first request, one per key."""
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._instances = {}
+        self._lock = threading.Lock()
+
+    def get(self, *key):
+        with self._lock:
+            if key not in self._instances:
+                self._instances[key] = self._factory(*key)
+            return self._instances[key]
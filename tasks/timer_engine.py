@@ -0,0 +1,167 @@
+# File: tasks/timer_engine.py
+# One thread, one min-heap of deadlines. The thread sleeps on a condition
+# variable until the earliest deadline (or until a new, earlier timer is
+# added), so an idle assistant uses no CPU however many reminders are queued.
+#
+#   engine = get_timer_engine()
+#   timer_id = engine.schedule(datetime.now() + timedelta(minutes=5), callback)
+#   engine.cancel(timer_id)
+
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+# Deadlines are wall-clock times, so a long wait is cut into pieces of at
+# most this length to notice system clock changes (e.g. after a suspend).
+MAX_WAIT_SECONDS = 60
+CALLBACK_WORKERS = 2        # Callbacks run here, never on the timer thread
+
+
+def _timestamp(when):
+    return when.timestamp() if isinstance(when, datetime) else float(when)
+
+
+class TimerEngine:
+    def __init__(self, workers=CALLBACK_WORKERS):
+        self._cond = threading.Condition()
+        self._heap = []                # (due, seq, timer_id); cancelled ids stay until popped
+        self._timers = {}              # timer_id -> {"due", "repeat", "callback", "args"}
+        self._seq = itertools.count()
+        self._ids = itertools.count(1)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="timer-callback")
+        self._thread = None
+        self._stopped = False
+        self.fired = 0
+
+    # --- Public API ---
+
+    def schedule(self, when, callback, *args, repeat=None, timer_id=None):
+        """
+        Runs callback(*args) at `when` (a datetime or a Unix timestamp), then
+        every `repeat` seconds if given. Returns the timer id; pass `timer_id`
+        to choose it (e.g. when restoring saved timers).
+        """
+        if repeat is not None and repeat <= 0:
+            raise ValueError("repeat must be a positive number of seconds")
+        with self._cond:
+            timer_id = timer_id if timer_id is not None else next(self._ids)
+            if timer_id in self._timers:
+                raise ValueError(f"timer id {timer_id!r} is already scheduled")
+            due = _timestamp(when)
+            self._timers[timer_id] = {"due": due, "repeat": repeat, "callback": callback, "args": args}
+            heapq.heappush(self._heap, (due, next(self._seq), timer_id))
+            if self._heap[0][2] == timer_id:
+                self._cond.notify()     # new earliest deadline: re-arm the wait
+        return timer_id
+
+    def schedule_in(self, seconds, callback, *args, repeat=None):
+        return self.schedule(time.time() + seconds, callback, *args, repeat=repeat)
+
+    def new_id(self):
+        """Reserves an id, for callers that need it before scheduling (e.g. as a callback arg)."""
+        with self._cond:
+            return next(self._ids)
+
+    def next_due(self, timer_id):
+        """Datetime the timer fires next, or None if it is not pending."""
+        with self._cond:
+            timer = self._timers.get(timer_id)
+            return datetime.fromtimestamp(timer["due"]) if timer else None
+
+    def cancel(self, timer_id):
+        """Cancels a pending timer. Returns False if it is unknown or already fired."""
+        with self._cond:
+            if self._timers.pop(timer_id, None) is None:
+                return False
+            # Cancelled entries are skipped when popped; rebuild once they dominate.
+            if len(self._heap) > 1024 and len(self._heap) > 2 * len(self._timers):
+                self._heap = [entry for entry in self._heap if self._timers.get(entry[2], {}).get("due") == entry[0]]
+                heapq.heapify(self._heap)
+            return True
+
+    def pending(self):
+        """[(timer_id, due datetime, repeat seconds)] in firing order."""
+        with self._cond:
+            timers = sorted(self._timers.items(), key=lambda item: item[1]["due"])
+            return [(timer_id, datetime.fromtimestamp(t["due"]), t["repeat"]) for timer_id, t in timers]
+
+    def __len__(self):
+        with self._cond:
+            return len(self._timers)
+
+    # --- Timer thread ---
+
+    def _pop_due(self, now):
+        due_timers = []
+        while self._heap and self._heap[0][0] <= now:
+            due, _, timer_id = heapq.heappop(self._heap)
+            timer = self._timers.get(timer_id)
+            if timer is None or timer["due"] != due:
+                continue                # cancelled (or a stale entry of a rescheduled timer)
+            due_timers.append((timer_id, timer))
+            if timer["repeat"]:
+                # Next occurrence after now; missed occurrences are skipped, not replayed.
+                missed = int((now - due) // timer["repeat"]) + 1
+                timer["due"] = due + missed * timer["repeat"]
+                heapq.heappush(self._heap, (timer["due"], next(self._seq), timer_id))
+            else:
+                del self._timers[timer_id]
+        return due_timers
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._stopped:
+                        return
+                    now = time.time()
+                    due_timers = self._pop_due(now)
+                    if due_timers:
+                        break
+                    # Skip cancelled heads so the wait targets a live deadline
+                    while self._heap and self._heap[0][2] not in self._timers:
+                        heapq.heappop(self._heap)
+                    timeout = min(self._heap[0][0] - now, MAX_WAIT_SECONDS) if self._heap else None
+                    self._cond.wait(timeout)
+            for timer_id, timer in due_timers:
+                self.fired += 1
+                self._executor.submit(self._invoke, timer_id, timer["callback"], timer["args"])
+
+    @staticmethod
+    def _invoke(timer_id, callback, args):
+        try:
+            callback(*args)
+        except Exception as e:
+            print(f"ERROR: Timer {timer_id} callback failed. Reason: {e}")
+
+    def start(self):
+        with self._cond:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopped = False
+                self._thread = threading.Thread(target=self._run, daemon=True, name="timer-engine")
+                self._thread.start()
+        return self
+
+    def stop(self, wait=True):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread and wait:
+            self._thread.join()
+        self._executor.shutdown(wait=wait)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_timer_engine():
+    """Returns the process-wide, started TimerEngine."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = TimerEngine().start()
+        return _engine
@@ -0,0 +1,119 @@
+# File: tasks/tts_backends.py
+# Text-to-speech backends for tasks/speaker.py. A backend either returns an
+# encoded clip (gTTS: MP3 bytes, cacheable on disk) or renders raw PCM in
+# memory (espeak-ng: no network, no temp files). Which one speaks is chosen
+# per deployment with KUNNABUDDY_TTS_BACKEND:
+#
+#   gtts   - Google TTS only (needs the network)
+#   local  - espeak-ng only
+#   auto   - gTTS, falling back to espeak-ng while the network is failing (default)
+
+import io
+import os
+import shutil
+import struct
+import subprocess
+
+import numpy as np
+
+TTS_BACKEND = os.environ.get("KUNNABUDDY_TTS_BACKEND", "auto").lower()
+LOCAL_VOICE = os.environ.get("KUNNABUDDY_TTS_VOICE", "en")
+LOCAL_WORDS_PER_MINUTE = 175
+LOCAL_TIMEOUT = 30
+
+
+class TTSBackend:
+    """
+    Interface. Encoded backends implement synthesize(text) -> bytes (a clip any
+    player can decode); PCM backends implement render_pcm(text) ->
+    (int16 mono samples, sample_rate).
+    """
+
+    name = "base"
+    voice = "default"       # Part of the TTS cache key
+    produces_pcm = False
+
+    def available(self):
+        return True
+
+    def synthesize(self, text):
+        raise NotImplementedError
+
+    def render_pcm(self, text):
+        raise NotImplementedError
+
+
+class GTTSBackend(TTSBackend):
+    name = "gtts"
+    voice = "gtts"
+
+    def __init__(self, lang="en"):
+        self.lang = lang
+
+    def available(self):
+        try:
+            import gtts  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def synthesize(self, text):
+        """gTTS -> MP3 bytes (one HTTPS round trip per call)."""
+        from gtts import gTTS
+
+        fp = io.BytesIO()
+        gTTS(text=text, lang=self.lang).write_to_fp(fp)
+        return fp.getvalue()
+
+
+class EspeakBackend(TTSBackend):
+    """espeak-ng (or classic espeak) run with --stdout; the WAV stream is parsed in memory."""
+
+    name = "espeak-ng"
+    produces_pcm = True
+
+    def __init__(self, voice=LOCAL_VOICE, words_per_minute=LOCAL_WORDS_PER_MINUTE, executable=None):
+        self.voice = voice
+        self.words_per_minute = words_per_minute
+        self.executable = executable or shutil.which("espeak-ng") or shutil.which("espeak")
+
+    def available(self):
+        return self.executable is not None
+
+    def render_pcm(self, text):
+        if self.executable is None:
+            raise RuntimeError("espeak-ng is not installed")
+        result = subprocess.run(
+            [self.executable, "--stdout", "--stdin", "-v", self.voice, "-s", str(self.words_per_minute)],
+            input=text.encode("utf-8"), capture_output=True, timeout=LOCAL_TIMEOUT, check=True)
+        return parse_wav(result.stdout)
+
+
+def parse_wav(data):
+    """
+    16-bit PCM WAV bytes -> (int16 mono samples, sample_rate). Tolerates the
+    placeholder chunk sizes espeak writes when its output is a pipe.
+    """
+    if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        raise ValueError("not a WAV stream")
+    offset, channels, sample_rate = 12, None, None
+    while offset + 8 <= len(data):
+        chunk_id, size = data[offset:offset + 4], struct.unpack("<I", data[offset + 4:offset + 8])[0]
+        body = offset + 8
+        if chunk_id == b"fmt ":
+            audio_format, channels, sample_rate = struct.unpack("<HHI", data[body:body + 8])
+            bits = struct.unpack("<H", data[body + 14:body + 16])[0]
+            if audio_format != 1 or bits != 16:
+                raise ValueError(f"unsupported WAV format {audio_format}/{bits}-bit")
+        elif chunk_id == b"data":
+            if sample_rate is None:
+                raise ValueError("WAV data before fmt chunk")
+            end = min(body + size, len(data))
+            end -= (end - body) % (2 * channels)
+            samples = np.frombuffer(data[body:end], dtype="<i2")
+            if channels > 1:
+                samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+            return samples, sample_rate
+        offset = body + size + (size & 1)
+    raise ValueError("WAV stream has no data chunk")
+
@@ -0,0 +1,195 @@
+# File: tasks/tts_cache.py
+# On-disk cache of synthesized speech for tasks/speaker.py. Clips are stored
+# as one file per (text, language, voice) hash, evicted least-recently-used
+# once the directory outgrows its size cap, and played straight from a
+# memory map of the file.
+
+import hashlib
+import io
+import mmap
+import os
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+
+TTS_CACHE_DIR = "kunnabuddy_tts_cache"
+MAX_CACHE_BYTES = 100 * 1024 * 1024
+MAX_CACHED_CHARS = 300      # Longer texts are one-off answers; caching them only churns the cache
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text):
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def make_clip_key(text, lang="en", voice="default"):
+    return hashlib.sha256(f"{lang}\x00{voice}\x00{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+class MappedClip:
+    """Read-only, file-like view of a cached clip backed by mmap (what pygame's loaders accept)."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def read(self, size=-1):
+        return self._map.read(size if size is not None and size >= 0 else len(self._map) - self._map.tell())
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        self._map.seek(offset, whence)
+        return self._map.tell()
+
+    def tell(self):
+        return self._map.tell()
+
+    def __len__(self):
+        return len(self._map)
+
+    def close(self):
+        self._map.close()
+
+
+class TTSCache:
+    def __init__(self, directory=TTS_CACHE_DIR, max_bytes=MAX_CACHE_BYTES, extension=".mp3"):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.extension = extension
+        self.stats = Counter()
+        self._lock = threading.Lock()
+        self._synth_seconds = []       # recent synthesis latencies, for the "latency saved" estimate
+        os.makedirs(directory, exist_ok=True)
+        # key -> size, least recently used first. File mtimes carry recency across restarts.
+        entries = []
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.name.endswith(extension):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, entry.name[:-len(extension)], stat.st_size))
+        entries.sort()
+        self._index = OrderedDict((key, size) for _, key, size in entries)
+        self._total_bytes = sum(self._index.values())
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + self.extension)
+
+    def get(self, text, lang="en", voice="default"):
+        """Path of the cached clip, or None. A hit refreshes the clip's LRU position."""
+        key = make_clip_key(text, lang, voice)
+        with self._lock:
+            if key not in self._index:
+                self.stats["misses"] += 1
+                return None
+            self._index.move_to_end(key)
+            self.stats["hits"] += 1
+        path = self._path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            # Deleted behind our back (e.g. by another process evicting it)
+            with self._lock:
+                self._total_bytes -= self._index.pop(key, 0)
+                self.stats["hits"] -= 1
+                self.stats["misses"] += 1
+            return None
+        return path
+
+    def put(self, text, audio, lang="en", voice="default"):
+        """Stores `audio` bytes atomically and evicts LRU clips over the cap. Returns the path."""
+        key = make_clip_key(text, lang, voice)
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(audio)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._total_bytes += len(audio) - self._index.pop(key, 0)
+            self._index[key] = len(audio)
+            while self._total_bytes > self.max_bytes and len(self._index) > 1:
+                old_key, size = self._index.popitem(last=False)
+                self._total_bytes -= size
+                self.stats["evictions"] += 1
+                try:
+                    os.remove(self._path(old_key))
+                except OSError:
+                    pass    # already gone, or still mapped by a player (Windows); orphaned until re-put
+        return path
+
+    def get_or_synthesize(self, text, synthesize, lang="en", voice="default", cache=True):
+        """
+        Returns a MappedClip for `text`, calling synthesize(text) -> bytes on a
+        miss. Texts longer than MAX_CACHED_CHARS are synthesized into memory
+        without touching the cache. With cache=False (one-off text such as a
+        streamed answer) a cached clip is still used, but a miss is
+        synthesized into memory and not stored, so it cannot evict the
+        phrases that do repeat.
+        """
+        if len(text) > MAX_CACHED_CHARS:
+            self.stats["uncacheable"] += 1
+            return io.BytesIO(synthesize(text))
+        path = self.get(text, lang, voice)
+        if path is not None:
+            try:
+                return MappedClip(path)
+            except (FileNotFoundError, ValueError):
+                pass    # evicted between lookup and open, or a truncated file: synthesize again
+        if not cache:
+            self.stats["uncacheable"] += 1
+            return io.BytesIO(self._timed_synthesize(synthesize, text))
+        path = self.put(text, self._timed_synthesize(synthesize, text), lang, voice)
+        return MappedClip(path)
+
+    def _timed_synthesize(self, synthesize, text):
+        started = time.perf_counter()
+        audio = synthesize(text)
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._synth_seconds = (self._synth_seconds + [elapsed])[-100:]
+        return audio
+
+    def prewarm(self, phrases, synthesize, lang="en", voice="default"):
+        """Synthesizes any of `phrases` not cached yet. Returns how many were added."""
+        added = 0
+        for phrase in phrases:
+            key = make_clip_key(phrase, lang, voice)
+            with self._lock:
+                cached = key in self._index
+            if cached:
+                continue
+            try:
+                self.put(phrase, self._timed_synthesize(synthesize, phrase), lang, voice)
+                added += 1
+            except Exception as e:
+                print(f"WARNING: Could not pre-warm speech for '{phrase}': {e}")
+        return added
+
+    def get_stats(self):
+        with self._lock:
+            hits, misses = self.stats["hits"], self.stats["misses"]
+            average_synth = sum(self._synth_seconds) / len(self._synth_seconds) if self._synth_seconds else None
+            return {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+                "evictions": self.stats["evictions"],
+                "uncacheable": self.stats["uncacheable"],
+                "clips": len(self._index),
+                "bytes": self._total_bytes,
+                "average_synthesis_seconds": average_synth,
+                # Estimated: each hit would have cost an average synthesis
+                "latency_saved_seconds": hits * average_synth if average_synth is not None else None,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_tts_cache():
+    """Returns the process-wide TTSCache, indexing the cache directory on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = TTSCache()
+        return _cache
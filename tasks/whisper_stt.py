@@ -0,0 +1,80 @@
+# File: tasks/whisper_stt.py
+# Local Whisper speech-to-text shared by voice mode (tasks/listener.py) and
+# meeting transcription (tasks/meeting_helper.py). The model lives in the
+# model manager: loaded on first use (or by warm_up_whisper() at startup),
+# one instance per process, unloaded when idle. Audio goes in as float32
+# NumPy arrays at 16 kHz, never through a WAV file.
+
+import threading
+
+import numpy as np
+
+from .model_manager import get_model_manager
+
+SAMPLE_RATE, MODEL_SIZE = 16000, "base.en"
+MODEL_NAME = "whisper"
+
+_decode_lock = threading.Lock()     # one decode at a time: the model is shared across threads
+_finals_waiting = 0                 # final decodes queued on _decode_lock; interim ones give way to them
+_finals_lock = threading.Lock()
+
+
+def _load_whisper():
+    import whisper
+    print("INFO: Loading transcription model...")
+    model = whisper.load_model(MODEL_SIZE)
+    print("✅ Transcription model loaded.")
+    return model
+
+
+get_model_manager().register(MODEL_NAME, _load_whisper)
+
+
+def get_whisper_model():
+    """The shared Whisper model, loaded if needed."""
+    return get_model_manager().get(MODEL_NAME)
+
+
+def warm_up_whisper():
+    """Loads the model on a background thread (call at startup). Returns the thread."""
+    return get_model_manager().warm_up(MODEL_NAME)
+
+
+def _acquire_decode(interim):
+    global _finals_waiting
+    if interim:
+        return not _finals_waiting and _decode_lock.acquire(blocking=False)
+    with _finals_lock:
+        _finals_waiting += 1
+    try:
+        return _decode_lock.acquire()
+    finally:
+        with _finals_lock:
+            _finals_waiting -= 1
+
+
+def transcribe(audio, interim=False, **options):
+    """
+    float32 mono samples at SAMPLE_RATE (int16 is converted) -> Whisper's
+    result dict. Greedy decoding without timestamps unless overridden.
+
+    An `interim` decode (a partial hypothesis) never queues: it returns None
+    when another decode is running or a final one is waiting for the model.
+    """
+    audio = np.asarray(audio)
+    if audio.dtype == np.int16:
+        audio = audio.astype(np.float32) / 32768
+    audio = np.ascontiguousarray(audio.ravel(), dtype=np.float32)
+    with get_model_manager().use(MODEL_NAME) as model:
+        if not _acquire_decode(interim):
+            return None
+        try:
+            options = {"language": "en", "temperature": 0.0, "without_timestamps": True,
+                       "condition_on_previous_text": False, "fp16": model.device.type == "cuda", **options}
+            return model.transcribe(audio, **options)
+        finally:
+            _decode_lock.release()
+
+
+def transcribe_text(audio, **options):
+    return transcribe(audio, **options)["text"].strip()
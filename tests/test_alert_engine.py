@@ -0,0 +1,125 @@
+import sqlite3
+
+import pytest
+
+from tasks.alert_engine import AlertEngine
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = AlertEngine(str(tmp_path / "alerts.sqlite3"))
+    yield engine
+    engine.close()
+
+
+def _ids(triggered):
+    return sorted(alert["id"] for alert in triggered)
+
+
+def test_price_alerts_fire_once_when_crossed(engine):
+    above = engine.add_price_alert("aapl", "above", 200)
+    below = engine.add_price_alert("AAPL", "below", 150)
+    assert engine.on_price("AAPL", 200) == []           # touching the target is not crossing it
+    assert _ids(engine.on_price("AAPL", 200.5)) == [above["id"]]
+    assert engine.on_price("AAPL", 250) == []           # already removed
+    fired = engine.on_price("AAPL", 149)
+    assert _ids(fired) == [below["id"]] and fired[0]["price"] == 149
+    assert len(engine) == 0
+
+
+def test_one_price_fires_every_crossed_alert(engine):
+    ids = [engine.add_price_alert("TSLA", "below", target)["id"] for target in (190, 180, 170)]
+    engine.add_price_alert("TSLA", "below", 100)
+    assert _ids(engine.check({"TSLA": 175})) == ids[:2]
+    assert _ids(engine.check({"TSLA": 150})) == ids[2:]
+
+
+def test_percent_alert_is_relative_to_reference(engine):
+    alert = engine.add_percent_alert("MSFT", "below", 10, 400)
+    assert engine.on_price("MSFT", 361) == []
+    assert _ids(engine.on_price("MSFT", 359)) == [alert["id"]]
+
+
+def test_cancelled_alert_never_fires(engine):
+    alert = engine.add_price_alert("NVDA", "above", 100)
+    trailing = engine.add_trailing_alert("NVDA", "below", 5, 100)
+    assert engine.cancel(alert["id"]) and engine.cancel(trailing["id"])
+    assert not engine.cancel(alert["id"])
+    assert engine.check({"NVDA": 120}) == [] and engine.check({"NVDA": 50}) == []
+
+
+def test_cancelled_alert_ids_are_not_reused(engine):
+    first = engine.add_price_alert("AAPL", "above", 200)
+    engine.cancel(first["id"])
+    assert engine.add_price_alert("MSFT", "below", 100)["id"] != first["id"]
+
+
+def test_alert_reusing_a_cancelled_id_keeps_its_own_target(tmp_path):
+    # Stores created before AUTOINCREMENT hand a cancelled alert's id to the next one
+    path = str(tmp_path / "alerts.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE alerts (id INTEGER PRIMARY KEY, ticker TEXT NOT NULL, kind TEXT NOT NULL, "
+                 "direction TEXT NOT NULL, target REAL, pct REAL, reference REAL, created TEXT NOT NULL)")
+    conn.close()
+    engine = AlertEngine(path)
+    first = engine.add_price_alert("AAPL", "above", 200)
+    engine.cancel(first["id"])
+    second = engine.add_price_alert("MSFT", "below", 100)
+    assert second["id"] == first["id"]
+    assert engine.check({"AAPL": 210}) == []
+    assert [a["ticker"] for a in engine.check({"MSFT": 90})] == ["MSFT"]
+
+
+def test_trailing_stop_follows_the_high(engine):
+    alert = engine.add_trailing_alert("AMZN", "below", 10, 100)
+    assert engine.on_price("AMZN", 91) == []            # 9% below the starting price
+    assert engine.on_price("AMZN", 120) == []           # new high: the stop moves up to 108
+    assert engine.on_price("AMZN", 109) == []
+    assert _ids(engine.on_price("AMZN", 107.9)) == [alert["id"]]
+
+
+def test_trailing_above_follows_the_low(engine):
+    alert = engine.add_trailing_alert("AMD", "above", 10, 100)
+    assert engine.on_price("AMD", 109) == []
+    assert engine.on_price("AMD", 80) == []             # new low: fires at 88
+    assert engine.on_price("AMD", 87.9) == []
+    assert _ids(engine.on_price("AMD", 88.1)) == [alert["id"]]
+
+
+def test_trailing_alerts_set_at_different_prices_share_a_new_high(engine):
+    tight = engine.add_trailing_alert("META", "below", 5, 100)
+    loose = engine.add_trailing_alert("META", "below", 20, 90)
+    engine.on_price("META", 200)
+    assert _ids(engine.on_price("META", 189)) == [tight["id"]]
+    assert engine.on_price("META", 161) == []
+    assert _ids(engine.on_price("META", 159)) == [loose["id"]]
+
+
+def test_alerts_and_trailing_extremes_survive_a_restart(tmp_path):
+    path = str(tmp_path / "alerts.sqlite3")
+    engine = AlertEngine(path)
+    price = engine.add_price_alert("IBM", "above", 300)
+    trailing = engine.add_trailing_alert("IBM", "below", 10, 100)
+    engine.on_price("IBM", 150)
+    engine.close()                                      # saves the 150 high
+
+    engine = AlertEngine(path)
+    assert len(engine) == 2
+    assert engine.on_price("IBM", 136) == []
+    assert _ids(engine.on_price("IBM", 134)) == [trailing["id"]]
+    assert _ids(engine.on_price("IBM", 301)) == [price["id"]]
+    engine.close()
+
+
+def test_distance_to_trigger_uses_nearest_alert(engine):
+    assert engine.distance_to_trigger("GOOG", 100) is None
+    engine.add_price_alert("GOOG", "above", 110)
+    engine.add_trailing_alert("GOOG", "below", 5, 100)
+    assert engine.distance_to_trigger("GOOG", 100) == pytest.approx(0.05)
+
+
+def test_invalid_alerts_are_rejected(engine):
+    with pytest.raises(ValueError):
+        engine.add_price_alert("AAPL", "sideways", 100)
+    with pytest.raises(ValueError):
+        engine.add_trailing_alert("AAPL", "below", 100, 50)
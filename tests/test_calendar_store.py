@@ -0,0 +1,139 @@
+import types
+
+import pytest
+
+pytest.importorskip("googleapiclient")
+
+from googleapiclient.errors import HttpError
+
+from calendar_store import CalendarStore, IntervalIndex
+
+
+class _FakeEventsService:
+    """events().list(...).execute() with pageToken paging and syncToken incremental sync."""
+
+    def __init__(self, page_size=250):
+        self.page_size = page_size
+        self.changes = {}          # event id -> (sequence, event); deletions are kept as "cancelled"
+        self.sequence = 0
+        self.token_floor = 0       # tokens below this answer 410 Gone
+        self.requests = []
+
+    def upsert(self, event_id, start, end):
+        self.sequence += 1
+        self.changes[event_id] = (self.sequence, {
+            "id": event_id, "status": "confirmed",
+            "start": {"dateTime": f"2026-03-02T{start}:00+00:00"},
+            "end": {"dateTime": f"2026-03-02T{end}:00+00:00"},
+        })
+
+    def delete(self, event_id):
+        self.sequence += 1
+        self.changes[event_id] = (self.sequence, {"id": event_id, "status": "cancelled"})
+
+    def invalidate_sync_tokens(self):
+        self.token_floor = self.sequence + 1
+
+    def events(self):
+        return self
+
+    def list(self, **params):
+        self.requests.append(params)
+        return types.SimpleNamespace(execute=lambda: self._page(params))
+
+    def _page(self, params):
+        if "syncToken" in params:
+            since = int(params["syncToken"])
+            if since < self.token_floor:
+                raise HttpError(types.SimpleNamespace(status=410, reason="Gone"), b"{}")
+            items = [event for sequence, event in self.changes.values() if sequence > since]
+        else:
+            items = [event for _, event in self.changes.values() if event["status"] != "cancelled"]
+        offset = int(params.get("pageToken", 0))
+        page = {"items": items[offset:offset + self.page_size]}
+        if offset + self.page_size < len(items):
+            page["nextPageToken"] = str(offset + self.page_size)
+        else:
+            page["nextSyncToken"] = str(self.sequence)
+        return page
+
+
+@pytest.fixture
+def service():
+    service = _FakeEventsService()
+    service.upsert("standup", "09:00", "09:15")
+    service.upsert("review", "14:00", "15:00")
+    return service
+
+
+def _ids(store):
+    return sorted(store._events)
+
+
+def test_incremental_sync_applies_only_changes_since_the_token(tmp_path, service):
+    path = str(tmp_path / "calendar.sqlite3")
+    store = CalendarStore(path)
+    assert store.sync(service) == 2 and "syncToken" not in service.requests[-1]
+
+    service.upsert("lunch", "12:00", "13:00")
+    service.delete("standup")
+    assert store.sync(service) == 2
+    assert service.requests[-1]["syncToken"] == "2"
+    assert _ids(store) == ["lunch", "review"]
+
+    reopened = CalendarStore(path)
+    assert reopened.sync_token == store.sync_token and _ids(reopened) == ["lunch", "review"]
+    assert reopened.sync(service) == 0
+
+
+def test_sync_follows_every_page(tmp_path, service):
+    service.page_size = 1
+    service.upsert("lunch", "12:00", "13:00")
+    store = CalendarStore(str(tmp_path / "calendar.sqlite3"))
+    assert store.sync(service) == 3 and _ids(store) == ["lunch", "review", "standup"]
+    assert [r.get("pageToken") for r in service.requests] == [None, "1", "2"]
+
+
+def test_expired_sync_token_falls_back_to_a_full_resync(tmp_path, service):
+    store = CalendarStore(str(tmp_path / "calendar.sqlite3"))
+    store.sync(service)
+    service.delete("standup")
+    service.upsert("lunch", "12:00", "13:00")
+    service.invalidate_sync_tokens()
+
+    assert store.sync(service) == 2
+    assert "syncToken" in service.requests[-2] and "syncToken" not in service.requests[-1]
+    assert _ids(store) == ["lunch", "review"]
+    assert store.sync_token == str(service.sequence)
+
+
+def test_other_http_errors_are_raised(tmp_path):
+    class _Failing(_FakeEventsService):
+        def _page(self, params):
+            raise HttpError(types.SimpleNamespace(status=500, reason="Server Error"), b"{}")
+
+    with pytest.raises(HttpError):
+        CalendarStore(str(tmp_path / "calendar.sqlite3")).sync(_Failing())
+
+
+def test_interval_index_overlap_queries():
+    index = IntervalIndex()
+    index.add("all-day", 0, 100)
+    index.add("early", 10, 20)
+    index.add("touching", 30, 40)
+    index.add("inside", 42, 45)
+    index.add("instant", 50, 50)
+    index.add("late", 60, 70)
+
+    # A long event that started well before the window is still found
+    assert index.overlapping(40, 55) == ["all-day", "inside", "instant"]
+    # Half-open: ending at lo or starting at hi is not an overlap
+    assert "touching" not in index.overlapping(40, 55) and "late" not in index.overlapping(55, 60)
+    assert index.overlapping(101, 200) == []
+
+    index.add("early", 80, 90)       # moving an event replaces it
+    index.remove("all-day")
+    assert index.overlapping(0, 30) == []
+    assert index.overlapping(0, 100) == ["touching", "inside", "instant", "late", "early"]
+    assert index.first_after(46) == "instant" and index.first_after(91) is None
+    assert len(index) == 5
@@ -0,0 +1,77 @@
+import time
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from tasks.health_store import HealthStore, BufferedHealthWriter, local_day_ordinals
+
+
+def _store(tmp_path, name="health.sqlite3"):
+    return HealthStore(str(tmp_path / name), legacy_csv=None)
+
+
+def test_buffered_writer_persists_rows_when_flushed(tmp_path):
+    store = _store(tmp_path)
+    with BufferedHealthWriter(store, flush_size=2, flush_interval=None) as writer:
+        writer.write("water", 250, "ml", datetime(2026, 1, 5, 9, 0))
+        assert len(store) == 0                  # still buffered
+        writer.write("water", 500, "ml", datetime(2026, 1, 5, 12, 0))
+        assert len(store) == 2                  # flush_size reached
+        writer.write("weight", 61.5, "kg", datetime(2026, 1, 5, 8, 0))
+    reopened = _store(tmp_path)                 # close() flushed the last row to disk
+    water = reopened.range("water", datetime(2026, 1, 5), datetime(2026, 1, 6))
+    assert [(e["value"], e["unit"]) for e in water] == [("250", "ml"), ("500", "ml")]
+    assert [e["numeric_value"] for e in reopened.tail("weight")] == [61.5]
+
+
+def test_buffered_writer_flushes_old_rows_in_the_background(tmp_path):
+    store = _store(tmp_path)
+    with BufferedHealthWriter(store, flush_interval=0.05) as writer:
+        writer.write("steps", 1200, "", datetime(2026, 1, 5, 9, 0))
+        deadline = time.monotonic() + 5
+        while not len(store) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(store) == 1
+
+
+def _rollups(store):
+    with store._lock:
+        return {table: sorted(store._conn.execute(f"SELECT * FROM {table}").fetchall())
+                for table in ("daily_rollups", "weekly_rollups")}
+
+
+@pytest.fixture
+def kolkata(monkeypatch):
+    # +05:30: UTC hour buckets straddle local midnight
+    monkeypatch.setenv("TZ", "Asia/Kolkata")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_local_day_in_half_hour_offset_timezone(tmp_path, kolkata):
+    store = _store(tmp_path)
+    store.append("water", 500, "ml", datetime(2026, 10, 17, 23, 50))
+    store.append("water", 300, "ml", datetime(2026, 10, 18, 0, 10))
+    _, totals, counts, unit = store.rollup_series("water", date(2026, 10, 17).toordinal(),
+                                                  date(2026, 10, 19).toordinal())
+    assert totals.tolist() == [500, 300] and counts.tolist() == [1, 1] and unit == "ml"
+
+
+def test_incremental_rollups_match_rebuild(tmp_path, kolkata):
+    store = _store(tmp_path)
+    start = datetime(2026, 10, 17, 20, 0)
+    store.append_many(("water", 100 + i, "ml", start + timedelta(minutes=17 * i)) for i in range(100))
+    with BufferedHealthWriter(store, flush_interval=None, flush_size=7) as writer:
+        for i in range(50):
+            writer.write("weight", 60 + i, "kg", start + timedelta(hours=3 * i))
+            writer.write("water", "1.5", "l", start + timedelta(hours=5 * i))
+    incremental = _rollups(store)
+    store.rebuild_rollups()
+    assert _rollups(store) == incremental
+
+
+def test_local_day_ordinals_matches_per_row_dates(kolkata):
+    stamps = [datetime(2026, 10, 17, 23, 29).timestamp() + 60 * i for i in range(120)]
+    assert local_day_ordinals(stamps).tolist() == [date.fromtimestamp(ts).toordinal() for ts in stamps]
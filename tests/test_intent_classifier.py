@@ -0,0 +1,116 @@
+from datetime import date
+
+import pytest
+
+from intent_classifier import classify_intent, CONFIDENCE_THRESHOLD, _briefing_day
+
+
+def _local_command(prompt):
+    command_data, confidence = classify_intent(prompt)
+    if command_data is None or confidence < CONFIDENCE_THRESHOLD:
+        return None
+    return command_data
+
+
+@pytest.mark.parametrize("prompt", [
+    "what is my agenda for tomorrow",
+    "what's my schedule today",
+    "what's on my calendar this week",
+])
+def test_calendar_questions_are_not_memory_recall(prompt):
+    assert _local_command(prompt)["command"] == "get_daily_briefing"
+
+
+def test_briefing_day_is_extracted():
+    assert _local_command("what is my agenda for tomorrow")["params"] == {"day": "tomorrow"}
+
+
+@pytest.mark.parametrize("prompt", [
+    "what is the schedule for the world cup",
+    "show me the champions league schedule",
+    "any news about the apple event",
+    "what is my calendar password",
+    "delete my calendar event tomorrow",
+])
+def test_non_personal_calendar_words_are_not_a_briefing(prompt):
+    command = _local_command(prompt)
+    assert command is None or command["command"] != "get_daily_briefing"
+
+
+def test_calendar_password_is_a_memory():
+    assert _local_command("what is my calendar password") == {
+        "command": "recall_info", "params": {"key": "calendar password"}}
+
+
+def test_deleting_a_calendar_event_is_not_forget_info():
+    command = _local_command("delete my calendar event tomorrow")
+    assert command is None or command["command"] != "forget_info"
+
+
+@pytest.mark.parametrize("text, day", [
+    ("what events are happening in london this weekend", "2026-10-24..2026-10-25"),   # not "this week"
+    ("what's on my calendar next weekend", "2026-10-31..2026-11-01"),
+    ("what's on my calendar next week", "next week"),
+    ("anything tomorrow", "tomorrow"),
+    ("what happened to the tomorrowland tickets", "today"),
+])
+def test_briefing_day_matches_whole_words(text, day):
+    assert _briefing_day(text, today=date(2026, 10, 21)) == day
+
+
+def test_weekend_on_a_sunday_is_today():
+    assert _briefing_day("my plans this weekend", today=date(2026, 10, 25)) == "2026-10-25..2026-10-25"
+
+
+@pytest.mark.parametrize("prompt", ["forget it", "forget that", "remember that"])
+def test_pronoun_only_memory_commands_go_to_the_llm(prompt):
+    assert _local_command(prompt) is None
+
+
+def test_memory_commands_still_extract_slots():
+    assert _local_command("remember my locker code is 42") == {
+        "command": "remember_info", "params": {"key": "locker code", "value": "42"}}
+    assert _local_command("what's my locker code") == {"command": "recall_info", "params": {"key": "locker code"}}
+    assert _local_command("forget my locker code") == {"command": "forget_info", "params": {"key": "locker code"}}
+
+
+@pytest.mark.parametrize("prompt", ["what's my next meeting", "when's my next appointment", "what's next"])
+def test_next_event_questions(prompt):
+    assert _local_command(prompt) == {"command": "get_next_event", "params": {}}
+
+
+@pytest.mark.parametrize("prompt, day", [
+    ("am i free tomorrow", "tomorrow"),
+    ("when am i free tomorrow", "tomorrow"),
+    ("am i busy this week", "this week"),
+    ("do i have any free time today", "today"),
+])
+def test_availability_questions(prompt, day):
+    assert _local_command(prompt) == {"command": "check_availability", "params": {"day": day}}
+
+
+@pytest.mark.parametrize("prompt", [
+    "what is next for spacex",
+    "what comes next in the fibonacci sequence 1 1 2 3",
+    "tell me about the next event in formula 1",
+    "when is the next meeting of the g20",
+])
+def test_general_next_questions_are_not_the_next_event(prompt):
+    command = _local_command(prompt)
+    assert command is None or command["command"] != "get_next_event"
+
+
+@pytest.mark.parametrize("prompt", [
+    "free time activities in london",
+    "check the availability of hotels in goa",
+    "open slots for the driving test",
+])
+def test_general_free_time_questions_are_not_availability(prompt):
+    command = _local_command(prompt)
+    assert command is None or command["command"] != "check_availability"
+
+
+@pytest.mark.parametrize("prompt", ["what do i have next", "what's next on my calendar",
+                                    "what's my upcoming call", "what's after this on my schedule"])
+def test_personal_next_event_phrasings(prompt):
+    assert _local_command(prompt) == {"command": "get_next_event", "params": {}}
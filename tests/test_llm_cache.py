@@ -0,0 +1,31 @@
+import pytest
+
+from llm_cache import make_cache_key
+
+
+def _router_prompt(clock, request):
+    return f'Current time: 2026-10-18 {clock}. ## User Request: "{request}"'
+
+
+@pytest.mark.parametrize("request_text", [
+    "remind me in 10 minutes to stretch",
+    "remind me in ten minutes",
+    "schedule a call in half an hour",
+    "call mom 20 minutes from now",
+    "am i free now",
+])
+def test_time_relative_prompts_keep_the_minute(request_text):
+    assert (make_cache_key("m", _router_prompt("09:13:52", request_text))
+            != make_cache_key("m", _router_prompt("09:41:05", request_text)))
+    assert (make_cache_key("m", _router_prompt("09:13:05", request_text))
+            == make_cache_key("m", _router_prompt("09:13:52", request_text)))
+
+
+@pytest.mark.parametrize("request_text", [
+    "what is on my calendar tomorrow",
+    "schedule the dentist tomorrow at 3pm",
+    "what's the weather in london",
+])
+def test_other_prompts_share_a_key_for_the_day(request_text):
+    assert (make_cache_key("m", _router_prompt("09:13:52", request_text))
+            == make_cache_key("m", _router_prompt("17:02:11", request_text)))
@@ -0,0 +1,79 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("requests")
+
+from llm_client import AsyncLLMClient, RequestLimiter, SharedSemaphore, TokenBucket
+
+
+class _Gauge:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.current = self.peak = 0
+
+    def __enter__(self):
+        with self._lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+
+    def __exit__(self, *exc):
+        with self._lock:
+            self.current -= 1
+
+
+def test_token_bucket_reserves_future_tokens():
+    bucket = TokenBucket(rate=10, capacity=2)
+    assert bucket.reserve() == 0 and bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+
+
+def test_limits_are_shared_across_event_loops_and_threads():
+    limiter = RequestLimiter(max_concurrency=3, rate_per_second=1000, burst=1000)
+    gauge = _Gauge()
+
+    async def generate(prompt):
+        with gauge:
+            await asyncio.sleep(0.02)
+        return prompt
+
+    def loop_thread():
+        client = AsyncLLMClient(generate, limiter=limiter)      # one client per loop, shared limits
+
+        async def burst():
+            return await asyncio.gather(*(client.ask(str(i)) for i in range(10)))
+        assert asyncio.run(burst()) == [str(i) for i in range(10)]
+
+    def sync_thread():
+        for _ in range(5):
+            with limiter.slot(), gauge:
+                time.sleep(0.02)
+
+    threads = [threading.Thread(target=loop_thread) for _ in range(3)] + [threading.Thread(target=sync_thread)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    assert gauge.peak == 3
+    metrics = limiter.get_metrics()
+    assert metrics["queue_depth"] == 0 and metrics["max_queue_depth"] > 3
+
+
+def test_cancelled_waiter_does_not_leak_a_slot():
+    semaphore = SharedSemaphore(1)
+
+    async def scenario():
+        await semaphore.acquire_async()
+        waiter = asyncio.ensure_future(semaphore.acquire_async())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        semaphore.release()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await asyncio.sleep(0)
+        await asyncio.wait_for(semaphore.acquire_async(), 1)    # the slot came back
+
+    asyncio.run(scenario())
@@ -0,0 +1,61 @@
+import pytest
+
+from tasks.memory_index import MemoryIndex, normalize
+
+
+@pytest.fixture
+def index():
+    index = MemoryIndex()
+    index.rebuild({
+        "wi-fi password": {"value": "blue kettle"},
+        "car parking spot": {"value": "level 3, bay 42"},
+        "mom's birthday": {"value": "march 14"},
+        "dentist": {"value": "dr. rao on mg road"},
+    })
+    return index
+
+
+def test_normalize_ignores_case_and_punctuation():
+    assert normalize("Wi-Fi  Password!") == normalize("wifi password") == "wifi password"
+
+
+def test_spelling_variants_are_exact_hits(index):
+    assert index.search("WiFi password") == [("wi-fi password", 1.0)]
+    assert index.search("what is my wifi password?") == [("wi-fi password", 1.0)]
+
+
+def test_typos_and_partial_keys_find_the_memory(index):
+    assert index.search("wifi pasword")[0][0] == "wi-fi password"
+    assert index.search("parking spot")[0][0] == "car parking spot"
+    assert index.search("moms birthday")[0][0] == "mom's birthday"
+
+
+def test_value_matches_rank_below_key_matches(index):
+    key, score = index.search("blue kettle")[0]
+    assert key == "wi-fi password" and score < 1.0
+    assert index.search("dentist")[0] == ("dentist", 1.0)
+
+
+def test_unrelated_query_finds_nothing(index):
+    assert index.search("favourite football team") == []
+
+
+def test_index_follows_remember_and_forget(index):
+    index.add("gym locker", {"value": "code 1234"})
+    assert index.search("gym lockr")[0][0] == "gym locker"
+    index.remove("gym locker")
+    assert all(key != "gym locker" for key, _ in index.search("gym lockr", min_score=0))
+
+
+def test_near_miss_keys_do_not_recall_a_different_memory(index):
+    assert index.search("bank password") == []
+    assert index.search("email password") == []
+    assert index.search("bike parking spot") == []
+
+
+def test_filler_words_are_only_stripped_as_whole_words():
+    index = MemoryIndex()
+    index.rebuild({"theater seat": {"value": "row f"}, "mystery books": {"value": "shelf 2"}})
+    assert index.search("theater seat") == [("theater seat", 1.0)]
+    assert index.search("what is my mystery books again?") == [("mystery books", 1.0)]
+    assert index.search("the theater seat") == [("theater seat", 1.0)]
@@ -0,0 +1,46 @@
+import threading
+import time
+import weakref
+
+from tasks.model_manager import ModelManager
+from tasks.timer_engine import TimerEngine
+
+
+class _Model:
+    pass
+
+
+def test_idle_model_is_unloaded_after_the_timeout():
+    engine = TimerEngine()
+    engine.start()
+    freed = threading.Event()
+
+    def load():
+        model = _Model()
+        weakref.finalize(model, freed.set)
+        return model
+
+    manager = ModelManager(idle_seconds=0.1, timer_engine=engine)
+    manager.register("m", load)
+    try:
+        with manager.use("m"):
+            time.sleep(0.2)                     # past the timeout, but in use
+        assert manager.is_loaded("m")
+        assert freed.wait(5), "idle model was not unloaded"
+        assert not manager.is_loaded("m") and manager.get_stats()["m"]["loads"] == 1
+    finally:
+        engine.stop()
+
+
+def test_model_loaded_once_and_unloaded_when_idle():
+    loads = []
+    manager = ModelManager(idle_seconds=0)
+    manager.register("m", lambda: loads.append(1) or object())
+    first = manager.get("m")
+    with manager.use("m") as second:
+        assert second is first
+        assert not manager.unload("m")      # in use
+    assert manager.unload("m")
+    assert not manager.is_loaded("m")
+    manager.get("m")
+    assert len(loads) == 2
@@ -0,0 +1,74 @@
+import asyncio
+import threading
+
+from singleflight import AsyncSingleFlight, SingleFlight
+
+
+def test_identical_calls_from_different_event_loops_share_one_request():
+    flight = AsyncSingleFlight("test")
+    calls, started, release = [], threading.Event(), threading.Event()
+
+    async def fetch():
+        calls.append(threading.current_thread().name)
+        started.set()
+        while not release.is_set():
+            await asyncio.sleep(0.005)
+        return "answer"
+
+    results = []
+
+    def session(name):
+        results.append((name, asyncio.run(flight.do("morning news", fetch))))
+
+    leader = threading.Thread(target=session, args=("a",))
+    leader.start()
+    assert started.wait(5)
+    followers = [threading.Thread(target=session, args=(name,)) for name in "bc"]
+    for thread in followers:
+        thread.start()
+    while flight.counters["coalesced"] < 2:
+        threading.Event().wait(0.005)
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join(5)
+    assert len(calls) == 1
+    assert sorted(results) == [("a", "answer"), ("b", "answer"), ("c", "answer")]
+    assert flight.counters == {"calls": 3, "coalesced": 2}
+
+
+def test_leader_errors_reach_followers_and_the_key_is_freed():
+    flight = AsyncSingleFlight("test")
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream down")
+
+    async def scenario():
+        return await asyncio.gather(flight.do("k", fail), flight.do("k", fail), return_exceptions=True)
+
+    assert [type(r) for r in asyncio.run(scenario())] == [ValueError, ValueError]
+
+    async def succeed():
+        return "ok"
+    assert asyncio.run(flight.do("k", succeed)) == "ok"
+
+
+def test_sync_group_coalesces_threads():
+    flight = SingleFlight("test")
+    release, calls = threading.Event(), []
+
+    def slow():
+        calls.append(1)
+        release.wait(5)
+        return 42
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("k", slow))) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    while flight.counters["calls"] < 3:
+        threading.Event().wait(0.005)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert results == [42, 42, 42] and len(calls) == 1
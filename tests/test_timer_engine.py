@@ -0,0 +1,65 @@
+import threading
+import time
+
+import pytest
+
+from tasks.timer_engine import TimerEngine
+
+
+@pytest.fixture
+def engine():
+    engine = TimerEngine(workers=1).start()     # one worker: callbacks run in firing order
+    yield engine
+    engine.stop()
+
+
+def _wait_for(event, timeout=5):
+    assert event.wait(timeout), "timer did not fire"
+
+
+def test_timers_fire_in_deadline_order(engine):
+    fired, done = [], threading.Event()
+    now = time.time()
+    for name, delay in (("c", 0.15), ("a", 0.05), ("b", 0.10)):
+        engine.schedule(now + delay, fired.append, name)
+    engine.schedule(now + 0.2, done.set)
+    _wait_for(done)
+    assert fired == ["a", "b", "c"]
+
+
+def test_earlier_timer_added_later_fires_first(engine):
+    fired, done = [], threading.Event()
+    engine.schedule_in(0.3, lambda: (fired.append("late"), done.set()))
+    time.sleep(0.05)                            # the engine is already waiting for "late"
+    engine.schedule_in(0.05, fired.append, "early")
+    _wait_for(done)
+    assert fired == ["early", "late"]
+
+
+def test_cancelled_timer_does_not_fire(engine):
+    fired, done = [], threading.Event()
+    timer_id = engine.schedule_in(0.05, fired.append, "cancelled")
+    engine.schedule_in(0.1, done.set)
+    assert engine.cancel(timer_id)
+    assert not engine.cancel(timer_id)
+    _wait_for(done)
+    assert fired == [] and engine.next_due(timer_id) is None
+
+
+def test_pending_lists_live_timers_in_firing_order():
+    engine = TimerEngine()                      # not started: nothing fires
+    late = engine.schedule(2_000_000_000, print)
+    early = engine.schedule(1_900_000_000, print, timer_id="early")
+    cancelled = engine.schedule(1_950_000_000, print)
+    engine.cancel(cancelled)
+    assert [timer_id for timer_id, _, _ in engine.pending()] == [early, late]
+    assert len(engine) == 2
+    with pytest.raises(ValueError):
+        engine.schedule(1_900_000_000, print, timer_id="early")
+
+
+def test_repeating_timer_skips_missed_occurrences():
+    engine = TimerEngine()
+    timer_id = engine.schedule(100.0, print, repeat=10)
+    assert [t for t, _ in engine._pop_due(135.0)] == [timer_id]     # one call, not four
+    assert engine._timers[timer_id]["due"] == 140.0
@@ -0,0 +1,28 @@
+from tasks.tts_cache import TTSCache
+
+
+def _synthesize(text):
+    return f"mp3:{text}".encode()
+
+
+def test_one_off_text_is_not_stored(tmp_path):
+    cache = TTSCache(str(tmp_path))
+    clip = cache.get_or_synthesize("The answer is forty two.", _synthesize, cache=False)
+    assert clip.read() == b"mp3:The answer is forty two."
+    assert cache.get("The answer is forty two.") is None
+
+
+def test_one_off_text_still_uses_a_cached_clip(tmp_path):
+    cache = TTSCache(str(tmp_path))
+    cache.prewarm(["Okay."], _synthesize)
+    calls = []
+    clip = cache.get_or_synthesize("Okay.", lambda text: calls.append(text) or b"", cache=False)
+    assert clip.read() == b"mp3:Okay." and not calls
+
+
+def test_streamed_sentences_do_not_evict_system_phrases(tmp_path):
+    cache = TTSCache(str(tmp_path), max_bytes=64)
+    cache.prewarm(["Okay.", "Done."], _synthesize)
+    for i in range(20):
+        cache.get_or_synthesize(f"Streamed sentence number {i}.", _synthesize, cache=False)
+    assert cache.get("Okay.") is not None and cache.get("Done.") is not None
@@ -0,0 +1,49 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import tasks.whisper_stt as whisper_stt
+from tasks.model_manager import ModelManager
+
+
+class FakeWhisper:
+    device = SimpleNamespace(type="cpu")
+
+    def __init__(self):
+        self.calls = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def transcribe(self, audio, **options):
+        self.calls.append(len(audio))
+        self.release.wait(5)
+        return {"text": " hello ", "segments": []}
+
+
+@pytest.fixture
+def model(monkeypatch):
+    model = FakeWhisper()
+    manager = ModelManager(idle_seconds=0)
+    manager.register(whisper_stt.MODEL_NAME, lambda: model)
+    monkeypatch.setattr(whisper_stt, "get_model_manager", lambda: manager)
+    return model
+
+
+def test_interim_decode_gives_way_to_a_running_decode(model):
+    model.release.clear()
+    final = threading.Thread(target=whisper_stt.transcribe, args=(np.zeros(160, dtype=np.float32),))
+    final.start()
+    while not model.calls:
+        time.sleep(0.01)
+    assert whisper_stt.transcribe(np.zeros(80, dtype=np.float32), interim=True) is None
+    model.release.set()
+    final.join()
+    assert model.calls == [160]
+
+
+def test_interim_decode_runs_when_the_model_is_free(model):
+    assert whisper_stt.transcribe(np.zeros(80, dtype=np.int16), interim=True)["text"] == " hello "
+    assert whisper_stt.transcribe_text(np.zeros(80, dtype=np.float32)) == "hello"